@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Backtesting de estrategias de predicción - Tokyo Roulette
+
+Reproduce sesiones (de un log de `spin_log.py` o generadas con
+`SpinEngine`, un stream por sesión) como las ve la app: antes de cada giro,
+con los últimos `window` giros de la sesión (la app guarda 20), cada
+predictor propone una apuesta y se compara con el giro que salió.
+
+Predictores incluidos:
+- `predict_next`: `RouletteLogic.predictNext` (el más frecuente; en empate, el
+  de primera aparición más tardía en la ventana, como el `reduce` de Dart). Pleno, sin confianza declarada.
+- `hot_number` / `cold_number`: recomendaciones de `PatternGrokker` (pleno con
+  la confianza que declara la app).
+- `streak_reversal`: tras 3+ rojos/negros, apuesta al color contrario. La app
+  sugiere un número al azar de ese color; aquí se evalúa la apuesta al color,
+  que es lo que afirma la confianza de 0.6.
+
+Un predictor es una función `predictor(batch) -> (bets, confidence)` sobre un
+`ReplayBatch`: `bets` son índices de `wheel.BET_NAMES` (-1 = no apuesta) y
+`confidence` la probabilidad declarada (NaN si no declara). Cada uno se
+evalúa en acierto, calibración de la confianza y P&L apostando 1 unidad.
+
+Todo es vectorizado por lotes de predicciones; las sesiones se reparten en
+procesos y los acumuladores (sumas) se combinan al final.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from batch_grokker import grok_ragged
+from parallel import root_sequence, run_tasks, task_engine
+from pattern_grokker import COLD_CONFIDENCE, DEFAULT_WINDOW, STREAK_CONFIDENCE
+from spin_log import SpinLog
+from wheel import BET_INDEX, BET_PAYOUTS, BET_WINS, WHEEL_SIZE
+
+# Relleno de las ventanas más cortas que `window` (inicio de sesión)
+PAD = 255
+
+CALIBRATION_BINS = 10
+
+# Predicciones por lote dentro de un proceso
+DEFAULT_BATCH = 1 << 18
+
+# Sesiones por tramo: fijo (no depende de los procesos) para que las sumas en
+# coma flotante se combinen siempre en el mismo orden
+DEFAULT_SHARD_SESSIONS = 256
+
+
+class ReplayBatch:
+    """Un lote de predicciones: ventanas de historial y giro siguiente."""
+
+    def __init__(self, windows: np.ndarray, targets: np.ndarray):
+        # windows[i] = últimos giros antes de targets[i], del más antiguo al más
+        # reciente, con PAD a la izquierda si la sesión lleva menos de `window`
+        self.windows = windows
+        self.targets = targets
+        self.lengths = (windows != PAD).sum(axis=1)
+        self._analysis = None
+
+    def __len__(self) -> int:
+        return self.targets.size
+
+    @property
+    def analysis(self) -> Dict[str, np.ndarray]:
+        """`grok_ragged` de cada ventana (se calcula una vez por lote)."""
+        if self._analysis is None:
+            values = self.windows[self.windows != PAD]
+            offsets = np.concatenate([[0], np.cumsum(self.lengths)])
+            self._analysis = grok_ragged(values, offsets)
+        return self._analysis
+
+
+def predict_next(batch: ReplayBatch) -> Tuple[np.ndarray, np.ndarray]:
+    """`RouletteLogic.predictNext`: el número más frecuente de la ventana."""
+    windows = batch.windows
+    rows = np.arange(len(batch))[:, None]
+    # PAD cae en una columna extra que se descarta
+    keys = rows * (WHEEL_SIZE + 1) + np.minimum(windows, WHEEL_SIZE)
+    counts = np.bincount(keys.ravel(), minlength=len(batch) * (WHEEL_SIZE + 1))
+    counts = counts.reshape(len(batch), WHEEL_SIZE + 1)[:, :WHEEL_SIZE]
+    best = counts.max(axis=1)
+    # Empate: `reduce((a, b) => a.value > b.value ? a : b)` se queda con `b`, así
+    # que gana el empatado insertado último en el Map de Dart, es decir, el de
+    # primera aparición más tardía en la ventana
+    order = np.argsort(windows, axis=1, kind='stable')
+    ordered = np.take_along_axis(windows, order, axis=1)
+    # Primera aparición de cada número: en el orden estable, donde cambia el valor
+    first_sorted = np.ones(windows.shape, dtype=bool)
+    first_sorted[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    is_first = np.empty(windows.shape, dtype=bool)
+    np.put_along_axis(is_first, order, first_sorted, axis=1)
+    valid = windows != PAD
+    candidate = valid & is_first & (counts[rows, np.where(valid, windows, 0)] == best[:, None])
+    last = windows.shape[1] - 1 - candidate[:, ::-1].argmax(axis=1)
+    bets = windows[np.arange(len(batch)), last].astype(np.int16)
+    return bets, np.full(len(batch), np.nan)
+
+
+def hot_number(batch: ReplayBatch) -> Tuple[np.ndarray, np.ndarray]:
+    """Recomendación `hotNumber` de PatternGrokker."""
+    analysis = batch.analysis
+    bets = analysis['hot_recommendation'].astype(np.int16)
+    return bets, np.where(bets >= 0, analysis['hot_confidence'], np.nan)
+
+
+def streak_reversal(batch: ReplayBatch) -> Tuple[np.ndarray, np.ndarray]:
+    """Recomendación `streak` de PatternGrokker como apuesta al color contrario."""
+    color = batch.analysis['streak_color']
+    bets = np.select([color == 1, color == 2], [BET_INDEX['red'], BET_INDEX['black']], -1)
+    return bets.astype(np.int16), np.where(bets >= 0, STREAK_CONFIDENCE, np.nan)
+
+
+def cold_number(batch: ReplayBatch) -> Tuple[np.ndarray, np.ndarray]:
+    """Recomendación `coldNumber` (número "debido") de PatternGrokker."""
+    bets = batch.analysis['cold_recommendation'].astype(np.int16)
+    return bets, np.where(bets >= 0, COLD_CONFIDENCE, np.nan)
+
+
+PREDICTORS: Dict[str, Callable] = {
+    'predict_next': predict_next,
+    'hot_number': hot_number,
+    'streak_reversal': streak_reversal,
+    'cold_number': cold_number,
+}
+
+
+class StrategyStats:
+    """Sumas combinables de una estrategia (aciertos, calibración y P&L)."""
+
+    def __init__(self):
+        self.opportunities = 0
+        self.bets = 0
+        self.hits = 0
+        # Aciertos esperados si los giros son independientes (prob. de la apuesta)
+        self.expected_hits = 0.0
+        self.profit = 0
+        self.profit_squares = 0
+        self.stated = 0
+        self.confidence = 0.0
+        self.brier = 0.0
+        self.bin_counts = np.zeros(CALIBRATION_BINS, dtype=np.int64)
+        self.bin_confidence = np.zeros(CALIBRATION_BINS)
+        self.bin_hits = np.zeros(CALIBRATION_BINS, dtype=np.int64)
+
+    def add(self, bets: np.ndarray, confidence: np.ndarray, targets: np.ndarray):
+        self.opportunities += targets.size
+        placed = bets >= 0
+        bets, confidence, targets = bets[placed], confidence[placed], targets[placed]
+        hits = BET_WINS[bets, targets]
+        profit = np.where(hits, BET_PAYOUTS[bets], -1)
+        self.bets += bets.size
+        self.hits += int(hits.sum())
+        self.expected_hits += float(BET_WINS[bets].sum() / WHEEL_SIZE)
+        self.profit += int(profit.sum())
+        self.profit_squares += int((profit * profit).sum())
+
+        stated = ~np.isnan(confidence)
+        confidence, hits = confidence[stated], hits[stated]
+        self.stated += confidence.size
+        self.confidence += float(confidence.sum())
+        self.brier += float(((confidence - hits) ** 2).sum())
+        bins = np.minimum((confidence * CALIBRATION_BINS).astype(np.intp), CALIBRATION_BINS - 1)
+        self.bin_counts += np.bincount(bins, minlength=CALIBRATION_BINS)
+        self.bin_confidence += np.bincount(bins, weights=confidence, minlength=CALIBRATION_BINS)
+        self.bin_hits += np.bincount(bins, weights=hits, minlength=CALIBRATION_BINS).astype(np.int64)
+
+    def merge(self, other: 'StrategyStats') -> 'StrategyStats':
+        for name, value in vars(other).items():
+            setattr(self, name, getattr(self, name) + value)
+        return self
+
+    def summary(self) -> Dict:
+        bets = max(self.bets, 1)
+        mean = self.profit / bets
+        variance = max(self.profit_squares / bets - mean * mean, 0.0)
+        calibration = [
+            {'confidence_from': i / CALIBRATION_BINS, 'confidence_to': (i + 1) / CALIBRATION_BINS,
+             'predictions': int(count),
+             'mean_confidence': float(self.bin_confidence[i] / count),
+             'hit_rate': float(self.bin_hits[i] / count)}
+            for i, count in enumerate(self.bin_counts) if count
+        ]
+        return {
+            'opportunities': self.opportunities,
+            'predictions': self.bets,
+            'coverage': self.bets / max(self.opportunities, 1),
+            'hits': self.hits,
+            'hit_rate': self.hits / bets,
+            'expected_hit_rate': self.expected_hits / bets,
+            'profit': self.profit,
+            'profit_per_bet': mean,
+            'profit_per_bet_se': (variance / bets) ** 0.5,
+            'mean_confidence': self.confidence / self.stated if self.stated else None,
+            'brier_score': self.brier / self.stated if self.stated else None,
+            'calibration': calibration,
+        }
+
+
+def session_spins(seed, session: int, spins: int) -> np.ndarray:
+    """Giros de la sesión generada `session` (su propio stream derivado de `seed`)."""
+    return task_engine(root_sequence(seed), session).generate(spins)
+
+
+def _load_shard(source: Dict, sessions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Giros y largos de las sesiones `sessions` de la fuente (ids, no un rango)."""
+    if source['kind'] == 'generate':
+        spins = source['spins']
+        generated = [session_spins(source['seed'], int(s), spins) for s in sessions]
+        return np.concatenate(generated), np.full(len(generated), spins, dtype=np.int64)
+    log = SpinLog(source['path'])
+    ids = log.blocks['session']
+    selected = np.flatnonzero(np.isin(ids, sessions))
+    # Bloques agrupados por sesión, en orden de escritura dentro de cada una
+    selected = selected[np.argsort(ids[selected], kind='stable')]
+    if not selected.size:
+        return np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.int64)
+    values = np.concatenate([log.block(int(i)) for i in selected])
+    _, starts = np.unique(ids[selected], return_index=True)
+    counts = log.blocks['count'][selected].astype(np.int64)
+    lengths = np.add.reduceat(counts, starts)
+    return values, lengths
+
+
+def replay_batches(values: np.ndarray, lengths: np.ndarray, window: int = DEFAULT_WINDOW,
+                   batch: int = DEFAULT_BATCH) -> Iterator[ReplayBatch]:
+    """Lotes de predicciones: un giro por predicción, salvo el primero de cada sesión."""
+    starts = np.cumsum(lengths) - lengths
+    session_of = np.repeat(np.arange(lengths.size), lengths)
+    targets = np.flatnonzero(np.arange(values.size) != starts[session_of])
+    offsets = np.arange(-window, 0)
+    for first in range(0, targets.size, batch):
+        positions = targets[first:first + batch]
+        index = positions[:, None] + offsets
+        valid = index >= starts[session_of[positions]][:, None]
+        windows = np.where(valid, values[np.maximum(index, 0)], PAD).astype(np.uint8)
+        yield ReplayBatch(windows, values[positions])
+
+
+def _run_shard(source: Dict, sessions: np.ndarray, window: int,
+               predictors: Dict[str, Callable], batch: int) -> Tuple[Dict[str, StrategyStats], int, int]:
+    values, lengths = _load_shard(source, sessions)
+    stats = {name: StrategyStats() for name in predictors}
+    for replay in replay_batches(values, lengths, window, batch):
+        for name, predictor in predictors.items():
+            bets, confidence = predictor(replay)
+            stats[name].add(np.asarray(bets), np.asarray(confidence, dtype=np.float64),
+                            replay.targets)
+    return stats, int(lengths.size), int(values.size)
+
+
+def backtest(source: Dict, sessions: Sequence[int], window: int = DEFAULT_WINDOW,
+             predictors: Optional[Dict[str, Callable]] = None, workers: int = 1,
+             batch: int = DEFAULT_BATCH, shard_sessions: int = DEFAULT_SHARD_SESSIONS) -> Dict:
+    """Evalúa `predictors` sobre las sesiones de `source` repartidas en `workers` procesos.
+
+    `source`: {'kind': 'log', 'path': ...} o {'kind': 'generate', 'seed': ..., 'spins': ...}.
+    `sessions`: ids de sesión ordenados; se reparten en tramos consecutivos de
+    `shard_sessions`, así que el resultado es idéntico con cualquier `workers`.
+    """
+    if window <= 0 or shard_sessions <= 0:
+        raise ValueError("window y shard_sessions deben ser positivos")
+    predictors = predictors or PREDICTORS
+    sessions = np.asarray(sessions, dtype=np.int64)
+    start = time.perf_counter()
+    shards = [sessions[i:i + shard_sessions] for i in range(0, len(sessions), shard_sessions)]
+    if source['kind'] == 'generate':
+        # Una sola raíz para todos los procesos (también si no se dio semilla)
+        source = dict(source, seed=root_sequence(source.get('seed')))
+    tasks = [(source, shard, window, predictors, batch) for shard in shards]
+    parts = run_tasks(_run_shard, tasks, workers)
+
+    stats = {name: StrategyStats() for name in predictors}
+    total_sessions = total_spins = 0
+    for part, part_sessions, part_spins in parts:
+        for name in stats:
+            stats[name].merge(part[name])
+        total_sessions += part_sessions
+        total_spins += part_spins
+    report = {
+        'sessions': total_sessions,
+        'spins': total_spins,
+        'window': window,
+        'strategies': {name: s.summary() for name, s in stats.items()},
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    if source['kind'] == 'generate':
+        report['seed'] = source['seed'].entropy
+    return report
+
+
+def print_report(report: Dict):
+    """Tabla resumen por estrategia."""
+    print(f"📊 {report['sessions']:,} sesiones, {report['spins']:,} giros, ventana {report['window']} "
+          f"({report['seconds']}s)")
+    print(f"   {'estrategia':<16} {'apuestas':>11} {'acierto':>8} {'esperado':>9} "
+          f"{'confianza':>9} {'P&L/apuesta':>14}")
+    for name, s in report['strategies'].items():
+        confidence = '—' if s['mean_confidence'] is None else f"{s['mean_confidence'] * 100:.1f}%"
+        print(f"   {name:<16} {s['predictions']:>11,} {s['hit_rate'] * 100:>7.2f}% "
+              f"{s['expected_hit_rate'] * 100:>8.2f}% {confidence:>9} "
+              f"{s['profit_per_bet']:>+8.4f} ±{s['profit_per_bet_se']:.4f}")
+
+
+def main():
+    """Punto de entrada principal."""
+    parser = argparse.ArgumentParser(description='Backtesting de estrategias de predicción')
+    parser.add_argument('log', nargs='?', help='Log de giros (.tkspin)')
+    parser.add_argument('--generate', type=int, default=0, metavar='SESIONES',
+                        help='Usar SESIONES sesiones generadas en lugar de un log')
+    parser.add_argument('--spins', type=int, default=200, help='Giros por sesión generada')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla de las sesiones generadas')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help='Giros de historial')
+    parser.add_argument('--strategies', nargs='+', choices=sorted(PREDICTORS),
+                        default=list(PREDICTORS), help='Estrategias a evaluar')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Procesos')
+    parser.add_argument('--json', action='store_true', help='Salida en JSON')
+    args = parser.parse_args()
+
+    if bool(args.log) == bool(args.generate):
+        parser.error('Indica un log o --generate SESIONES')
+    if args.generate:
+        source = {'kind': 'generate', 'seed': args.seed, 'spins': args.spins}
+        sessions = np.arange(args.generate)
+    else:
+        source = {'kind': 'log', 'path': args.log}
+        sessions = SpinLog(args.log).sessions()
+    predictors = {name: PREDICTORS[name] for name in args.strategies}
+    report = backtest(source, sessions, args.window, predictors, args.workers)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+grokHistory por lotes - Tokyo Roulette
+
+El análisis de `PatternGrokker` (ver `pattern_grokker.py`) para miles de
+sesiones a la vez, sin bucles por sesión: frecuencias con un único
+`bincount` sobre (sesión, número), colores/docenas/columnas/paridad con las
+tablas de 37 entradas de `wheel.py` y rachas por detección de corridas
+(run-length) sobre el array plano. El resultado es columnar: un array por
+campo, con una fila por sesión.
+
+Entradas:
+- 2-D `uint8` (sesiones × giros), todas las sesiones del mismo largo.
+- Irregular: `values` plano + `offsets` (la sesión i es values[offsets[i]:offsets[i+1]]).
+
+Mismos criterios que `pattern_grokker.py` (rachas en el extremo más reciente,
+empates por número). La recomendación de racha se expresa como el color
+sugerido; la app elige al azar un número de ese color.
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict
+
+import numpy as np
+
+from pattern_grokker import (
+    COLD_CONFIDENCE,
+    COLD_MISSED_RATIO,
+    MAX_HOT_CONFIDENCE,
+    STREAK_THRESHOLD,
+    TOP_NUMBERS,
+)
+from wheel import COLOR_CODE, COLUMN_CODE, DOZEN_CODE, PARITY_CODE, WHEEL_SIZE
+
+
+# Base para codificar (frecuencia, número) en una sola clave entera
+_KEY_BASE = 64
+
+
+def _one_hot(codes: np.ndarray, classes: int) -> np.ndarray:
+    """Matriz 37 × clases: counts (sesiones × 37) @ matriz = conteo por clase."""
+    # En float64 el producto usa BLAS y es exacto para cualquier conteo realista
+    table = np.zeros((WHEEL_SIZE, classes), dtype=np.float64)
+    table[np.arange(WHEEL_SIZE), codes] = 1
+    return table
+
+
+_COLOR_MATRIX = _one_hot(COLOR_CODE, 3)
+_PARITY_MATRIX = _one_hot(PARITY_CODE, 3)
+_DOZEN_MATRIX = _one_hot(DOZEN_CODE, 4)
+_COLUMN_MATRIX = _one_hot(COLUMN_CODE, 4)
+
+
+def grok_batch(spins: np.ndarray) -> Dict[str, np.ndarray]:
+    """Análisis de una matriz sesiones × giros."""
+    spins = np.asarray(spins)
+    if spins.ndim != 2:
+        raise ValueError("Se espera un array 2-D (sesiones × giros)")
+    sessions, length = spins.shape
+    offsets = np.arange(sessions + 1, dtype=np.int64) * length
+    return grok_ragged(spins.reshape(-1), offsets)
+
+
+def grok_ragged(values: np.ndarray, offsets: np.ndarray) -> Dict[str, np.ndarray]:
+    """Análisis de sesiones de largo variable (`values` plano + `offsets`)."""
+    values = np.asarray(values)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if offsets.ndim != 1 or offsets.size < 1 or offsets[0] != 0 or offsets[-1] != values.size:
+        raise ValueError("offsets debe empezar en 0 y terminar en len(values)")
+    lengths = np.diff(offsets)
+    if (lengths < 0).any():
+        raise ValueError("offsets debe ser no decreciente")
+    if values.size and int(values.max()) >= WHEEL_SIZE:
+        raise ValueError("Valores fuera de la ruleta europea (0-36)")
+    values = values.astype(np.intp, copy=False)
+    sessions = lengths.size
+    session_ids = np.repeat(np.arange(sessions), lengths)
+
+    counts = np.bincount(session_ids * WHEEL_SIZE + values,
+                         minlength=sessions * WHEEL_SIZE).reshape(sessions, WHEEL_SIZE)
+    result: Dict[str, np.ndarray] = {'lengths': lengths, 'counts': counts}
+    result.update(_top_numbers(counts, lengths))
+    result.update(_class_counts(counts, lengths))
+    result.update(_streaks(values, session_ids, sessions))
+    result.update(_recommendations(result, lengths))
+    return result
+
+
+def _share(count: np.ndarray, total: np.ndarray) -> np.ndarray:
+    """count / total · 100, con 0 donde total es 0."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, count / np.maximum(total, 1) * 100, 0.0)
+
+
+def _top_numbers(counts: np.ndarray, lengths: np.ndarray) -> Dict[str, np.ndarray]:
+    # Clave única por (frecuencia, número): basta un partition + ordenar 5 columnas
+    # y los empates quedan por número, como en pattern_grokker
+    numbers = np.arange(WHEEL_SIZE)
+    hot_key = counts * _KEY_BASE + (_KEY_BASE - 1 - numbers)
+    hot_key = np.partition(hot_key, WHEEL_SIZE - TOP_NUMBERS, axis=1)[:, -TOP_NUMBERS:]
+    hot_key = np.sort(hot_key, axis=1)[:, ::-1]
+    hot, hot_freq = _KEY_BASE - 1 - hot_key % _KEY_BASE, hot_key // _KEY_BASE
+    cold_key = counts * _KEY_BASE + numbers
+    cold_key = np.sort(np.partition(cold_key, TOP_NUMBERS - 1, axis=1)[:, :TOP_NUMBERS], axis=1)
+    cold, cold_freq = cold_key % _KEY_BASE, cold_key // _KEY_BASE
+    return {
+        # -1 donde no hay suficientes números distintos
+        'hot_numbers': np.where(hot_freq > 0, hot, -1).astype(np.int8),
+        'hot_frequencies': hot_freq,
+        'hot_percentages': _share(hot_freq, lengths[:, None]),
+        'cold_numbers': cold.astype(np.int8),
+        'cold_frequencies': cold_freq,
+        'cold_missed_spins': lengths[:, None] - cold_freq,
+    }
+
+
+def _class_counts(counts: np.ndarray, lengths: np.ndarray) -> Dict[str, np.ndarray]:
+    as_float = counts.astype(np.float64)
+    colors = (as_float @ _COLOR_MATRIX).astype(np.int64)
+    parities = (as_float @ _PARITY_MATRIX).astype(np.int64)
+    dozens = (as_float @ _DOZEN_MATRIX).astype(np.int64)
+    columns = (as_float @ _COLUMN_MATRIX).astype(np.int64)
+    colored = lengths - colors[:, 0]
+    return {
+        'green_count': colors[:, 0],
+        'red_count': colors[:, 1],
+        'black_count': colors[:, 2],
+        'green_percentage': _share(colors[:, 0], lengths),
+        'red_percentage': _share(colors[:, 1], lengths),
+        'black_percentage': _share(colors[:, 2], lengths),
+        'even_count': parities[:, 1],
+        'odd_count': parities[:, 2],
+        'even_percentage': _share(parities[:, 1], colored),
+        'odd_percentage': _share(parities[:, 2], colored),
+        'first_dozen_count': dozens[:, 1],
+        'second_dozen_count': dozens[:, 2],
+        'third_dozen_count': dozens[:, 3],
+        'first_column_count': columns[:, 1],
+        'second_column_count': columns[:, 2],
+        'third_column_count': columns[:, 3],
+    }
+
+
+def _runs(codes: np.ndarray, session_ids: np.ndarray):
+    """Corridas de códigos iguales dentro de cada sesión: (sesión, código, largo)."""
+    if not codes.size:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    change = np.empty(codes.size, dtype=bool)
+    change[0] = True
+    np.not_equal(codes[1:], codes[:-1], out=change[1:])
+    change[1:] |= session_ids[1:] != session_ids[:-1]
+    starts = np.flatnonzero(change)
+    run_lengths = np.diff(np.append(starts, codes.size))
+    return session_ids[starts], codes[starts], run_lengths
+
+
+def _current_and_longest(codes: np.ndarray, session_ids: np.ndarray, sessions: int):
+    """Racha actual (extremo más reciente) y máxima por sesión y código (1 o 2)."""
+    run_sessions, run_codes, run_lengths = _runs(codes, session_ids)
+    # Las corridas están ordenadas por sesión: [first, last] delimita las de cada una
+    session_range = np.arange(sessions)
+    first = np.searchsorted(run_sessions, session_range, side='left')
+    last = np.searchsorted(run_sessions, session_range, side='right') - 1
+    has_runs = last >= first
+    current, longest = {}, {}
+    for code in (1, 2):
+        current[code] = np.zeros(sessions, dtype=np.int64)
+        longest[code] = np.zeros(sessions, dtype=np.int64)
+        if not has_runs.any():
+            continue
+        matches = has_runs.copy()
+        matches[has_runs] = run_codes[last[has_runs]] == code
+        current[code][matches] = run_lengths[last[matches]]
+        masked = np.where(run_codes == code, run_lengths, 0)
+        longest[code][has_runs] = np.maximum.reduceat(masked, first[has_runs])
+    return current, longest
+
+
+def _streaks(values: np.ndarray, session_ids: np.ndarray, sessions: int) -> Dict[str, np.ndarray]:
+    # El 0 no corta ni suma rachas: se quita antes de buscar corridas
+    colored = values != 0
+    colored_values, colored_sessions = values[colored], session_ids[colored]
+    color_current, color_longest = _current_and_longest(
+        COLOR_CODE[colored_values], colored_sessions, sessions)
+    parity_current, _ = _current_and_longest(
+        PARITY_CODE[colored_values], colored_sessions, sessions)
+    return {
+        'current_red_streak': color_current[1],
+        'current_black_streak': color_current[2],
+        'max_red_streak': color_longest[1],
+        'max_black_streak': color_longest[2],
+        'current_even_streak': parity_current[1],
+        'current_odd_streak': parity_current[2],
+    }
+
+
+def _recommendations(result: Dict[str, np.ndarray], lengths: np.ndarray) -> Dict[str, np.ndarray]:
+    """Reglas de `_generateRecommendations` como columnas (-1/0 = sin recomendación)."""
+    total = np.maximum(lengths, 1)
+    has_hot = result['hot_frequencies'][:, 0] > 0
+    hot_confidence = np.minimum(0.5 + result['hot_frequencies'][:, 0] / total * 2,
+                                MAX_HOT_CONFIDENCE)
+    # Color sugerido tras una racha (código de COLOR_CODE): contrario a la racha
+    streak_color = np.where(result['current_red_streak'] >= STREAK_THRESHOLD, 2,
+                            np.where(result['current_black_streak'] >= STREAK_THRESHOLD, 1, 0))
+    cold_due = (result['cold_missed_spins'][:, 0] > lengths * COLD_MISSED_RATIO) & (lengths > 0)
+    return {
+        'hot_recommendation': np.where(has_hot, result['hot_numbers'][:, 0], -1).astype(np.int8),
+        'hot_confidence': np.where(has_hot, hot_confidence, 0.0),
+        'streak_color': streak_color.astype(np.uint8),
+        'cold_recommendation': np.where(cold_due, result['cold_numbers'][:, 0], -1).astype(np.int8),
+        'cold_confidence': np.where(cold_due, COLD_CONFIDENCE, 0.0),
+    }
+
+
+def main():
+    """Punto de entrada principal: compara el lote con el análisis sesión a sesión."""
+    from pattern_grokker import grok_history
+    from spin_engine import SpinEngine
+
+    parser = argparse.ArgumentParser(description='grokHistory por lotes')
+    parser.add_argument('--sessions', type=int, default=10_000, help='Sesiones')
+    parser.add_argument('--spins', type=int, default=200, help='Giros por sesión')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla')
+    parser.add_argument('--loop-sessions', type=int, default=500,
+                        help='Sesiones para medir el análisis sesión a sesión')
+    args = parser.parse_args()
+
+    spins = SpinEngine(seed=args.seed).generate(args.sessions * args.spins)
+    spins = spins.reshape(args.sessions, args.spins)
+    start = time.perf_counter()
+    grok_batch(spins)
+    batch = time.perf_counter() - start
+
+    sample = spins[:args.loop_sessions].tolist()
+    start = time.perf_counter()
+    for history in sample:
+        grok_history(history)
+    loop = (time.perf_counter() - start) / max(1, len(sample)) * args.sessions
+
+    print(f"📊 {args.sessions:,} sesiones × {args.spins} giros")
+    print(f"   lote:              {batch:8.3f}s")
+    print(f"   sesión a sesión:   {loop:8.3f}s (estimado)")
+    print(f"   ⚡ {loop / batch:.0f}x")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
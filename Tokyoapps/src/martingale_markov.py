@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Evaluador exacto de Martingale por cadena de Markov - Tokyo Roulette
+
+Modela `MartingaleAdvisor` como una cadena de Markov finita sobre estados
+(bankroll, racha de pérdidas), con las mismas reglas y límites que
+`martingale_sim.MartingaleSimulator`. La distribución de probabilidad se
+propaga giro a giro por programación dinámica; las sesiones que terminan
+(ruina, stop-loss, take-profit) salen a estados absorbentes.
+
+Responde en milisegundos lo que la simulación tarda minutos en estimar, sin
+error de muestreo: probabilidad de ruina en N giros, curvas de ruina y de
+bankroll esperado giro a giro y la distribución exacta del bankroll final.
+Los resultados se memorizan por tupla de parámetros.
+"""
+
+import argparse
+import functools
+import json
+import sys
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from martingale_sim import OUTCOME_NAMES, MartingaleSimulator, print_summary
+from wheel import RED_NUMBERS, WHEEL_SIZE
+
+# Probabilidad de ganar una apuesta a rojo
+WIN_PROBABILITY = len(RED_NUMBERS) / WHEEL_SIZE
+
+# Estados (rachas × bankrolls) a partir de los cuales conviene Monte Carlo
+MAX_STATES = 5_000_000
+
+
+def evaluate(bankroll: float = 100.0, base_bet: float = 1.0, max_spins: int = 1000,
+             table_max: Optional[float] = None, max_doublings: Optional[int] = None,
+             stop_loss: Optional[float] = None, take_profit: Optional[float] = None) -> Dict:
+    """Resultado exacto para los parámetros dados (memorizado; no modificar)."""
+    return _evaluate(float(bankroll), float(base_bet), int(max_spins),
+                     None if table_max is None else float(table_max),
+                     None if max_doublings is None else int(max_doublings),
+                     None if stop_loss is None else float(stop_loss),
+                     None if take_profit is None else float(take_profit))
+
+
+def cache_info():
+    """Estadísticas de la memoización (hits, misses, tamaño)."""
+    return _evaluate.cache_info()
+
+
+@functools.lru_cache(maxsize=256)
+def _evaluate(bankroll, base_bet, max_spins, table_max, max_doublings, stop_loss, take_profit) -> Dict:
+    simulator = MartingaleSimulator(bankroll, base_bet, max_spins, table_max,
+                                    max_doublings, stop_loss, take_profit)
+    limits = simulator.limits()
+    pow2, next_loss, low, high = limits['pow2'], limits['next_loss'], limits['low'], limits['high']
+    stop_loss_k = limits['stop_loss_k']
+
+    # k (ganancia en apuestas base) nunca supera el número de giros: cada ciclo
+    # de pérdidas cerrado con un acierto suma exactamente 1
+    top = min(max_spins, high - 1)
+    alive_streaks = int(np.flatnonzero(low <= top).max()) + 1 if (low <= top).any() else 1
+    bottom = int(low[:alive_streaks].min()) - int(pow2[alive_streaks - 1])
+    width = max_spins + 1 - bottom
+    if alive_streaks * width > MAX_STATES:
+        raise ValueError(f"Demasiados estados ({alive_streaks * width:,}); usa martingale_sim")
+    k_values = np.arange(bottom, max_spins + 1, dtype=np.int64)
+
+    # Estados absorbentes por (racha, k) y motivo de fin según k
+    absorbing = (k_values[None, :] < low[:alive_streaks, None]) | (k_values[None, :] >= high)
+    alive_mask = (~absorbing).astype(np.float64)
+    take_profit_k = k_values >= high
+    stop_loss_k_mask = (k_values <= stop_loss_k) & ~take_profit_k if stop_loss_k is not None \
+        else np.zeros(width, dtype=bool)
+    ruin_k = ~take_profit_k & ~stop_loss_k_mask
+
+    win, loss = WIN_PROBABILITY, 1.0 - WIN_PROBABILITY
+    dist = np.zeros((alive_streaks, width))
+    dist[0, -bottom] = 1.0  # k = 0, racha 0
+    absorbed_by_k = np.zeros(width)
+    curves = {name: np.empty(max_spins) for name in ('ruin', 'stop_loss', 'take_profit',
+                                                      'expected_bankroll')}
+    expected_length = 0.0
+
+    for spin in range(max_spins):
+        expected_length += dist.sum()
+        # Tras `spin + 1` giros k <= spin + 1: solo se recorren esas columnas
+        cols = min(width, spin + 2 - bottom)
+        new = np.zeros_like(dist)
+        for streak in range(alive_streaks):
+            row = dist[streak, :cols]
+            bet = int(pow2[streak])
+            if bet >= cols:
+                continue
+            # Acierto: k + 2^s y racha 0; fallo: k - 2^s y la racha siguiente
+            new[0, bet:cols] += win * row[:cols - bet]
+            target = next_loss[streak]
+            if target < alive_streaks:
+                new[target, :cols - bet] += loss * row[bet:]
+            else:
+                # Racha sin estados vivos: todo lo que llega ahí termina
+                absorbed_by_k[:cols - bet] += loss * row[bet:]
+        absorbed_by_k[:cols] += (new[:, :cols] * absorbing[:, :cols]).sum(axis=0)
+        dist = new
+        dist[:, :cols] *= alive_mask[:, :cols]
+        alive_by_k = dist[:, :cols].sum(axis=0)
+
+        curves['ruin'][spin] = absorbed_by_k[ruin_k].sum()
+        curves['stop_loss'][spin] = absorbed_by_k[stop_loss_k_mask].sum()
+        curves['take_profit'][spin] = absorbed_by_k[take_profit_k].sum()
+        curves['expected_bankroll'][spin] = bankroll + base_bet * (
+            absorbed_by_k @ k_values + alive_by_k @ k_values[:cols])
+
+    final = absorbed_by_k + dist.sum(axis=0)
+    nonzero = final > 0
+    for curve in curves.values():
+        curve.setflags(write=False)
+    outcomes = {
+        'ruin': float(curves['ruin'][-1]),
+        'stop_loss': float(curves['stop_loss'][-1]),
+        'take_profit': float(curves['take_profit'][-1]),
+        'max_spins': float(dist.sum()),
+    }
+    assert set(outcomes) == set(OUTCOME_NAMES.values())
+    bankrolls = bankroll + base_bet * k_values[nonzero]
+    probabilities = final[nonzero]
+    bankrolls.setflags(write=False)
+    probabilities.setflags(write=False)
+    return {
+        'params': simulator.params(),
+        'states': alive_streaks * width,
+        'ruin_probability': outcomes['ruin'],
+        'outcomes': outcomes,
+        'expected_bankroll': float(curves['expected_bankroll'][-1]),
+        'expected_profit': float(curves['expected_bankroll'][-1] - bankroll),
+        'expected_length': float(expected_length),
+        'curves': curves,
+        'final_distribution': {'bankroll': bankrolls, 'probability': probabilities},
+    }
+
+
+def main():
+    """Punto de entrada principal."""
+    parser = argparse.ArgumentParser(description='Evaluador exacto de riesgo de Martingale')
+    parser.add_argument('--bankroll', type=float, default=100.0, help='Bankroll inicial')
+    parser.add_argument('--base-bet', type=float, default=1.0, help='Apuesta base')
+    parser.add_argument('--max-spins', type=int, default=1000, help='Giros máximos por sesión')
+    parser.add_argument('--table-max', type=float, default=None, help='Apuesta máxima de la mesa')
+    parser.add_argument('--max-doublings', type=int, default=None,
+                        help='Duplicaciones seguidas antes de volver a la base')
+    parser.add_argument('--stop-loss', type=float, default=None, help='Pérdida que termina la sesión')
+    parser.add_argument('--take-profit', type=float, default=None, help='Ganancia que termina la sesión')
+    parser.add_argument('--check', type=int, default=0, metavar='N',
+                        help='Contrastar con Monte Carlo de N sesiones')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla del contraste Monte Carlo')
+    parser.add_argument('--json', action='store_true', help='Salida en JSON (sin curvas)')
+    args = parser.parse_args()
+
+    params = dict(bankroll=args.bankroll, base_bet=args.base_bet, max_spins=args.max_spins,
+                  table_max=args.table_max, max_doublings=args.max_doublings,
+                  stop_loss=args.stop_loss, take_profit=args.take_profit)
+    start = time.perf_counter()
+    result = evaluate(**params)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        summary = {k: v for k, v in result.items() if k not in ('curves', 'final_distribution')}
+        summary['seconds'] = round(elapsed, 4)
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"🧮 Cadena de Markov: {result['states']:,} estados, {args.max_spins} giros "
+          f"({elapsed * 1000:.1f} ms)")
+    print(f"   💀 Probabilidad de ruina: {result['ruin_probability'] * 100:.4f}%")
+    for name, probability in result['outcomes'].items():
+        print(f"      {name:<12} {probability * 100:>9.4f}%")
+    print(f"   💰 Bankroll final esperado: {result['expected_bankroll']:.3f} "
+          f"({result['expected_profit']:+.3f})")
+    print(f"   ⏱️  Duración esperada: {result['expected_length']:.1f} giros")
+
+    if args.check:
+        print(f"\n🎲 Contraste Monte Carlo ({args.check:,} sesiones):")
+        start = time.perf_counter()
+        summary = MartingaleSimulator(**params).run(args.check, seed=args.seed)
+        print_summary(summary)
+        print(f"   ({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Simulador Monte Carlo de Martingale - Tokyo Roulette
+
+Reproduce las reglas de `MartingaleAdvisor.getNextBet` (`lib/roulette_logic.dart`):
+apuesta a rojo, duplica al perder y vuelve a la apuesta base al ganar. En
+lugar de una apuesta a la vez, avanza millones de sesiones independientes en
+paralelo como arrays de NumPy (bankroll, apuesta actual y racha de pérdidas
+por sesión). Cada giro es una búsqueda sin ramas en tablas de transición
+precalculadas; las sesiones terminadas se compactan fuera de los arrays.
+
+Límites soportados:
+- `table_max`: si la apuesta duplicada supera el máximo de la mesa, se
+  vuelve a la apuesta base (la pérdida queda asumida).
+- `max_doublings`: tras N duplicaciones seguidas se vuelve a la apuesta base.
+- `stop_loss` / `take_profit`: la sesión termina al perder/ganar esa cantidad.
+- Ruina: la sesión termina cuando el bankroll no cubre la siguiente apuesta.
+
+ADVERTENCIA: simulación educativa. La ventaja de la casa (1/37) no cambia
+con ninguna progresión de apuestas.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from parallel import root_sequence, run_tasks, task_engine
+from spin_engine import BIT_GENERATORS, SpinEngine
+from wheel import IS_RED, RED_NUMBERS, WHEEL_SIZE
+
+# Sesiones procesadas a la vez (los arrays del lote caben en cache)
+DEFAULT_BATCH_SIZE = 1 << 16
+
+# Motivo de fin de cada sesión
+OUTCOME_RUIN = 1
+OUTCOME_STOP_LOSS = 2
+OUTCOME_TAKE_PROFIT = 3
+OUTCOME_MAX_SPINS = 4
+
+OUTCOME_NAMES = {
+    OUTCOME_RUIN: 'ruin',
+    OUTCOME_STOP_LOSS: 'stop_loss',
+    OUTCOME_TAKE_PROFIT: 'take_profit',
+    OUTCOME_MAX_SPINS: 'max_spins',
+}
+
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+# 1 si el número es rojo: se suma al estado para indexar las tablas
+RED_INDEX = IS_RED.astype(np.intp)
+
+
+class MartingaleSimulator:
+    """Sesiones de Martingale con límites de mesa y de sesión."""
+
+    def __init__(self, bankroll: float = 100.0, base_bet: float = 1.0,
+                 max_spins: int = 1000, table_max: Optional[float] = None,
+                 max_doublings: Optional[int] = None, stop_loss: Optional[float] = None,
+                 take_profit: Optional[float] = None):
+        if base_bet <= 0:
+            raise ValueError("base_bet debe ser positiva")
+        if bankroll < base_bet:
+            raise ValueError("El bankroll no cubre la apuesta base")
+        if max_spins <= 0:
+            raise ValueError("max_spins debe ser positivo")
+        if table_max is not None and table_max < base_bet:
+            raise ValueError("table_max no puede ser menor que la apuesta base")
+        self.bankroll = float(bankroll)
+        self.base_bet = float(base_bet)
+        self.max_spins = int(max_spins)
+        self.table_max = table_max
+        self.max_doublings = max_doublings
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+
+    def params(self) -> Dict:
+        """Parámetros de la simulación (para reportes)."""
+        return {
+            'bankroll': self.bankroll,
+            'base_bet': self.base_bet,
+            'max_spins': self.max_spins,
+            'table_max': self.table_max,
+            'max_doublings': self.max_doublings,
+            'stop_loss': self.stop_loss,
+            'take_profit': self.take_profit,
+        }
+
+    def run_sessions(self, sessions: int, seed=None, bit_generator: str = 'pcg64',
+                     batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1):
+        """Simula `sessions` sesiones; retorna (bankroll final, giros jugados, motivo de fin).
+
+        Cada lote de `batch_size` sesiones tiene su propio stream derivado de
+        `seed` (ver `parallel.py`): con la misma semilla y `batch_size` el
+        resultado es idéntico con cualquier número de `workers`.
+        """
+        root = root_sequence(seed, bit_generator)
+        tasks = [(root, index, min(batch_size, sessions - start), bit_generator)
+                 for index, start in enumerate(range(0, sessions, batch_size))]
+        parts = run_tasks(self._simulate_batch, tasks, workers)
+        if not parts:
+            return np.empty(0), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8)
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    def run(self, sessions: int, seed=None, bit_generator: str = 'pcg64',
+            batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1) -> Dict:
+        """Simula `sessions` sesiones y retorna el resumen (ver `summarize`)."""
+        if sessions <= 0:
+            raise ValueError("sessions debe ser positivo")
+        root = root_sequence(seed, bit_generator)
+        final, lengths, outcomes = self.run_sessions(sessions, root, bit_generator, batch_size, workers)
+        summary = summarize(final, lengths, outcomes, self.bankroll)
+        # Con esta entropía (o la semilla dada) la corrida se repite bit a bit
+        summary['seed'] = None if bit_generator == 'secrets' else root.entropy
+        return summary
+
+    def _simulate_batch(self, root, index: int, size: int, bit_generator: str):
+        final = np.empty(size, dtype=np.float64)
+        lengths = np.empty(size, dtype=np.int64)
+        outcomes = np.empty(size, dtype=np.uint8)
+        engine = task_engine(root, index, bit_generator=bit_generator)
+        self._run_batch(engine, final, lengths, outcomes)
+        return final, lengths, outcomes
+
+    def limits(self) -> Dict:
+        """Transiciones y umbrales por racha de pérdidas `s` (la apuesta es base·2^s).
+
+        El bankroll se lleva en unidades de apuesta base: bank = bankroll + base·k
+        con k entero, así que los umbrales se comparan como enteros. Una sesión
+        con racha `s` y k < low[s] o k >= high termina.
+        """
+        ratio = self.bankroll / self.base_bet
+        # Con el bankroll acotado por bankroll + max_spins·base la racha no pasa de aquí
+        size = int(np.ceil(np.log2(ratio + self.max_spins + 1))) + 2
+        streaks = np.arange(size)
+        pow2 = (2 ** streaks).astype(np.int64)
+        # Racha tras perder con racha s (0 si se alcanza un límite, como en run_loop)
+        next_loss = np.minimum(streaks + 1, size - 1)
+        capped = np.zeros(size, dtype=bool)
+        if self.max_doublings is not None:
+            capped |= next_loss > self.max_doublings
+        if self.table_max is not None:
+            capped |= self.base_bet * pow2[next_loss] > self.table_max
+        next_loss[capped] = 0
+        # Ruina si bank < base·2^s  ⇔  k < ceil(2^s - ratio)
+        low = np.ceil(pow2 - ratio).astype(np.int64)
+        stop_loss_k = None
+        if self.stop_loss is not None:
+            # Stop-loss si bank <= bankroll - stop_loss  ⇔  k <= floor(-stop_loss/base)
+            stop_loss_k = int(np.floor(-self.stop_loss / self.base_bet))
+            low = np.maximum(low, stop_loss_k + 1)
+        high = (int(np.ceil(self.take_profit / self.base_bet)) if self.take_profit is not None
+                else np.iinfo(np.int64).max)
+        return {'size': size, 'pow2': pow2, 'next_loss': next_loss, 'low': low,
+                'high': high, 'stop_loss_k': stop_loss_k}
+
+    def _tables(self) -> Dict:
+        """Tablas de transición indexadas por `estado + gano`.
+
+        Cada giro es una búsqueda en tablas sin ramas. El estado vale 2·s;
+        `dead` marca sesiones terminadas, que ya no cambian.
+        """
+        limits = self.limits()
+        size, pow2, next_loss, low = limits['size'], limits['pow2'], limits['next_loss'], limits['low']
+        high, stop_loss_k = limits['high'], limits['stop_loss_k']
+
+        dead = 2 * size
+        delta = np.zeros(dead + 2, dtype=np.int64)
+        delta[0:dead:2] = -pow2
+        delta[1:dead:2] = pow2
+        next_state = np.full(dead + 2, dead, dtype=np.intp)
+        next_state[0:dead:2] = 2 * next_loss
+        next_state[1:dead:2] = 0
+        low_by_state = np.full(dead + 2, np.iinfo(np.int64).min, dtype=np.int64)
+        low_by_state[0:dead:2] = low
+        return {'delta': delta, 'next': next_state, 'low': low_by_state, 'high': high,
+                'stop_loss_k': stop_loss_k, 'dead': dead}
+
+    def _run_batch(self, engine: SpinEngine, final: np.ndarray,
+                   lengths: np.ndarray, outcomes: np.ndarray):
+        """Avanza un lote de sesiones giro a giro hasta que todas terminan."""
+        tables = self._tables()
+        delta, next_state, low, high = tables['delta'], tables['next'], tables['low'], tables['high']
+        dead = tables['dead']
+        count = len(final)
+        ids = np.arange(count)
+        units = np.zeros(count, dtype=np.int64)
+        state = np.zeros(count, dtype=np.intp)
+        alive = count
+
+        for spin in range(1, self.max_spins + 1):
+            if not alive:
+                break
+            index = state + np.take(RED_INDEX, engine.generate(ids.size))
+            units += np.take(delta, index)
+            state = np.take(next_state, index)
+
+            done = np.flatnonzero((units < np.take(low, state)) | (units >= high))
+            if done.size:
+                finished = ids[done]
+                done_units = units[done]
+                outcome = np.full(done.size, OUTCOME_RUIN, dtype=np.uint8)
+                if tables['stop_loss_k'] is not None:
+                    outcome[done_units <= tables['stop_loss_k']] = OUTCOME_STOP_LOSS
+                outcome[done_units >= high] = OUTCOME_TAKE_PROFIT
+                final[finished] = self.bankroll + self.base_bet * done_units
+                lengths[finished] = spin
+                outcomes[finished] = outcome
+                # Las terminadas quedan inertes; se compactan cuando son muchas
+                state[done] = dead
+                units[done] = 0
+                alive -= done.size
+                if alive <= ids.size * 3 // 4:
+                    keep = state != dead
+                    ids, units, state = ids[keep], units[keep], state[keep]
+
+        keep = state != dead
+        final[ids[keep]] = self.bankroll + self.base_bet * units[keep]
+        lengths[ids[keep]] = self.max_spins
+        outcomes[ids[keep]] = OUTCOME_MAX_SPINS
+
+    def run_loop(self, sessions: int, seed=None) -> Dict:
+        """Referencia apuesta a apuesta en Python puro (lenta; para validar y comparar)."""
+        if sessions <= 0:
+            raise ValueError("sessions debe ser positivo")
+        rng = random.Random(seed)
+        final = np.empty(sessions, dtype=np.float64)
+        lengths = np.empty(sessions, dtype=np.int64)
+        outcomes = np.empty(sessions, dtype=np.uint8)
+        for index in range(sessions):
+            bank, bet, streak = self.bankroll, self.base_bet, 0
+            outcome, spin = OUTCOME_MAX_SPINS, self.max_spins
+            for played in range(1, self.max_spins + 1):
+                win = rng.randrange(WHEEL_SIZE) in RED_NUMBERS
+                bank += bet if win else -bet
+                if win:
+                    bet, streak = self.base_bet, 0
+                else:
+                    bet, streak = bet * 2, streak + 1
+                    if ((self.max_doublings is not None and streak > self.max_doublings)
+                            or (self.table_max is not None and bet > self.table_max)):
+                        bet, streak = self.base_bet, 0
+                if self.take_profit is not None and bank >= self.bankroll + self.take_profit:
+                    outcome = OUTCOME_TAKE_PROFIT
+                elif self.stop_loss is not None and bank <= self.bankroll - self.stop_loss:
+                    outcome = OUTCOME_STOP_LOSS
+                elif bank < bet:
+                    outcome = OUTCOME_RUIN
+                else:
+                    continue
+                spin = played
+                break
+            final[index], lengths[index], outcomes[index] = bank, spin, outcome
+        return summarize(final, lengths, outcomes, self.bankroll)
+
+
+def summarize(final: np.ndarray, lengths: np.ndarray, outcomes: np.ndarray,
+              bankroll: float, bins: int = 50) -> Dict:
+    """Probabilidad de ruina, distribución del bankroll final y de la duración."""
+    sessions = len(final)
+    outcome_counts = np.bincount(outcomes, minlength=len(OUTCOME_NAMES) + 1)
+    bank_counts, bank_edges = np.histogram(final, bins=bins)
+    length_counts, length_edges = np.histogram(lengths, bins=min(bins, max(1, int(lengths.max()))))
+    return {
+        'sessions': sessions,
+        'ruin_probability': float(outcome_counts[OUTCOME_RUIN] / sessions),
+        'outcomes': {name: float(outcome_counts[code] / sessions)
+                     for code, name in OUTCOME_NAMES.items()},
+        'expected_profit': float(final.mean() - bankroll),
+        'bankroll': {
+            'mean': float(final.mean()),
+            'std': float(final.std()),
+            'min': float(final.min()),
+            'max': float(final.max()),
+            'percentiles': {str(p): float(v) for p, v in
+                            zip(PERCENTILES, np.percentile(final, PERCENTILES))},
+            'histogram': {'counts': bank_counts.tolist(), 'edges': bank_edges.tolist()},
+        },
+        'session_length': {
+            'mean': float(lengths.mean()),
+            'median': float(np.median(lengths)),
+            'max': int(lengths.max()),
+            'histogram': {'counts': length_counts.tolist(), 'edges': length_edges.tolist()},
+        },
+    }
+
+
+def print_summary(summary: Dict):
+    """Resumen legible de una simulación."""
+    print(f"🎲 Sesiones: {summary['sessions']:,}")
+    print(f"   💀 Probabilidad de ruina: {summary['ruin_probability'] * 100:.3f}%")
+    for name, fraction in summary['outcomes'].items():
+        print(f"      {name:<12} {fraction * 100:>8.3f}%")
+    bank = summary['bankroll']
+    print(f"   💰 Bankroll final: media {bank['mean']:.2f} | mediana {bank['percentiles']['50']:.2f} "
+          f"| p5 {bank['percentiles']['5']:.2f} | p95 {bank['percentiles']['95']:.2f}")
+    print(f"   📉 Ganancia esperada por sesión: {summary['expected_profit']:+.3f}")
+    length = summary['session_length']
+    print(f"   ⏱️  Duración: media {length['mean']:.1f} giros | mediana {length['median']:.0f} "
+          f"| máx {length['max']}")
+
+
+def main():
+    """Punto de entrada principal."""
+    parser = argparse.ArgumentParser(description='Simulador Monte Carlo de Martingale')
+    parser.add_argument('--sessions', type=int, default=1_000_000, help='Sesiones a simular')
+    parser.add_argument('--bankroll', type=float, default=100.0, help='Bankroll inicial')
+    parser.add_argument('--base-bet', type=float, default=1.0, help='Apuesta base')
+    parser.add_argument('--max-spins', type=int, default=1000, help='Giros máximos por sesión')
+    parser.add_argument('--table-max', type=float, default=None, help='Apuesta máxima de la mesa')
+    parser.add_argument('--max-doublings', type=int, default=None,
+                        help='Duplicaciones seguidas antes de volver a la base')
+    parser.add_argument('--stop-loss', type=float, default=None, help='Pérdida que termina la sesión')
+    parser.add_argument('--take-profit', type=float, default=None, help='Ganancia que termina la sesión')
+    parser.add_argument('--generator', choices=BIT_GENERATORS, default='pcg64', help='Bit generator')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Procesos (el resultado no depende de cuántos)')
+    parser.add_argument('--compare-loop', type=int, default=0, metavar='N',
+                        help='Medir también el bucle Python apuesta a apuesta con N sesiones')
+    parser.add_argument('--json', action='store_true', help='Salida en JSON')
+    args = parser.parse_args()
+
+    simulator = MartingaleSimulator(args.bankroll, args.base_bet, args.max_spins, args.table_max,
+                                    args.max_doublings, args.stop_loss, args.take_profit)
+    start = time.perf_counter()
+    summary = simulator.run(args.sessions, seed=args.seed, bit_generator=args.generator,
+                            workers=args.workers)
+    elapsed = time.perf_counter() - start
+    summary['params'] = simulator.params()
+    summary['seconds'] = round(elapsed, 3)
+
+    if args.compare_loop:
+        start = time.perf_counter()
+        simulator.run_loop(args.compare_loop, seed=args.seed)
+        loop_rate = args.compare_loop / (time.perf_counter() - start)
+        summary['speedup_vs_loop'] = round((args.sessions / elapsed) / loop_rate, 1)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print_summary(summary)
+    print(f"   ⚡ {args.sessions / elapsed:,.0f} sesiones/s ({elapsed:.2f}s)")
+    if 'speedup_vs_loop' in summary:
+        print(f"   🐢 Bucle Python: {summary['speedup_vs_loop']}x más lento")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
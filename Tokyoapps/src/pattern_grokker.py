@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+PatternGrokker incremental - Tokyo Roulette
+
+Mismo análisis que `PatternGrokker.grokHistory` (`lib/services/pattern_grokker.dart`):
+números calientes/fríos, rachas, docenas/columnas, colores, pares/impares y
+recomendaciones. En lugar de recalcular todo sobre el historial en cada giro,
+mantiene contadores sobre una ventana deslizante (buffer circular de
+cualquier tamaño) que se actualizan al entrar un giro y al salir el más
+antiguo. El costo por giro es constante aunque la ventana sea de 10^6 giros,
+y el análisis se calcula una sola vez por giro (las recomendaciones reutilizan
+el mismo análisis en lugar de volver a llamar a `grokHistory`).
+
+Diferencias deliberadas con la versión Dart:
+- Las rachas "actuales" son las del extremo más reciente del historial (lo que
+  espera el test de Dart; el bucle sobre `history.reversed` cuenta la del más
+  antiguo). El 0 no corta ni suma rachas, igual que en Dart.
+- Empates en calientes/fríos: por número ascendente (en Dart dependen del sort).
+- Porcentajes de par/impar en 0 si todos los giros de la ventana son 0.
+
+ADVERTENCIA: análisis educativo. Cada giro es independiente.
+"""
+
+import random
+from collections import deque
+from typing import Dict, List, Optional
+
+from wheel import BLACK_NUMBERS, COLORS, COLUMNS, DOZENS, PARITIES, RED_NUMBERS, WHEEL_SIZE
+
+# Tamaño de ventana de la app (`_SpinScreenState` guarda los últimos 20)
+DEFAULT_WINDOW = 20
+
+TOP_NUMBERS = 5
+
+# Umbrales de `_generateRecommendations`
+STREAK_THRESHOLD = 3
+STREAK_CONFIDENCE = 0.6
+COLD_MISSED_RATIO = 0.7
+COLD_CONFIDENCE = 0.5
+MAX_HOT_CONFIDENCE = 0.8
+
+_NUMBERS = range(WHEEL_SIZE)
+_RED_LIST = sorted(RED_NUMBERS)
+_BLACK_LIST = sorted(BLACK_NUMBERS)
+
+
+class RunTracker:
+    """Rachas por clave (p. ej. 'red'/'black') sobre una ventana deslizante.
+
+    Guarda las rachas como [clave, largo] en un deque y un histograma de
+    largos por clave, de modo que agregar, expulsar y consultar la racha
+    máxima son O(1). `None` (el 0) no corta ni alarga rachas.
+    """
+
+    def __init__(self, keys):
+        self.runs = deque()
+        self.histogram = {key: {} for key in keys}
+        self.longest = {key: 0 for key in keys}
+
+    def _move(self, key, old: int, new: int):
+        hist = self.histogram[key]
+        if old:
+            hist[old] -= 1
+            if not hist[old]:
+                del hist[old]
+        if new:
+            hist[new] = hist.get(new, 0) + 1
+
+    def push(self, key):
+        if key is None:
+            return
+        if self.runs and self.runs[-1][0] == key:
+            run = self.runs[-1]
+            run[1] += 1
+            self._move(key, run[1] - 1, run[1])
+        else:
+            self.runs.append([key, 1])
+            self._move(key, 0, 1)
+        self.longest[key] = max(self.longest[key], self.runs[-1][1])
+
+    def evict(self, key):
+        """Quita el giro más antiguo (que pertenece a la primera racha)."""
+        if key is None:
+            return
+        run = self.runs[0]
+        run[1] -= 1
+        self._move(key, run[1] + 1, run[1])
+        # La racha más larga solo baja de a 1: si ya no quedan de ese largo,
+        # la recortada es ahora la más larga
+        if self.longest[key] == run[1] + 1 and not self.histogram[key].get(run[1] + 1):
+            self.longest[key] = run[1]
+        if not run[1]:
+            self.runs.popleft()
+
+    def current(self, key) -> int:
+        """Largo de la racha de `key` en el extremo más reciente (0 si no es de `key`)."""
+        return self.runs[-1][1] if self.runs and self.runs[-1][0] == key else 0
+
+
+class PatternGrokker:
+    """Análisis incremental de patrones sobre los últimos `window` giros."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW, rng: Optional[random.Random] = None):
+        if window <= 0:
+            raise ValueError("window debe ser positivo")
+        self.window = window
+        # Los números sugeridos en rachas son aleatorios, como con Random.secure()
+        self.rng = rng or random.SystemRandom()
+        self.buffer = bytearray(window)
+        self.start = 0
+        self.size = 0
+        self.counts = [0] * WHEEL_SIZE
+        self.colors = {'red': 0, 'black': 0, 'green': 0}
+        self.parities = {'even': 0, 'odd': 0}
+        self.dozens = [0, 0, 0, 0]
+        self.columns = [0, 0, 0, 0]
+        self.color_runs = RunTracker(('red', 'black'))
+        self.parity_runs = RunTracker(('even', 'odd'))
+        self._analysis: Optional[Dict] = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def history(self) -> List[int]:
+        """Giros de la ventana, del más antiguo al más reciente."""
+        end = self.start + self.size
+        if end <= self.window:
+            return list(self.buffer[self.start:end])
+        return list(self.buffer[self.start:]) + list(self.buffer[:end - self.window])
+
+    def _count(self, number: int, delta: int):
+        self.counts[number] += delta
+        self.colors[COLORS[number]] += delta
+        if number:
+            self.parities[PARITIES[number]] += delta
+            self.dozens[DOZENS[number]] += delta
+            self.columns[COLUMNS[number]] += delta
+
+    def push(self, number: int):
+        """Agrega un giro; si la ventana está llena expulsa el más antiguo."""
+        if not 0 <= number < WHEEL_SIZE:
+            raise ValueError(f"Número fuera de la ruleta europea: {number}")
+        if self.size == self.window:
+            oldest = self.buffer[self.start]
+            self.start = (self.start + 1) % self.window
+            self.size -= 1
+            self._count(oldest, -1)
+            self.color_runs.evict(COLORS[oldest] if oldest else None)
+            self.parity_runs.evict(PARITIES[oldest])
+        self.buffer[(self.start + self.size) % self.window] = number
+        self.size += 1
+        self._count(number, 1)
+        self.color_runs.push(COLORS[number] if number else None)
+        self.parity_runs.push(PARITIES[number])
+        self._analysis = None
+
+    def extend(self, numbers):
+        for number in numbers:
+            self.push(number)
+
+    def clear(self):
+        self.__init__(self.window, self.rng)
+
+    def analysis(self) -> Dict:
+        """Análisis de la ventana actual (se calcula una vez por giro)."""
+        if self._analysis is None:
+            self._analysis = self._analyze()
+        return self._analysis
+
+    def _analyze(self) -> Dict:
+        total = self.size
+        if not total:
+            return {'hot_numbers': [], 'cold_numbers': [], 'streaks': None, 'sectors': None,
+                    'colors': None, 'even_odd': None, 'recommendations': []}
+        counts = self.counts
+        # sorted es estable (también con reverse): los empates quedan por número
+        hot = [n for n in sorted(_NUMBERS, key=counts.__getitem__, reverse=True)[:TOP_NUMBERS]
+               if counts[n]]
+        cold = sorted(_NUMBERS, key=counts.__getitem__)[:TOP_NUMBERS]
+        colored = total - self.colors['green']
+        analysis = {
+            'hot_numbers': [{'number': n, 'frequency': counts[n],
+                             'percentage': counts[n] / total * 100} for n in hot],
+            'cold_numbers': [{'number': n, 'frequency': counts[n],
+                              'missed_spins': total - counts[n]} for n in cold],
+            'streaks': {
+                'current_red_streak': self.color_runs.current('red'),
+                'current_black_streak': self.color_runs.current('black'),
+                'max_red_streak': self.color_runs.longest['red'],
+                'max_black_streak': self.color_runs.longest['black'],
+                'current_even_streak': self.parity_runs.current('even'),
+                'current_odd_streak': self.parity_runs.current('odd'),
+            },
+            'sectors': {
+                'first_dozen_count': self.dozens[1],
+                'second_dozen_count': self.dozens[2],
+                'third_dozen_count': self.dozens[3],
+                'first_column_count': self.columns[1],
+                'second_column_count': self.columns[2],
+                'third_column_count': self.columns[3],
+            },
+            'colors': {
+                'red_count': self.colors['red'],
+                'black_count': self.colors['black'],
+                'green_count': self.colors['green'],
+                'red_percentage': self.colors['red'] / total * 100,
+                'black_percentage': self.colors['black'] / total * 100,
+                'green_percentage': self.colors['green'] / total * 100,
+            },
+            'even_odd': {
+                'even_count': self.parities['even'],
+                'odd_count': self.parities['odd'],
+                'even_percentage': self.parities['even'] / colored * 100 if colored else 0.0,
+                'odd_percentage': self.parities['odd'] / colored * 100 if colored else 0.0,
+            },
+        }
+        analysis['recommendations'] = self._recommendations(analysis, total)
+        return analysis
+
+    def _recommendations(self, analysis: Dict, total: int) -> List[Dict]:
+        """Reglas de `_generateRecommendations` sobre el análisis ya calculado."""
+        recommendations = []
+        if analysis['hot_numbers']:
+            hottest = analysis['hot_numbers'][0]
+            recommendations.append({
+                'type': 'hotNumber',
+                'suggested_number': hottest['number'],
+                'confidence': min(0.5 + hottest['frequency'] / total * 2, MAX_HOT_CONFIDENCE),
+                'reasoning': f"El número {hottest['number']} ha salido {hottest['frequency']} veces "
+                             f"({hottest['percentage']:.1f}% del historial)",
+            })
+
+        streaks = analysis['streaks']
+        if streaks['current_red_streak'] >= STREAK_THRESHOLD:
+            recommendations.append({
+                'type': 'streak',
+                'suggested_number': self.rng.choice(_BLACK_LIST),
+                'confidence': STREAK_CONFIDENCE,
+                'reasoning': f"Racha de {streaks['current_red_streak']} rojos consecutivos. "
+                             "Considera apostar a negro (falacia del jugador, solo educativo).",
+            })
+        elif streaks['current_black_streak'] >= STREAK_THRESHOLD:
+            recommendations.append({
+                'type': 'streak',
+                'suggested_number': self.rng.choice(_RED_LIST),
+                'confidence': STREAK_CONFIDENCE,
+                'reasoning': f"Racha de {streaks['current_black_streak']} negros consecutivos. "
+                             "Considera apostar a rojo (falacia del jugador, solo educativo).",
+            })
+
+        coldest = analysis['cold_numbers'][0]
+        if coldest['missed_spins'] > total * COLD_MISSED_RATIO:
+            recommendations.append({
+                'type': 'coldNumber',
+                'suggested_number': coldest['number'],
+                'confidence': COLD_CONFIDENCE,
+                'reasoning': f"El número {coldest['number']} no ha salido en "
+                             f"{coldest['missed_spins']} giros. Teoría de \"números debidos\".",
+            })
+        return recommendations
+
+
+def grok_history(history, rng: Optional[random.Random] = None) -> Dict:
+    """Análisis de un historial completo (equivalente a `grokHistory`)."""
+    grokker = PatternGrokker(window=max(1, len(history)), rng=rng)
+    grokker.extend(history)
+    return grokker.analysis()
+
+
+def main():
+    """Punto de entrada principal: mide el costo por giro según la ventana."""
+    import argparse
+    import time
+
+    from spin_engine import SpinEngine
+
+    parser = argparse.ArgumentParser(description='PatternGrokker incremental')
+    parser.add_argument('--window', type=int, nargs='+', default=[20, 1000, 1_000_000],
+                        help='Tamaños de ventana a medir')
+    parser.add_argument('--spins', type=int, default=200_000, help='Giros por medición')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla de los giros')
+    args = parser.parse_args()
+
+    spins = SpinEngine(seed=args.seed).generate(args.spins).tolist()
+    print(f"🔍 {args.spins:,} giros, análisis completo en cada giro")
+    for window in args.window:
+        grokker = PatternGrokker(window=window, rng=random.Random(args.seed))
+        start = time.perf_counter()
+        for number in spins:
+            grokker.push(number)
+            grokker.analysis()
+        elapsed = time.perf_counter() - start
+        print(f"   ventana {window:>9,}: {elapsed / args.spins * 1e6:6.1f} µs/giro")
+
+
+if __name__ == '__main__':
+    main()
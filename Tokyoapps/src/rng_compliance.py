@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Validación de cumplimiento del RNG en streaming - Tokyo Roulette
+
+Los tests de `.github/agents/rng-compliance-agent.md` (chi-cuadrado, rachas,
+autocorrelación) cargando muestras de miles de millones de giros, sin
+tenerlas en memoria: una sola pasada sobre chunks (de un archivo mapeado en
+memoria o de `SpinEngine.chunks`) con acumuladores combinables. Cada
+acumulador resume un tramo contiguo y `merge` une dos tramos consecutivos
+(incluidos los pares que cruzan la frontera), así que el resultado no
+depende del tamaño de chunk ni de cuántos procesos lo calcularon.
+
+Tests:
+- Chi-cuadrado de frecuencias (36 g.l.).
+- Rachas de Wald–Wolfowitz por encima/debajo de la mediana teórica (18; el
+  18 se descarta como empate).
+- Serial de pares (ψ² de Good sobre pares solapados, circular; 37² − 37 g.l.).
+- Gaps entre ceros (distribución geométrica, cola agrupada con esperado ≥ 5).
+- Autocorrelación lag-k (z = r·√n).
+
+Archivos: `.npy` (mapeado con `np.load(mmap_mode='r')`), logs de
+`spin_log.py` (`.tkspin`) o bytes crudos, un giro por byte (la salida de
+`spin_engine.py --output`).
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+from parallel import root_sequence, run_tasks, task_engine
+from spin_log import SPIN_LOG_SUFFIX, SpinLog
+from wheel import WHEEL_SIZE
+
+# Giros por chunk: las claves de pares en intp ocupan 8 bytes por giro
+DEFAULT_CHUNK_SIZE = 1 << 22
+
+DEFAULT_LAGS = (1, 2, 3, 4, 5)
+
+# Con ~10 tests por reporte, 0.05 haría fallar un RNG correcto ~40% de las veces
+DEFAULT_ALPHA = 0.01
+
+# Mediana teórica de 0-36: separa 18 números altos de 18 bajos
+RUNS_MEDIAN = 18
+
+# Largo de gap a partir del cual se acumula en el último bin
+MAX_GAP = 1024
+
+# Esperado mínimo por bin para que chi-cuadrado sea válido
+MIN_EXPECTED = 5
+
+
+class FrequencyAccumulator:
+    """Frecuencias por número y pares consecutivos (chi-cuadrado y serial)."""
+
+    def __init__(self):
+        self.pairs = np.zeros(WHEEL_SIZE * WHEEL_SIZE, dtype=np.int64)
+        self.first: Optional[int] = None
+        self.last: Optional[int] = None
+
+    @classmethod
+    def from_chunk(cls, chunk: np.ndarray) -> 'FrequencyAccumulator':
+        acc = cls()
+        if chunk.size:
+            keys = chunk[:-1].astype(np.intp) * WHEEL_SIZE + chunk[1:]
+            acc.pairs += np.bincount(keys, minlength=WHEEL_SIZE * WHEEL_SIZE)
+            acc.first, acc.last = int(chunk[0]), int(chunk[-1])
+        return acc
+
+    def merge(self, other: 'FrequencyAccumulator') -> 'FrequencyAccumulator':
+        if other.first is None:
+            return self
+        if self.last is not None:
+            self.pairs[self.last * WHEEL_SIZE + other.first] += 1
+        else:
+            self.first = other.first
+        self.pairs += other.pairs
+        self.last = other.last
+        return self
+
+    def counts(self) -> np.ndarray:
+        """Frecuencia de cada número (cada giro salvo el último abre un par)."""
+        counts = self.pairs.reshape(WHEEL_SIZE, WHEEL_SIZE).sum(axis=1)
+        if self.last is not None:
+            counts[self.last] += 1
+        return counts
+
+    def chi_square(self, alpha: float) -> Dict:
+        counts = self.counts()
+        n = int(counts.sum())
+        expected = n / WHEEL_SIZE
+        statistic = float(((counts - expected) ** 2).sum() / expected) if n else 0.0
+        return _chi_square_result('Chi-Square', statistic, WHEEL_SIZE - 1, alpha,
+                                  enough=expected >= MIN_EXPECTED)
+
+    def serial(self, alpha: float) -> Dict:
+        """Test serial de pares: ψ²₂ − ψ²₁ de Good sobre la secuencia circular."""
+        counts = self.counts()
+        n = int(counts.sum())
+        pairs = self.pairs.copy()
+        if n:
+            pairs[self.last * WHEEL_SIZE + self.first] += 1
+        cells = WHEEL_SIZE * WHEEL_SIZE
+        if n:
+            psi2 = cells / n * float((pairs.astype(np.float64) ** 2).sum()) - n
+            psi1 = WHEEL_SIZE / n * float((counts.astype(np.float64) ** 2).sum()) - n
+            statistic = psi2 - psi1
+        else:
+            statistic = 0.0
+        return _chi_square_result('Serial Pairs', statistic, cells - WHEEL_SIZE, alpha,
+                                  enough=n / cells >= MIN_EXPECTED)
+
+
+class RunsAccumulator:
+    """Rachas de Wald–Wolfowitz de giros altos (>18) / bajos (<18)."""
+
+    def __init__(self):
+        self.high = 0
+        self.low = 0
+        self.runs = 0
+        self.first: Optional[bool] = None
+        self.last: Optional[bool] = None
+
+    @classmethod
+    def from_chunk(cls, chunk: np.ndarray) -> 'RunsAccumulator':
+        acc = cls()
+        symbols = chunk[chunk != RUNS_MEDIAN] > RUNS_MEDIAN
+        if symbols.size:
+            acc.high = int(np.count_nonzero(symbols))
+            acc.low = symbols.size - acc.high
+            acc.runs = 1 + int(np.count_nonzero(symbols[1:] != symbols[:-1]))
+            acc.first, acc.last = bool(symbols[0]), bool(symbols[-1])
+        return acc
+
+    def merge(self, other: 'RunsAccumulator') -> 'RunsAccumulator':
+        if other.first is None:
+            return self
+        self.runs += other.runs
+        if self.last is None:
+            self.first = other.first
+        elif self.last == other.first:
+            # La última racha de este tramo sigue en el siguiente
+            self.runs -= 1
+        self.high += other.high
+        self.low += other.low
+        self.last = other.last
+        return self
+
+    def result(self, alpha: float) -> Dict:
+        n = self.high + self.low
+        enough = self.high >= 2 and self.low >= 2
+        if enough:
+            mean = 2 * self.high * self.low / n + 1
+            variance = (mean - 1) * (mean - 2) / (n - 1)
+            z = (self.runs - mean) / math.sqrt(variance)
+        else:
+            mean, z = 0.0, 0.0
+        result = _normal_result('Runs Test', z, alpha, enough)
+        result.update({'runs': self.runs, 'expected_runs': mean})
+        return result
+
+
+class GapAccumulator:
+    """Gaps (giros sin salir) entre ceros consecutivos."""
+
+    def __init__(self):
+        self.length = 0
+        self.hits = 0
+        # Giros antes del primer cero y después del último (todo el tramo si no hay ceros)
+        self.leading = 0
+        self.trailing = 0
+        self.histogram = np.zeros(MAX_GAP + 1, dtype=np.int64)
+
+    @classmethod
+    def from_chunk(cls, chunk: np.ndarray) -> 'GapAccumulator':
+        acc = cls()
+        positions = np.flatnonzero(chunk == 0)
+        acc.length = chunk.size
+        acc.hits = positions.size
+        if positions.size:
+            acc.leading = int(positions[0])
+            acc.trailing = chunk.size - 1 - int(positions[-1])
+            gaps = np.minimum(np.diff(positions) - 1, MAX_GAP)
+            acc.histogram += np.bincount(gaps, minlength=MAX_GAP + 1)
+        else:
+            acc.leading = acc.trailing = chunk.size
+        return acc
+
+    def merge(self, other: 'GapAccumulator') -> 'GapAccumulator':
+        if not other.length:
+            return self
+        if self.hits and other.hits:
+            self.histogram[min(self.trailing + other.leading, MAX_GAP)] += 1
+        if not self.hits:
+            self.leading += other.leading
+        self.trailing = other.trailing if other.hits else self.trailing + other.length
+        self.histogram += other.histogram
+        self.length += other.length
+        self.hits += other.hits
+        return self
+
+    def result(self, alpha: float) -> Dict:
+        gaps = int(self.histogram.sum())
+        p = 1 / WHEEL_SIZE
+        # Bins individuales mientras el esperado sea >= 5; el resto va a la cola
+        bins = 0
+        while bins < MAX_GAP and gaps * p * (1 - p) ** bins >= MIN_EXPECTED:
+            bins += 1
+        enough = bins >= 1 and gaps * (1 - p) ** bins >= MIN_EXPECTED
+        if enough:
+            expected = gaps * p * (1 - p) ** np.arange(bins)
+            expected = np.append(expected, gaps * (1 - p) ** bins)
+            observed = np.append(self.histogram[:bins], self.histogram[bins:].sum())
+            statistic = float(((observed - expected) ** 2 / expected).sum())
+        else:
+            statistic = 0.0
+        result = _chi_square_result('Gap Test', statistic, bins, alpha, enough)
+        result.update({'target': 0, 'gaps': gaps})
+        return result
+
+
+class LagAccumulator:
+    """Sumas para la autocorrelación lag 1..`max_lag`.
+
+    Guarda los primeros y últimos `max_lag` giros del tramo para sumar, al
+    unir tramos, los productos que cruzan la frontera.
+    """
+
+    def __init__(self, max_lag: int):
+        self.max_lag = max_lag
+        self.n = 0
+        self.total = 0
+        self.squares = 0
+        self.cross = [0] * max_lag
+        self.head = np.zeros(0, dtype=np.int64)
+        self.tail = np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_chunk(cls, chunk: np.ndarray, max_lag: int) -> 'LagAccumulator':
+        acc = cls(max_lag)
+        # float64 usa BLAS y es exacto: cada suma parcial es entera y < 2^53
+        x = chunk.astype(np.float64)
+        acc.n = chunk.size
+        acc.total = int(x.sum())
+        acc.squares = int(x @ x)
+        for lag in range(1, min(max_lag, chunk.size - 1) + 1):
+            acc.cross[lag - 1] = int(x[:-lag] @ x[lag:])
+        acc.head = chunk[:max_lag].astype(np.int64)
+        acc.tail = chunk[-max_lag:].astype(np.int64)
+        return acc
+
+    def merge(self, other: 'LagAccumulator') -> 'LagAccumulator':
+        if not other.n:
+            return self
+        if self.n:
+            # boundary[k-1]: productos a lag k entre el final de este tramo y el inicio del otro
+            boundary = np.convolve(self.tail[::-1], other.head)
+            for lag in range(1, min(self.max_lag, boundary.size) + 1):
+                self.cross[lag - 1] += int(boundary[lag - 1])
+        self.cross = [a + b for a, b in zip(self.cross, other.cross)]
+        if self.head.size < self.max_lag:
+            self.head = np.concatenate([self.head, other.head])[:self.max_lag]
+        self.tail = np.concatenate([self.tail, other.tail])[-self.max_lag:]
+        self.n += other.n
+        self.total += other.total
+        self.squares += other.squares
+        return self
+
+    def coefficient(self, lag: int) -> float:
+        """Autocorrelación muestral r_k (aritmética entera exacta hasta la división)."""
+        n, total = self.n, self.total
+        if n <= lag:
+            return 0.0
+        # Sumas de x_i para i < n-k y para i >= k
+        first = total - int(self.tail[-lag:].sum())
+        last = total - int(self.head[:lag].sum())
+        numerator = n * n * self.cross[lag - 1] - n * total * (first + last) + (n - lag) * total * total
+        denominator = n * (n * self.squares - total * total)
+        return numerator / denominator if denominator else 0.0
+
+    def result(self, lag: int, alpha: float) -> Dict:
+        coefficient = self.coefficient(lag)
+        result = _normal_result('Autocorrelation', coefficient * math.sqrt(self.n), alpha,
+                                enough=self.n > lag + 1)
+        result.update({'lag': lag, 'coefficient': coefficient})
+        return result
+
+
+class StreamStats:
+    """Todos los acumuladores de un tramo contiguo de giros."""
+
+    def __init__(self, lags: Sequence[int] = DEFAULT_LAGS):
+        if not lags or min(lags) < 1:
+            raise ValueError("lags deben ser enteros positivos")
+        self.lags = tuple(sorted(set(lags)))
+        self.frequencies = FrequencyAccumulator()
+        self.runs = RunsAccumulator()
+        self.gaps = GapAccumulator()
+        self.autocorrelation = LagAccumulator(max(self.lags))
+
+    @classmethod
+    def from_chunk(cls, chunk: np.ndarray, lags: Sequence[int] = DEFAULT_LAGS) -> 'StreamStats':
+        chunk = np.asarray(chunk)
+        if chunk.size and (int(chunk.min()) < 0 or int(chunk.max()) >= WHEEL_SIZE):
+            raise ValueError("Valores fuera de la ruleta europea (0-36)")
+        stats = cls(lags)
+        stats.frequencies = FrequencyAccumulator.from_chunk(chunk)
+        stats.runs = RunsAccumulator.from_chunk(chunk)
+        stats.gaps = GapAccumulator.from_chunk(chunk)
+        stats.autocorrelation = LagAccumulator.from_chunk(chunk, max(stats.lags))
+        return stats
+
+    @property
+    def n(self) -> int:
+        return self.autocorrelation.n
+
+    def update(self, chunk: np.ndarray) -> 'StreamStats':
+        """Agrega el chunk siguiente de la secuencia."""
+        return self.merge(StreamStats.from_chunk(chunk, self.lags))
+
+    def merge(self, other: 'StreamStats') -> 'StreamStats':
+        """Une el tramo `other`, que va inmediatamente después de este."""
+        if other.lags != self.lags:
+            raise ValueError("No se pueden unir acumuladores con lags distintos")
+        self.frequencies.merge(other.frequencies)
+        self.runs.merge(other.runs)
+        self.gaps.merge(other.gaps)
+        self.autocorrelation.merge(other.autocorrelation)
+        return self
+
+    def report(self, alpha: float = DEFAULT_ALPHA) -> Dict:
+        """Reporte de cumplimiento en el formato de `RNGValidator.full_report`."""
+        tests = [
+            self.frequencies.chi_square(alpha),
+            self.runs.result(alpha),
+            self.frequencies.serial(alpha),
+            self.gaps.result(alpha),
+        ] + [self.autocorrelation.result(lag, alpha) for lag in self.lags]
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'sample_size': self.n,
+            'tests': tests,
+            'overall_passed': all(test['passed'] for test in tests),
+            'confidence_level': 1 - alpha,
+            'frequencies': self.frequencies.counts().tolist(),
+        }
+
+
+def scan_chunks(chunks: Iterable[np.ndarray], lags: Sequence[int] = DEFAULT_LAGS) -> StreamStats:
+    """Acumula una secuencia de chunks consecutivos (p. ej. `SpinEngine.chunks`)."""
+    stats = StreamStats(lags)
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats
+
+
+def open_samples(path: str) -> np.ndarray:
+    """Giros de `path` mapeados en memoria (`.npy`, log de giros o un byte por giro)."""
+    if path.endswith(SPIN_LOG_SUFFIX):
+        return SpinLog(path).spins
+    if path.endswith('.npy'):
+        samples = np.load(path, mmap_mode='r')
+        if samples.ndim != 1 or samples.dtype.kind not in 'iu':
+            raise ValueError(f"{path}: se espera un array 1-D de enteros")
+        return samples
+    if not os.path.getsize(path):
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode='r')
+
+
+def _scan_range(path: str, start: int, stop: int, chunk_size: int, lags: Sequence[int]) -> StreamStats:
+    samples = open_samples(path)
+    stats = StreamStats(lags)
+    for offset in range(start, stop, chunk_size):
+        stats.update(samples[offset:min(offset + chunk_size, stop)])
+    return stats
+
+
+def scan_file(path: str, workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              lags: Sequence[int] = DEFAULT_LAGS) -> StreamStats:
+    """Acumula un archivo de giros; con `workers` > 1 reparte tramos en procesos.
+
+    Cada proceso mapea el archivo por su cuenta (solo viajan los acumuladores)
+    y los tramos se unen en orden, así que el resultado es idéntico al de un
+    solo proceso.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size debe ser positivo")
+    total = len(open_samples(path))
+    # Unos pocos tramos por proceso para repartir bien la carga
+    span = max(chunk_size, -(-total // (max(workers, 1) * 4)))
+    tasks = [(path, start, min(start + span, total), chunk_size, lags)
+             for start in range(0, total, span)]
+    stats = StreamStats(lags)
+    for part in run_tasks(_scan_range, tasks, workers):
+        stats.merge(part)
+    return stats
+
+
+def _scan_generated(root, index: int, size: int, bit_generator: str, lags: Sequence[int]) -> StreamStats:
+    return StreamStats.from_chunk(task_engine(root, index, bit_generator=bit_generator).generate(size), lags)
+
+
+def scan_generated(total: int, seed=None, bit_generator: str = 'pcg64', workers: int = 1,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   lags: Sequence[int] = DEFAULT_LAGS) -> StreamStats:
+    """Acumula `total` giros generados en procesos, un stream derivado de `seed` por chunk.
+
+    Con la misma semilla y `chunk_size` la muestra (y el reporte) es la misma
+    con cualquier número de `workers`.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size debe ser positivo")
+    root = root_sequence(seed, bit_generator)
+    tasks = [(root, index, min(chunk_size, total - start), bit_generator, lags)
+             for index, start in enumerate(range(0, total, chunk_size))]
+    stats = StreamStats(lags)
+    for part in run_tasks(_scan_generated, tasks, workers):
+        stats.merge(part)
+    return stats
+
+
+def _chi_square_result(name: str, statistic: float, df: int, alpha: float, enough: bool) -> Dict:
+    p_value = chi_square_sf(statistic, df) if enough else None
+    result = {'test': name, 'statistic': statistic, 'df': df, 'p_value': p_value,
+              'passed': enough and p_value > alpha}
+    if not enough:
+        result['note'] = 'Muestra insuficiente'
+    return result
+
+
+def _normal_result(name: str, z: float, alpha: float, enough: bool) -> Dict:
+    p_value = math.erfc(abs(z) / math.sqrt(2)) if enough else None
+    result = {'test': name, 'statistic': z, 'p_value': p_value,
+              'passed': enough and p_value > alpha}
+    if not enough:
+        result['note'] = 'Muestra insuficiente'
+    return result
+
+
+def chi_square_sf(statistic: float, df: int) -> float:
+    """P(X ≥ statistic) para X ~ chi-cuadrado con `df` grados de libertad."""
+    if statistic <= 0:
+        return 1.0
+    return _gamma_q(df / 2, statistic / 2)
+
+
+def _gamma_q(a: float, x: float) -> float:
+    """Gamma incompleta regularizada superior Q(a, x) (serie o fracción continua)."""
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1 / a
+        denominator = a
+        while abs(term) > abs(total) * 1e-15:
+            denominator += 1
+            term *= x / denominator
+            total += term
+        return max(0.0, 1 - total * math.exp(log_prefix))
+    # Fracción continua de Lentz
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    i = 0
+    while True:
+        i += 1
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h
+
+
+def print_report(report: Dict):
+    """Resumen legible del reporte."""
+    status = '✅ PASSED' if report['overall_passed'] else '❌ FAILED'
+    print(f"🎲 {report['sample_size']:,} giros — {status} "
+          f"(confianza {report['confidence_level'] * 100:g}%)")
+    for test in report['tests']:
+        mark = '✅' if test['passed'] else '❌'
+        name = test['test'] + (f" (lag {test['lag']})" if 'lag' in test else '')
+        p_value = 'n/a' if test['p_value'] is None else f"{test['p_value']:.4f}"
+        print(f"   {mark} {name:<24} estadístico {test['statistic']:>12.4f}  p = {p_value}")
+
+
+def main():
+    """Punto de entrada principal."""
+    from spin_engine import BIT_GENERATORS
+
+    parser = argparse.ArgumentParser(description='Validación de cumplimiento del RNG en streaming')
+    parser.add_argument('path', nargs='?', help='Archivo de giros (.npy, .tkspin o un byte por giro)')
+    parser.add_argument('--generate', type=int, default=0, metavar='N',
+                        help='Validar N giros generados al vuelo en lugar de un archivo')
+    parser.add_argument('--generator', choices=BIT_GENERATORS, default='pcg64',
+                        help='Bit generator para --generate')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla para --generate')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Procesos (el resultado no depende de cuántos)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Giros por chunk')
+    parser.add_argument('--lags', type=int, nargs='+', default=list(DEFAULT_LAGS),
+                        help='Lags de autocorrelación')
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA, help='Nivel de significancia')
+    parser.add_argument('--output', type=str, default=None, help='Escribir el reporte JSON')
+    args = parser.parse_args()
+
+    if bool(args.path) == bool(args.generate):
+        parser.error('Indica un archivo o --generate N')
+
+    start = time.perf_counter()
+    if args.generate:
+        root = root_sequence(args.seed, args.generator)
+        stats = scan_generated(args.generate, root, args.generator, args.workers,
+                               args.chunk_size, args.lags)
+        source = args.generator if args.generator == 'secrets' else f'{args.generator}:{root.entropy}'
+    else:
+        stats = scan_file(args.path, args.workers, args.chunk_size, args.lags)
+        source = args.path
+    report = stats.report(args.alpha)
+    report['source'] = source
+    report['seconds'] = round(time.perf_counter() - start, 3)
+
+    print_report(report)
+    print(f"   ⏱️  {report['seconds']}s ({report['sample_size'] / max(report['seconds'], 1e-9) / 1e6:.0f} M giros/s)")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Reporte: {args.output}")
+    return 0 if report['overall_passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Motor vectorizado de giros - Tokyo Roulette
+
+Genera giros de ruleta europea (0-36), los mismos que
+`RouletteLogic.generateSpin` en `lib/roulette_logic.dart`, pero en bloque:
+arrays `uint8` de NumPy en chunks de tamaño fijo, con memoria constante sin
+importar cuántos millones de giros se pidan.
+
+Generadores disponibles:
+- `pcg64` / `philox`: PRNG de NumPy, reproducibles con semilla (análisis masivo).
+- `secrets`: entropía del sistema operativo (`os.urandom`), equivalente a
+  `Random.secure()` de la app. No admite semilla.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from wheel import WHEEL_SIZE
+
+# Giros por chunk (1 MiB de uint8)
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+BIT_GENERATORS = ('pcg64', 'philox', 'secrets')
+
+# Mayor múltiplo de 37 que cabe en un byte: los bytes >= 222 se descartan
+# para que `byte % 37` sea uniforme
+_SECRETS_LIMIT = (256 // WHEEL_SIZE) * WHEEL_SIZE
+
+
+def make_generator(bit_generator: str = 'pcg64',
+                   seed=None) -> Optional[np.random.Generator]:
+    """Generator de NumPy para `bit_generator`; None en modo `secrets`."""
+    if bit_generator not in BIT_GENERATORS:
+        raise ValueError(f"Generador desconocido: {bit_generator} (opciones: {', '.join(BIT_GENERATORS)})")
+    if bit_generator == 'secrets':
+        if seed is not None:
+            raise ValueError("El modo 'secrets' usa entropía del sistema y no admite semilla")
+        return None
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    if bit_generator == 'philox':
+        return np.random.Generator(np.random.Philox(seed_sequence))
+    return np.random.Generator(np.random.PCG64(seed_sequence))
+
+
+def secure_spins(count: int) -> np.ndarray:
+    """`count` giros con entropía del sistema operativo (rechazo de bytes >= 222)."""
+    out = np.empty(count, dtype=np.uint8)
+    filled = 0
+    while filled < count:
+        missing = count - filled
+        # ~13% de los bytes se rechazan; se pide un poco más para evitar vueltas
+        raw = np.frombuffer(os.urandom(missing + missing // 6 + 16), dtype=np.uint8)
+        accepted = raw[raw < _SECRETS_LIMIT][:missing]
+        np.remainder(accepted, WHEEL_SIZE, out=out[filled:filled + len(accepted)])
+        filled += len(accepted)
+    return out
+
+
+class SpinEngine:
+    """Generador de giros en bloque con un bit generator seleccionable."""
+
+    def __init__(self, bit_generator: str = 'pcg64', seed=None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size debe ser positivo")
+        self.bit_generator = bit_generator
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.rng = make_generator(bit_generator, seed)
+
+    def generate(self, count: int) -> np.ndarray:
+        """`count` giros como un único array `uint8`."""
+        if count < 0:
+            raise ValueError("count no puede ser negativo")
+        if self.rng is None:
+            return secure_spins(count)
+        return self.rng.integers(0, WHEEL_SIZE, size=count, dtype=np.uint8)
+
+    def spin(self) -> int:
+        """Un giro, como `RouletteLogic.generateSpin`."""
+        return int(self.generate(1)[0])
+
+    def chunks(self, total: int) -> Iterator[np.ndarray]:
+        """`total` giros en chunks de `chunk_size` (el último puede ser menor).
+
+        Solo un chunk vive a la vez, así que la memoria no depende de `total`.
+        Con semilla, la secuencia es reproducible para el mismo `chunk_size`
+        (NumPy agrupa los bits de los uint8 por llamada).
+        """
+        remaining = total
+        while remaining > 0:
+            size = min(self.chunk_size, remaining)
+            yield self.generate(size)
+            remaining -= size
+
+
+def benchmark(bit_generator: str = 'pcg64', total: int = 100_000_000,
+              chunk_size: int = DEFAULT_CHUNK_SIZE, seed=None) -> Dict:
+    """Mide giros/s en un núcleo consumiendo `total` giros en chunks."""
+    engine = SpinEngine(bit_generator, seed=seed, chunk_size=chunk_size)
+    checksum = 0
+    start = time.perf_counter()
+    for chunk in engine.chunks(total):
+        # Tocar el chunk evita medir solo la asignación
+        checksum += int(chunk[-1])
+    seconds = time.perf_counter() - start
+    return {
+        'bit_generator': bit_generator,
+        'spins': total,
+        'chunk_size': chunk_size,
+        'seconds': round(seconds, 3),
+        'spins_per_second': round(total / seconds) if seconds > 0 else None,
+    }
+
+
+def main():
+    """Punto de entrada principal."""
+    parser = argparse.ArgumentParser(description='Motor vectorizado de giros de ruleta europea')
+    parser.add_argument('--generator', choices=BIT_GENERATORS + ('all',), default='pcg64',
+                        help='Bit generator (default: pcg64)')
+    parser.add_argument('--spins', type=int, default=10_000_000, help='Giros a generar')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Giros por chunk (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla (no aplica a secrets)')
+    parser.add_argument('--benchmark', action='store_true', help='Medir giros/s por núcleo')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Escribir los giros como bytes crudos (1 byte por giro)')
+    args = parser.parse_args()
+
+    generators = BIT_GENERATORS if args.generator == 'all' else (args.generator,)
+
+    if args.benchmark:
+        print(f"🎰 Benchmark: {args.spins:,} giros, chunks de {args.chunk_size:,}")
+        for name in generators:
+            result = benchmark(name, args.spins, args.chunk_size,
+                               seed=None if name == 'secrets' else args.seed)
+            print(f"   {name:<8} {result['seconds']:>8.2f}s  "
+                  f"{result['spins_per_second'] / 1e6:>8.1f} M giros/s por núcleo")
+        return
+
+    if not args.output:
+        parser.error('Indica --output o --benchmark')
+    if len(generators) > 1:
+        parser.error("--generator all solo aplica a --benchmark")
+    engine = SpinEngine(generators[0], seed=args.seed, chunk_size=args.chunk_size)
+    with open(args.output, 'wb') as f:
+        for chunk in engine.chunks(args.spins):
+            chunk.tofile(f)
+    print(f"✅ {args.spins:,} giros escritos en {args.output}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Historial de giros en disco (append-only) - Tokyo Roulette
+
+Formato compacto para años de historial de varias mesas: un byte por giro
+en lugar de una lista de ints. Un log son dos archivos:
+
+- `<ruta>`: cabecera de 64 bytes y luego los giros, un `uint8` cada uno,
+  contiguos. Se lee como un `np.memmap` sin copiar nada.
+- `<ruta>.idx`: cabecera de 64 bytes y un registro fijo por bloque
+  (`BLOCK_DTYPE`): offset y cantidad de giros, mesa, sesión, timestamps del
+  primer y último giro (ns) y CRC32 de los giros del bloque.
+
+Un bloque es una corrida de giros de la misma mesa y sesión. Los timestamps
+se guardan por bloque; al exportar, los giros intermedios se interpolan.
+
+Escritura segura ante caídas: el escritor agrupa giros en memoria y en cada
+`flush` escribe y sincroniza (fsync) primero los giros y después los
+registros del índice. El índice es la fuente de verdad: al abrir, los giros
+sin registro y los registros a medio escribir se descartan.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from wheel import WHEEL_SIZE
+
+SPIN_LOG_SUFFIX = '.tkspin'
+INDEX_SUFFIX = '.idx'
+
+HEADER_SIZE = 64
+DATA_MAGIC = b'TKSPIN\x00\x01'
+INDEX_MAGIC = b'TKSPIDX\x01'
+VERSION = 1
+
+BLOCK_DTYPE = np.dtype([
+    ('offset', '<u8'),
+    ('count', '<u4'),
+    ('table', '<u2'),
+    ('flags', '<u2'),
+    ('session', '<u8'),
+    ('start_ns', '<i8'),
+    ('end_ns', '<i8'),
+    ('crc32', '<u4'),
+    ('reserved', '<u4'),
+])
+
+# Giros en memoria antes de forzar un flush + fsync
+DEFAULT_SYNC_EVERY = 1 << 16
+# Segundos máximos entre fsync mientras se siguen agregando giros
+DEFAULT_SYNC_INTERVAL = 1.0
+# Giros máximos por bloque
+DEFAULT_MAX_BLOCK = 1 << 20
+
+CSV_FIELDS = ('session', 'timestamp', 'number', 'table')
+# Filas por lote al importar/exportar
+DEFAULT_BATCH = 1 << 16
+
+
+def _header(magic: bytes) -> bytes:
+    header = magic + VERSION.to_bytes(4, 'little') + BLOCK_DTYPE.itemsize.to_bytes(4, 'little')
+    return header.ljust(HEADER_SIZE, b'\x00')
+
+
+def _check_header(path: str, magic: bytes):
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or header[:8] != magic:
+        raise ValueError(f"{path}: no es un log de giros")
+    version = int.from_bytes(header[8:12], 'little')
+    if version != VERSION:
+        raise ValueError(f"{path}: versión {version} no soportada")
+
+
+def _committed(path: str) -> Tuple[np.ndarray, int]:
+    """Bloques completos del índice y giros que cubren."""
+    index_path = path + INDEX_SUFFIX
+    _check_header(path, DATA_MAGIC)
+    _check_header(index_path, INDEX_MAGIC)
+    records = (os.path.getsize(index_path) - HEADER_SIZE) // BLOCK_DTYPE.itemsize
+    if records:
+        blocks = np.memmap(index_path, dtype=BLOCK_DTYPE, mode='r',
+                           offset=HEADER_SIZE, shape=(records,))
+    else:
+        blocks = np.zeros(0, dtype=BLOCK_DTYPE)
+    total = int(blocks['offset'][-1] + blocks['count'][-1]) if records else 0
+    if os.path.getsize(path) - HEADER_SIZE < total:
+        raise ValueError(f"{path}: faltan giros indexados (archivo truncado)")
+    return blocks, total
+
+
+class SpinLogWriter:
+    """Escritor append-only con fsync por lotes."""
+
+    def __init__(self, path: str, sync_every: int = DEFAULT_SYNC_EVERY,
+                 sync_interval: float = DEFAULT_SYNC_INTERVAL,
+                 max_block: int = DEFAULT_MAX_BLOCK):
+        if sync_every <= 0 or max_block <= 0:
+            raise ValueError("sync_every y max_block deben ser positivos")
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.max_block = max_block
+        index_path = path + INDEX_SUFFIX
+        if not os.path.exists(path):
+            for target, magic in ((path, DATA_MAGIC), (index_path, INDEX_MAGIC)):
+                with open(target, 'wb') as f:
+                    f.write(_header(magic))
+                    f.flush()
+                    os.fsync(f.fileno())
+        blocks, self.total = _committed(path)
+        records = len(blocks)
+        del blocks
+        # Recuperación: descartar la cola que no llegó a confirmarse
+        os.truncate(path, HEADER_SIZE + self.total)
+        os.truncate(index_path, HEADER_SIZE + records * BLOCK_DTYPE.itemsize)
+        self._data = open(path, 'ab')
+        self._index = open(index_path, 'ab')
+        self._pending = bytearray()
+        self._blocks = []
+        self._block: Optional[list] = None
+        self._last_sync = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, session: int, number: int, timestamp_ns: Optional[int] = None, table: int = 0):
+        """Agrega un giro de `session` en `table`."""
+        if not 0 <= number < WHEEL_SIZE:
+            raise ValueError(f"Número fuera de la ruleta europea: {number}")
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns()
+        block = self._block
+        if block is None or block[0] != session or block[1] != table or block[5] >= self.max_block:
+            self._close_block()
+            # [sesión, mesa, inicio_ns, fin_ns, offset en _pending, giros]
+            block = self._block = [session, table, timestamp_ns, timestamp_ns, len(self._pending), 0]
+        block[3] = timestamp_ns
+        block[5] += 1
+        self._pending.append(number)
+        self._maybe_sync()
+
+    def extend(self, session: int, numbers, start_ns: Optional[int] = None,
+               end_ns: Optional[int] = None, table: int = 0):
+        """Agrega varios giros de una sesión de una vez (p. ej. un array uint8)."""
+        numbers = np.asarray(numbers)
+        if numbers.size and (int(numbers.min()) < 0 or int(numbers.max()) >= WHEEL_SIZE):
+            raise ValueError("Valores fuera de la ruleta europea (0-36)")
+        start_ns = time.time_ns() if start_ns is None else start_ns
+        end_ns = start_ns if end_ns is None else end_ns
+        data = numbers.astype(np.uint8, copy=False)
+        for first in range(0, data.size, self.max_block):
+            part = data[first:first + self.max_block]
+            self._close_block()
+            # Timestamps de cada parte interpolados entre start_ns y end_ns
+            last = first + part.size - 1
+            self._block = [session, table, _interpolate(start_ns, end_ns, first, data.size),
+                           _interpolate(start_ns, end_ns, last, data.size),
+                           len(self._pending), part.size]
+            self._pending += part.tobytes()
+            self._close_block()
+            self._maybe_sync()
+
+    def _close_block(self):
+        block, self._block = self._block, None
+        if block is None or not block[5]:
+            return
+        session, table, start_ns, end_ns, start, count = block
+        crc = zlib.crc32(memoryview(self._pending)[start:start + count])
+        self._blocks.append((self.total + start, count, table, 0, session, start_ns, end_ns, crc, 0))
+
+    def _maybe_sync(self):
+        if (len(self._pending) >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_interval):
+            self.flush()
+
+    def flush(self):
+        """Confirma en disco todo lo agregado (giros primero, índice después)."""
+        self._close_block()
+        if self._pending:
+            self._data.write(self._pending)
+            self._data.flush()
+            os.fsync(self._data.fileno())
+            records = np.array(self._blocks, dtype=BLOCK_DTYPE)
+            self._index.write(records.tobytes())
+            self._index.flush()
+            os.fsync(self._index.fileno())
+            self.total += len(self._pending)
+            self._pending = bytearray()
+            self._blocks = []
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._data.closed:
+            return
+        self.flush()
+        self._data.close()
+        self._index.close()
+
+
+def _interpolate(start_ns: int, end_ns: int, position: int, count: int) -> int:
+    if count <= 1:
+        return start_ns
+    return start_ns + (end_ns - start_ns) * position // (count - 1)
+
+
+class SpinLog:
+    """Lector de un log: giros e índice como memmaps de solo lectura."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.blocks, total = _committed(path)
+        if total:
+            self.spins = np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER_SIZE, shape=(total,))
+        else:
+            self.spins = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return self.spins.size
+
+    def block(self, index: int) -> np.ndarray:
+        """Giros del bloque `index` (vista, sin copia)."""
+        block = self.blocks[index]
+        return self.spins[int(block['offset']):int(block['offset'] + block['count'])]
+
+    def sessions(self) -> np.ndarray:
+        """Ids de sesión presentes, ordenados."""
+        return np.unique(self.blocks['session'])
+
+    def session_blocks(self, session: int, table: Optional[int] = None) -> np.ndarray:
+        """Índices de los bloques de una sesión, en orden de escritura."""
+        mask = self.blocks['session'] == session
+        if table is not None:
+            mask &= self.blocks['table'] == table
+        return np.flatnonzero(mask)
+
+    def session(self, session: int, table: Optional[int] = None) -> np.ndarray:
+        """Giros de una sesión (vista si ocupa un solo bloque)."""
+        indices = self.session_blocks(session, table)
+        if indices.size == 1:
+            return self.block(int(indices[0]))
+        return np.concatenate([self.block(int(i)) for i in indices]) if indices.size \
+            else np.zeros(0, dtype=np.uint8)
+
+    def verify(self) -> bool:
+        """Comprueba el CRC32 de cada bloque."""
+        return all(zlib.crc32(self.block(i)) == int(self.blocks['crc32'][i])
+                   for i in range(len(self.blocks)))
+
+    def columns(self, batch_spins: int = DEFAULT_BATCH) -> Iterator[Dict[str, np.ndarray]]:
+        """Columnas session, timestamp, number y table por lotes de bloques enteros."""
+        first = 0
+        ends = np.cumsum(self.blocks['count'], dtype=np.int64)
+        while first < len(self.blocks):
+            base = int(ends[first - 1]) if first else 0
+            last = max(first + 1, int(np.searchsorted(ends, base + batch_spins, side='right')))
+            blocks = self.blocks[first:last]
+            counts = blocks['count'].astype(np.int64)
+            starts = np.repeat(np.cumsum(counts) - counts, counts)
+            positions = np.arange(starts.size) - starts
+            yield {
+                'session': np.repeat(blocks['session'], counts),
+                'timestamp': _interpolate_many(np.repeat(blocks['start_ns'], counts),
+                                               np.repeat(blocks['end_ns'], counts),
+                                               positions, np.repeat(counts, counts)),
+                'number': self.spins[base:int(ends[last - 1])],
+                'table': np.repeat(blocks['table'], counts),
+            }
+            first = last
+
+
+def _interpolate_many(start_ns, end_ns, positions, counts) -> np.ndarray:
+    """`_interpolate` vectorizado, exacto en int64 (sin desbordar span × posición)."""
+    steps = np.maximum(counts - 1, 1)
+    span = end_ns - start_ns
+    return start_ns + span // steps * positions + span % steps * positions // steps
+
+
+def _parse_timestamp(value) -> int:
+    """ns desde epoch a partir de un entero (ns) o un texto ISO 8601."""
+    if isinstance(value, int):
+        return value
+    text = str(value).strip()
+    if text.lstrip('-').isdigit():
+        return int(text)
+    return int(datetime.fromisoformat(text.replace('Z', '+00:00')).timestamp() * 1_000_000_000)
+
+
+def _integers(values, count: int, dtype, default: Optional[int] = None,
+              name: str = '', first_row: int = 1) -> np.ndarray:
+    """Columna de enteros (timestamps también en ISO 8601).
+
+    Los vacíos y None valen `default`; sin `default` la columna es
+    obligatoria y un vacío es un ValueError con la fila (1 = primera de datos).
+    """
+    if values is None:
+        return np.full(count, default, dtype=dtype)
+    try:
+        return np.fromiter(map(int, values), dtype=dtype, count=count)
+    except (TypeError, ValueError):
+        pass
+    column = np.empty(count, dtype=dtype)
+    for i, value in enumerate(values):
+        if value is not None and str(value).strip():
+            column[i] = _parse_timestamp(value)
+        elif default is None:
+            raise ValueError(f"fila {first_row + i}: columna {name} vacía")
+        else:
+            column[i] = default
+    return column
+
+
+def _read_batches(path: str, batch: int) -> Iterator[Tuple]:
+    """(filas, columnas session/timestamp/number/table) de un CSV o NDJSON por lotes.
+
+    Las columnas que faltan se devuelven como None.
+    """
+    with open(path, newline='') as f:
+        if path.endswith(('.ndjson', '.jsonl')):
+            records = (json.loads(line) for line in f if line.strip())
+            rows = ((r['session'], r.get('timestamp'), r['number'], r.get('table')) for r in records)
+            fields = range(len(CSV_FIELDS))
+        else:
+            rows = csv.reader(f)
+            header = next(rows, [])
+            missing = {'session', 'number'} - set(header)
+            if missing:
+                raise ValueError(f"{path}: faltan columnas {', '.join(sorted(missing))}")
+            fields = [header.index(name) if name in header else None for name in CSV_FIELDS]
+        while True:
+            chunk = [row for row in itertools.islice(rows, batch) if row]
+            if not chunk:
+                return
+            columns = list(zip(*chunk))
+            yield len(chunk), tuple(columns[i] if i is not None else None for i in fields)
+
+
+def import_file(path: str, log_path: str, batch: int = DEFAULT_BATCH, **writer_options) -> int:
+    """Importa un CSV (con cabecera) o NDJSON en streaming, por lotes de filas.
+
+    Columnas: session, number y opcionalmente timestamp (ns o ISO 8601) y
+    table. Cada corrida de filas de la misma sesión y mesa es un bloque.
+    """
+    count = 0
+    with SpinLogWriter(log_path, **writer_options) as writer:
+        for rows, (sessions, timestamps, numbers, tables) in _read_batches(path, batch):
+            sessions = _integers(sessions, rows, np.uint64, name='session', first_row=count + 1)
+            numbers = _integers(numbers, rows, np.int64, name='number', first_row=count + 1)
+            tables = _integers(tables, rows, np.uint16, default=0)
+            timestamps = _integers(timestamps, rows, np.int64, default=time.time_ns())
+            changes = np.flatnonzero((sessions[1:] != sessions[:-1]) | (tables[1:] != tables[:-1])) + 1
+            bounds = np.concatenate([[0], changes, [sessions.size]])
+            for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+                writer.extend(int(sessions[a]), numbers[a:b], int(timestamps[a]),
+                              int(timestamps[b - 1]), int(tables[a]))
+            count += sessions.size
+    return count
+
+
+def export_file(log_path: str, path: str, batch: int = DEFAULT_BATCH) -> int:
+    """Exporta el log a CSV o NDJSON (según la extensión) en streaming."""
+    ndjson = path.endswith(('.ndjson', '.jsonl'))
+    row = ('{{"session": {}, "timestamp": {}, "number": {}, "table": {}}}' if ndjson
+           else '{},{},{},{}')
+    count = 0
+    with open(path, 'w') as f:
+        if not ndjson:
+            f.write(','.join(CSV_FIELDS) + '\n')
+        for columns in SpinLog(log_path).columns(batch):
+            values = [columns[name].tolist() for name in CSV_FIELDS]
+            f.write('\n'.join(map(row.format, *values)) + '\n')
+            count += len(values[0])
+    return count
+
+
+def main():
+    """Punto de entrada principal."""
+    parser = argparse.ArgumentParser(description='Historial de giros append-only')
+    sub = parser.add_subparsers(dest='command', required=True)
+    info = sub.add_parser('info', help='Resumen del log')
+    info.add_argument('log')
+    info.add_argument('--verify', action='store_true', help='Comprobar CRC de cada bloque')
+    importer = sub.add_parser('import', help='Importar CSV/NDJSON')
+    importer.add_argument('source')
+    importer.add_argument('log')
+    exporter = sub.add_parser('export', help='Exportar a CSV/NDJSON')
+    exporter.add_argument('log')
+    exporter.add_argument('target')
+    generate = sub.add_parser('generate', help='Agregar sesiones generadas con SpinEngine')
+    generate.add_argument('log')
+    generate.add_argument('--sessions', type=int, default=1000)
+    generate.add_argument('--spins', type=int, default=200, help='Giros por sesión')
+    generate.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == 'import':
+        count = import_file(args.source, args.log)
+        print(f"✅ {count:,} giros importados en {args.log} ({time.perf_counter() - start:.2f}s)")
+    elif args.command == 'export':
+        count = export_file(args.log, args.target)
+        print(f"✅ {count:,} giros exportados a {args.target} ({time.perf_counter() - start:.2f}s)")
+    elif args.command == 'generate':
+        from spin_engine import SpinEngine
+        engine = SpinEngine(seed=args.seed)
+        # Las sesiones nuevas siguen a las que ya hay en el log
+        existing = SpinLog(args.log).blocks['session'] if os.path.exists(args.log) else []
+        first = int(existing.max()) + 1 if len(existing) else 0
+        with SpinLogWriter(args.log) as writer:
+            for session in range(first, first + args.sessions):
+                writer.extend(session, engine.generate(args.spins))
+        print(f"✅ {args.sessions * args.spins:,} giros agregados a {args.log} "
+              f"({time.perf_counter() - start:.2f}s)")
+    else:
+        log = SpinLog(args.log)
+        print(f"📼 {args.log}: {len(log):,} giros, {len(log.blocks):,} bloques, "
+              f"{len(log.sessions()):,} sesiones, {len(np.unique(log.blocks['table']))} mesas")
+        if len(log.blocks):
+            first, last = int(log.blocks['start_ns'].min()), int(log.blocks['end_ns'].max())
+            print(f"   📅 {datetime.fromtimestamp(first / 1e9)} → {datetime.fromtimestamp(last / 1e9)}")
+        if args.verify:
+            ok = log.verify()
+            print("   ✅ CRC correctos" if ok else "   ❌ Bloques corruptos")
+            return 0 if ok else 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Motor vectorizado de sistemas de apuestas - Tokyo Roulette
+
+Generaliza `martingale_sim.py` a cualquier sistema de apuestas y tipo de
+apuesta. Cada sistema es un kernel de transición de estado:
+
+- Progresiones de estado finito (plana, Martingale, Martingale inversa /
+  Paroli, Fibonacci, D'Alembert): un nivel entero por sesión, con
+  `bets(niveles)` (apuesta en unidades base) y `advance(niveles, gano)`. El
+  motor evalúa cada kernel una sola vez sobre todos los niveles y concatena
+  los resultados en una única tabla de transición. Cada giro es entonces una
+  búsqueda sin ramas para todas las progresiones a la vez.
+- Labouchère: la línea de cada sesión es un buffer circular de una matriz
+  (sesiones × capacidad). Es el único sistema cuyo estado no cabe en un nivel.
+
+La grilla completa (sistema × tipo de apuesta × sesión) avanza en un único
+conjunto de arrays. Todas las celdas de una sesión ven los mismos giros
+(números aleatorios comunes), así que las diferencias entre sistemas no se
+deben al azar de cada muestra. Los pagos son los de la ruleta europea
+(`wheel.BET_WINS` / `wheel.BET_PAYOUTS`).
+
+Los límites de mesa y de sesión siguen las reglas de `martingale_sim.py`:
+- Si la siguiente apuesta supera `table_max`, el sistema vuelve a su estado
+  inicial (la pérdida queda asumida).
+- `stop_loss` / `take_profit` terminan la sesión al perder/ganar esa cantidad.
+- La sesión termina por ruina cuando el bankroll no cubre la siguiente apuesta.
+
+ADVERTENCIA: simulación educativa. Ningún sistema cambia la ventaja de la
+casa: la ganancia esperada por unidad apostada es -1/37 en todas las celdas.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from martingale_sim import OUTCOME_MAX_SPINS, OUTCOME_RUIN, OUTCOME_STOP_LOSS, OUTCOME_TAKE_PROFIT, summarize
+from parallel import root_sequence, run_tasks, task_engine
+from spin_engine import BIT_GENERATORS
+from wheel import BET_INDEX, BET_PAYOUTS, BET_WINS, WHEEL_SIZE
+
+# Sesiones por lote: cada una ocupa una fila por celda de la grilla
+DEFAULT_BATCH_SIZE = 1 << 13
+
+# Apuestas por encima de este tope (en unidades base) no las cubre ningún
+# bankroll realista: se tratan como ruina y evitan desbordar int64
+BET_CEILING = float(2 ** 53)
+
+DEFAULT_STRATEGIES = ('flat', 'martingale', 'reverse_martingale', 'fibonacci',
+                      'dalembert', 'labouchere')
+DEFAULT_BETS = ('red', 'black', 'first_dozen', 'first_column', '17')
+
+# Ganancia en unidades por unidad apostada, indexada por apuesta·37 + número
+# (pago si gana, -1 si pierde)
+RETURN_TABLE = np.where(BET_WINS, BET_PAYOUTS[:, None], -1).astype(np.int64).reshape(-1)
+
+
+class Progression:
+    """Sistema de estado finito: un nivel por sesión, 0 = estado inicial.
+
+    Las subclases definen `bets` y `advance` sobre arrays de niveles; el
+    motor nunca las llama giro a giro. Cada paso sube el nivel como mucho en
+    uno, así que tras N giros el nivel no pasa de N.
+    """
+
+    name = 'progression'
+
+    def bets(self, levels: np.ndarray) -> np.ndarray:
+        """Apuesta (unidades base, float) de cada nivel."""
+        raise NotImplementedError
+
+    def advance(self, levels: np.ndarray, win: bool) -> np.ndarray:
+        """Nivel siguiente tras ganar (`win`) o perder en cada nivel."""
+        raise NotImplementedError
+
+
+class Flat(Progression):
+    """Apuesta plana: siempre la apuesta base."""
+
+    name = 'flat'
+
+    def bets(self, levels):
+        return np.ones(levels.size)
+
+    def advance(self, levels, win):
+        return np.zeros_like(levels)
+
+
+class Martingale(Progression):
+    """Duplica al perder y vuelve a la base al ganar (como `MartingaleAdvisor`)."""
+
+    name = 'martingale'
+
+    def bets(self, levels):
+        # Más allá de 2^54 la apuesta queda igualmente en BET_CEILING
+        return np.exp2(np.minimum(levels, 54).astype(np.float64))
+
+    def advance(self, levels, win):
+        return np.zeros_like(levels) if win else levels + 1
+
+
+class ReverseMartingale(Progression):
+    """Paroli: duplica al ganar, hasta `wins` aciertos seguidos; vuelve a la base al perder."""
+
+    name = 'reverse_martingale'
+
+    def __init__(self, wins: int = 3):
+        if wins < 1:
+            raise ValueError("wins debe ser positivo")
+        self.wins = wins
+
+    def bets(self, levels):
+        return np.exp2(np.minimum(levels, 54).astype(np.float64))
+
+    def advance(self, levels, win):
+        if not win:
+            return np.zeros_like(levels)
+        return np.where(levels + 1 >= self.wins, 0, levels + 1)
+
+
+class Fibonacci(Progression):
+    """Avanza un paso en la sucesión (1, 1, 2, 3, 5…) al perder y retrocede dos al ganar."""
+
+    name = 'fibonacci'
+
+    def bets(self, levels):
+        size = int(levels.max()) + 1 if levels.size else 0
+        sequence = np.ones(max(size, 2))
+        for index in range(2, size):
+            sequence[index] = min(sequence[index - 1] + sequence[index - 2], BET_CEILING)
+        return sequence[levels]
+
+    def advance(self, levels, win):
+        return np.maximum(levels - 2, 0) if win else levels + 1
+
+
+class DAlembert(Progression):
+    """Suma una unidad al perder y resta una al ganar (nunca por debajo de la base)."""
+
+    name = 'dalembert'
+
+    def bets(self, levels):
+        return levels.astype(np.float64) + 1
+
+    def advance(self, levels, win):
+        return np.maximum(levels - 1, 0) if win else levels + 1
+
+
+class Labouchere:
+    """Línea de números: apuesta primero + último; al ganar los tacha, al perder añade la apuesta.
+
+    Al completar la línea (ganancia = suma de la línea inicial) se empieza
+    otra. Si la línea llega a `capacity` números se abandona y se reinicia,
+    igual que al superar el máximo de la mesa.
+    """
+
+    name = 'labouchere'
+
+    def __init__(self, line: Sequence[int] = (1, 2, 3, 4), capacity: int = 64):
+        line = np.asarray(line, dtype=np.int64)
+        if line.ndim != 1 or not line.size or (line <= 0).any():
+            raise ValueError("La línea debe tener al menos un número positivo")
+        if capacity < line.size + 1:
+            raise ValueError("capacity debe superar el largo de la línea")
+        self.line = line
+        self.capacity = capacity
+
+    def first_bet(self) -> int:
+        """Apuesta inicial de la línea."""
+        return int(self.line[0] + self.line[-1]) if self.line.size > 1 else int(self.line[0])
+
+
+STRATEGIES = {kernel.name: kernel for kernel in (
+    Flat(), Martingale(), ReverseMartingale(), Fibonacci(), DAlembert(), Labouchere())}
+
+
+class StrategyEngine:
+    """Grilla sistema × tipo de apuesta sobre las mismas sesiones."""
+
+    def __init__(self, strategies: Sequence = DEFAULT_STRATEGIES, bets: Sequence[str] = DEFAULT_BETS,
+                 bankroll: float = 100.0, base_bet: float = 1.0, max_spins: int = 1000,
+                 table_max: Optional[float] = None, stop_loss: Optional[float] = None,
+                 take_profit: Optional[float] = None):
+        if base_bet <= 0:
+            raise ValueError("base_bet debe ser positiva")
+        if max_spins <= 0:
+            raise ValueError("max_spins debe ser positivo")
+        if table_max is not None and table_max < base_bet:
+            raise ValueError("table_max no puede ser menor que la apuesta base")
+        unknown = [bet for bet in bets if bet not in BET_INDEX]
+        if unknown:
+            raise ValueError(f"Apuestas desconocidas: {', '.join(unknown)}")
+        # Un sistema se da por nombre (ver STRATEGIES) o como kernel propio
+        self.kernels = [STRATEGIES[s] if isinstance(s, str) else s for s in strategies]
+        if not self.kernels or not bets:
+            raise ValueError("Se necesita al menos un sistema y una apuesta")
+        self.bets = tuple(bets)
+        self.bankroll = float(bankroll)
+        self.base_bet = float(base_bet)
+        self.max_spins = int(max_spins)
+        self.table_max = table_max
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        lines = {(tuple(kernel.line), kernel.capacity) for kernel in self.kernels
+                 if not isinstance(kernel, Progression)}
+        if len(lines) > 1:
+            # Una sola línea inicial por grilla mantiene el buffer rectangular
+            raise ValueError("Todas las Labouchère de una grilla deben usar la misma línea")
+        self._compile()
+        for kernel, first in zip(self.kernels, self._first_bets()):
+            if first > self.cash:
+                raise ValueError(f"El bankroll no cubre la primera apuesta de {kernel.name}")
+            if first > self.table_units:
+                raise ValueError(f"La primera apuesta de {kernel.name} supera el máximo de la mesa")
+
+    @property
+    def strategies(self) -> tuple:
+        return tuple(kernel.name for kernel in self.kernels)
+
+    def params(self) -> Dict:
+        """Parámetros de la simulación (para reportes)."""
+        return {
+            'strategies': list(self.strategies),
+            'bets': list(self.bets),
+            'bankroll': self.bankroll,
+            'base_bet': self.base_bet,
+            'max_spins': self.max_spins,
+            'table_max': self.table_max,
+            'stop_loss': self.stop_loss,
+            'take_profit': self.take_profit,
+        }
+
+    def _compile(self):
+        """Umbrales en unidades base y tabla de transición de las progresiones.
+
+        Igual que en `martingale_sim.py`, el bankroll es bankroll + base·k con
+        k entero: la ruina (bank < base·apuesta) equivale a floor(bankroll/base)
+        + k < apuesta, y todos los umbrales se comparan como enteros.
+        """
+        self.cash = int(np.floor(self.bankroll / self.base_bet))
+        self.table_units = (np.inf if self.table_max is None
+                            else np.floor(self.table_max / self.base_bet))
+        self.stop_loss_k = (None if self.stop_loss is None
+                            else int(np.floor(-self.stop_loss / self.base_bet)))
+        self.high = (int(np.ceil(self.take_profit / self.base_bet)) if self.take_profit is not None
+                     else np.iinfo(np.int64).max)
+
+        # Estado = offset del sistema + nivel; siguiente = next_state[2·estado + gano]
+        levels = np.arange(self.max_spins + 1)
+        top = levels[-1]
+        bets, next_state, offsets = [], [], {}
+        for position, kernel in enumerate(self.kernels):
+            if not isinstance(kernel, Progression):
+                continue
+            offset = len(levels) * len(offsets)
+            offsets[position] = offset
+            kernel_bets = np.minimum(kernel.bets(levels), BET_CEILING)
+            # Al superar el máximo de la mesa se vuelve al estado inicial
+            over = kernel_bets > self.table_units
+            transitions = np.empty(2 * levels.size, dtype=np.intp)
+            for win in (0, 1):
+                following = np.minimum(kernel.advance(levels, bool(win)), top)
+                following[over[following]] = 0
+                transitions[win::2] = following + offset
+            bets.append(kernel_bets.astype(np.int64))
+            next_state.append(transitions)
+        self.state_offsets = offsets
+        self.bet_table = np.concatenate(bets) if bets else np.zeros(0, dtype=np.int64)
+        self.next_table = np.concatenate(next_state) if next_state else np.zeros(0, dtype=np.intp)
+
+    def _first_bets(self):
+        for position, kernel in enumerate(self.kernels):
+            if position in self.state_offsets:
+                yield int(self.bet_table[self.state_offsets[position]])
+            else:
+                yield kernel.first_bet()
+
+    def run_sessions(self, sessions: int, seed=None, bit_generator: str = 'pcg64',
+                     batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1) -> Dict[str, np.ndarray]:
+        """Simula la grilla sobre `sessions` sesiones.
+
+        Retorna arrays (sistemas × apuestas × sesiones): `final`, `lengths`,
+        `outcomes` y `wagered` (total apostado). Un stream por lote de
+        `batch_size` sesiones (ver `parallel.py`): el resultado no depende de
+        `workers`.
+        """
+        root = root_sequence(seed, bit_generator)
+        tasks = [(root, index, min(batch_size, sessions - start), bit_generator)
+                 for index, start in enumerate(range(0, sessions, batch_size))]
+        parts = run_tasks(self._simulate_batch, tasks, workers)
+        if not parts:
+            return self._empty(0)
+        return {key: np.concatenate([part[key] for part in parts], axis=-1) for key in parts[0]}
+
+    def run(self, sessions: int, seed=None, bit_generator: str = 'pcg64',
+            batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1) -> Dict:
+        """Simula la grilla y retorna un resumen por celda (ver `summarize`)."""
+        if sessions <= 0:
+            raise ValueError("sessions debe ser positivo")
+        root = root_sequence(seed, bit_generator)
+        results = self.run_sessions(sessions, root, bit_generator, batch_size, workers)
+        grid = {}
+        for s, strategy in enumerate(self.strategies):
+            grid[strategy] = {}
+            for b, bet in enumerate(self.bets):
+                final = results['final'][s, b]
+                summary = summarize(final, results['lengths'][s, b], results['outcomes'][s, b],
+                                    self.bankroll)
+                wagered = float(results['wagered'][s, b].sum())
+                summary['wagered_per_session'] = wagered / max(1, sessions)
+                # -1/37 en todas las celdas, salvo error de muestreo
+                summary['return_per_wagered'] = (float((final - self.bankroll).sum()) / wagered
+                                                 if wagered else 0.0)
+                grid[strategy][bet] = summary
+        return {
+            'sessions': sessions,
+            'seed': None if bit_generator == 'secrets' else root.entropy,
+            'grid': grid,
+        }
+
+    def _simulate_batch(self, root, index: int, size: int, bit_generator: str) -> Dict[str, np.ndarray]:
+        engine = task_engine(root, index, bit_generator=bit_generator)
+        return self.play(engine.generate, size)
+
+    def _empty(self, sessions: int) -> Dict[str, np.ndarray]:
+        shape = (len(self.kernels), len(self.bets), sessions)
+        return {'final': np.empty(shape), 'lengths': np.empty(shape, dtype=np.int64),
+                'outcomes': np.empty(shape, dtype=np.uint8), 'wagered': np.empty(shape)}
+
+    def play(self, draw: Callable[[int], np.ndarray], sessions: int) -> Dict[str, np.ndarray]:
+        """Avanza la grilla giro a giro; `draw(sessions)` da el número de cada sesión.
+
+        Una fila por (sistema, apuesta, sesión); las filas terminadas se
+        compactan fuera de los arrays, como en `MartingaleSimulator`.
+        """
+        result = self._empty(sessions)
+        out = {key: value.reshape(-1) for key, value in result.items()}
+        bet_codes = np.array([BET_INDEX[bet] for bet in self.bets], dtype=np.int64)
+        table_rows, line_rows = [], []
+        for position, kernel in enumerate(self.kernels):
+            (table_rows if position in self.state_offsets else line_rows).append(position)
+        groups = [group for group in (self._table_group(table_rows, bet_codes, sessions),
+                                      self._line_group(line_rows, bet_codes, sessions))
+                  if group is not None]
+
+        for spin in range(1, self.max_spins + 1):
+            if not groups:
+                break
+            numbers = np.asarray(draw(sessions), dtype=np.intp)
+            for group in groups:
+                group.step(numbers)
+                self._settle(group, spin, out)
+            groups = [group for group in groups if group.count]
+
+        for group in groups:
+            group.keep(group.alive)
+            self._finish(group.ids, group.units, group.wagered, self.max_spins,
+                         np.full(group.ids.size, OUTCOME_MAX_SPINS, dtype=np.uint8), out)
+        return result
+
+    def _table_group(self, positions, bet_codes, sessions):
+        if not positions:
+            return None
+        ids, bet_code = self._rows(positions, bet_codes, sessions)
+        start = np.repeat(np.array([self.state_offsets[p] for p in positions], dtype=np.intp),
+                          len(bet_codes) * sessions)
+        return _TableGroup(ids, bet_code, sessions, start, self.bet_table, self.next_table)
+
+    def _line_group(self, positions, bet_codes, sessions):
+        if not positions:
+            return None
+        ids, bet_code = self._rows(positions, bet_codes, sessions)
+        return _LineGroup(ids, bet_code, sessions, self.kernels[positions[0]], self.table_units)
+
+    def _rows(self, positions, bet_codes, sessions):
+        """Ids planos (sistema, apuesta, sesión) y código de apuesta de cada fila."""
+        cells = np.array([p * len(bet_codes) + b for p in positions for b in range(len(bet_codes))])
+        ids = (cells[:, None] * sessions + np.arange(sessions)).reshape(-1)
+        bet_code = np.tile(np.repeat(bet_codes * WHEEL_SIZE, sessions), len(positions))
+        return ids, bet_code
+
+    def _settle(self, group, spin: int, out: Dict[str, np.ndarray]):
+        """Cierra las filas que alcanzaron ruina, stop-loss o take-profit."""
+        units = group.units
+        done = (self.cash + units < group.next_bet()) | (units >= self.high)
+        if self.stop_loss_k is not None:
+            done |= units <= self.stop_loss_k
+        done = np.flatnonzero(done & group.alive)
+        if not done.size:
+            return
+        done_units = units[done]
+        outcome = np.full(done.size, OUTCOME_RUIN, dtype=np.uint8)
+        if self.stop_loss_k is not None:
+            outcome[done_units <= self.stop_loss_k] = OUTCOME_STOP_LOSS
+        outcome[done_units >= self.high] = OUTCOME_TAKE_PROFIT
+        self._finish(group.ids[done], done_units, group.wagered[done], spin, outcome, out)
+        # Las terminadas dejan de apostar; se compactan cuando son muchas
+        group.alive[done] = False
+        group.count -= done.size
+        if group.count <= group.ids.size * 3 // 4:
+            group.keep(group.alive)
+
+    def _finish(self, ids, units, wagered, spin, outcome, out):
+        out['final'][ids] = self.bankroll + self.base_bet * units
+        out['lengths'][ids] = spin
+        out['outcomes'][ids] = outcome
+        out['wagered'][ids] = self.base_bet * wagered
+
+
+class _Rows:
+    """Filas de un grupo de la grilla; las de sesiones terminadas apuestan 0."""
+
+    fields = ('ids', 'session', 'bet_code', 'units', 'wagered', 'alive')
+
+    def __init__(self, ids, bet_code, sessions):
+        self.ids = ids
+        self.session = ids % sessions
+        self.bet_code = bet_code
+        self.units = np.zeros(ids.size, dtype=np.int64)
+        self.wagered = np.zeros(ids.size, dtype=np.int64)
+        self.alive = np.ones(ids.size, dtype=bool)
+        self.count = ids.size
+
+    def returns(self, numbers: np.ndarray) -> np.ndarray:
+        """Ganancia por unidad apostada de cada fila en este giro."""
+        return np.take(RETURN_TABLE, self.bet_code + np.take(numbers, self.session))
+
+    def keep(self, mask: np.ndarray):
+        for name in self.fields:
+            setattr(self, name, getattr(self, name)[mask])
+        self.count = self.ids.size
+
+
+class _TableGroup(_Rows):
+    """Filas de progresiones de estado finito: un estado (offset + nivel) por fila."""
+
+    fields = _Rows.fields + ('state',)
+
+    def __init__(self, ids, bet_code, sessions, state, bet_table, next_table):
+        super().__init__(ids, bet_code, sessions)
+        self.state = state
+        self.bet_table = bet_table
+        self.next_table = next_table
+
+    def step(self, numbers: np.ndarray):
+        bet = np.take(self.bet_table, self.state) * self.alive
+        returns = self.returns(numbers)
+        self.units += bet * returns
+        self.wagered += bet
+        self.state = np.take(self.next_table, 2 * self.state + (returns > 0))
+
+    def next_bet(self) -> np.ndarray:
+        return np.take(self.bet_table, self.state)
+
+
+class _LineGroup(_Rows):
+    """Filas de Labouchère: la línea de cada fila es un buffer circular (head, largo)."""
+
+    fields = _Rows.fields + ('lines', 'head', 'length')
+
+    def __init__(self, ids, bet_code, sessions, kernel: Labouchere, table_units):
+        super().__init__(ids, bet_code, sessions)
+        self.initial = kernel.line
+        self.capacity = kernel.capacity
+        self.table_units = table_units
+        self.lines = np.zeros((ids.size, self.capacity), dtype=np.int64)
+        self.head = np.zeros(ids.size, dtype=np.intp)
+        self.length = np.zeros(ids.size, dtype=np.intp)
+        self._reset(np.arange(ids.size))
+
+    def _reset(self, rows: np.ndarray):
+        self.lines[rows, :self.initial.size] = self.initial
+        self.head[rows] = 0
+        self.length[rows] = self.initial.size
+
+    def next_bet(self) -> np.ndarray:
+        rows = np.arange(self.ids.size)
+        first = self.lines[rows, self.head]
+        last = self.lines[rows, (self.head + self.length - 1) % self.capacity]
+        return np.where(self.length > 1, first + last, first)
+
+    def step(self, numbers: np.ndarray):
+        bet = self.next_bet() * self.alive
+        returns = self.returns(numbers)
+        self.units += bet * returns
+        self.wagered += bet
+        win = returns > 0
+
+        # Gana: tacha primero y último; con la línea completa empieza otra
+        completed = win & (self.length <= 2)
+        crossed = win & ~completed
+        self.head[crossed] = (self.head[crossed] + 1) % self.capacity
+        self.length[crossed] -= 2
+        # Pierde: añade la apuesta al final; con la línea llena se abandona
+        lost = np.flatnonzero(~win)
+        full = self.length[lost] >= self.capacity
+        grow = lost[~full]
+        self.lines[grow, (self.head[grow] + self.length[grow]) % self.capacity] = bet[grow]
+        self.length[grow] += 1
+        completed[lost[full]] = True
+        self._reset(np.flatnonzero(completed))
+        if np.isfinite(self.table_units):
+            self._reset(np.flatnonzero(self.next_bet() > self.table_units))
+
+
+def print_grid(report: Dict):
+    """Tabla comparativa de la grilla sistema × apuesta."""
+    print(f"🎲 Sesiones: {report['sessions']:,}")
+    print(f"   {'sistema':<20}{'apuesta':<14}{'ruina':>9}{'media':>10}{'mediana':>10}"
+          f"{'apostado':>11}{'retorno':>9}{'giros':>8}")
+    for strategy, row in report['grid'].items():
+        for bet, summary in row.items():
+            bank = summary['bankroll']
+            print(f"   {strategy:<20}{bet:<14}{summary['ruin_probability'] * 100:>8.2f}%"
+                  f"{bank['mean']:>10.2f}{bank['percentiles']['50']:>10.2f}"
+                  f"{summary['wagered_per_session']:>11.1f}"
+                  f"{summary['return_per_wagered'] * 100:>8.2f}%"
+                  f"{summary['session_length']['mean']:>8.1f}")
+
+
+def main():
+    """Punto de entrada principal."""
+    parser = argparse.ArgumentParser(description='Grilla de sistemas de apuestas')
+    parser.add_argument('--strategies', nargs='+', choices=sorted(STRATEGIES),
+                        default=list(DEFAULT_STRATEGIES), help='Sistemas de apuestas')
+    parser.add_argument('--bets', nargs='+', default=list(DEFAULT_BETS),
+                        help='Tipos de apuesta (red, first_dozen, first_column, 17…)')
+    parser.add_argument('--sessions', type=int, default=100_000, help='Sesiones por celda')
+    parser.add_argument('--bankroll', type=float, default=100.0, help='Bankroll inicial')
+    parser.add_argument('--base-bet', type=float, default=1.0, help='Apuesta base')
+    parser.add_argument('--max-spins', type=int, default=1000, help='Giros máximos por sesión')
+    parser.add_argument('--table-max', type=float, default=None, help='Apuesta máxima de la mesa')
+    parser.add_argument('--stop-loss', type=float, default=None, help='Pérdida que termina la sesión')
+    parser.add_argument('--take-profit', type=float, default=None, help='Ganancia que termina la sesión')
+    parser.add_argument('--generator', choices=BIT_GENERATORS, default='pcg64', help='Bit generator')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Procesos (el resultado no depende de cuántos)')
+    parser.add_argument('--json', action='store_true', help='Salida en JSON')
+    args = parser.parse_args()
+
+    try:
+        engine = StrategyEngine(args.strategies, args.bets, args.bankroll, args.base_bet,
+                                args.max_spins, args.table_max, args.stop_loss, args.take_profit)
+    except ValueError as error:
+        print(f"❌ {error}")
+        return 1
+    start = time.perf_counter()
+    report = engine.run(args.sessions, seed=args.seed, bit_generator=args.generator,
+                        workers=args.workers)
+    elapsed = time.perf_counter() - start
+    report['params'] = engine.params()
+    report['seconds'] = round(elapsed, 3)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print_grid(report)
+    cells = len(engine.strategies) * len(engine.bets)
+    print(f"   ⚡ {cells} celdas × {args.sessions:,} sesiones en {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
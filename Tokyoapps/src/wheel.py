@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tablas de la ruleta europea (0-36)
+
+Mismos criterios que `lib/services/pattern_grokker.dart`: el 0 es verde y no
+cuenta como par/impar, docena ni columna.
+"""
+
+import numpy as np
+
+WHEEL_SIZE = 37
+
+RED_NUMBERS = frozenset({1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36})
+BLACK_NUMBERS = frozenset(n for n in range(1, WHEEL_SIZE) if n not in RED_NUMBERS)
+
+# Tablas por número como tuplas de Python (rápidas para consultas de a un giro)
+COLORS = tuple('green' if n == 0 else 'red' if n in RED_NUMBERS else 'black'
+               for n in range(WHEEL_SIZE))
+PARITIES = tuple(None if n == 0 else 'even' if n % 2 == 0 else 'odd' for n in range(WHEEL_SIZE))
+# Docenas 1-12, 13-24, 25-36 y columnas 1,4,7... / 2,5,8... / 3,6,9...; 0 = ninguna
+DOZENS = tuple(0 if n == 0 else (n - 1) // 12 + 1 for n in range(WHEEL_SIZE))
+COLUMNS = tuple(0 if n == 0 else (n - 1) % 3 + 1 for n in range(WHEEL_SIZE))
+
+_NUMBERS = np.arange(WHEEL_SIZE)
+
+# Tablas de 37 entradas indexables con un array de giros uint8
+IS_RED = np.isin(_NUMBERS, sorted(RED_NUMBERS))
+IS_BLACK = np.isin(_NUMBERS, sorted(BLACK_NUMBERS))
+
+# Códigos por número: color 0=verde 1=rojo 2=negro; paridad 0=ninguna 1=par 2=impar;
+# docena/columna 0=ninguna, 1-3
+COLOR_CODE = np.where(IS_RED, 1, np.where(IS_BLACK, 2, 0)).astype(np.uint8)
+PARITY_CODE = np.array([0] + [1 if n % 2 == 0 else 2 for n in range(1, WHEEL_SIZE)], dtype=np.uint8)
+DOZEN_CODE = np.array(DOZENS, dtype=np.uint8)
+COLUMN_CODE = np.array(COLUMNS, dtype=np.uint8)
+
+# Apuestas europeas: 0-36 a pleno (35:1) y apuestas exteriores. BET_WINS[apuesta, número]
+# indica si el número gana la apuesta; BET_PAYOUTS es el pago por unidad apostada.
+BET_NAMES = tuple(str(n) for n in range(WHEEL_SIZE)) + (
+    'red', 'black', 'even', 'odd', 'low', 'high',
+    'first_dozen', 'second_dozen', 'third_dozen',
+    'first_column', 'second_column', 'third_column',
+)
+BET_INDEX = {name: index for index, name in enumerate(BET_NAMES)}
+BET_WINS = np.vstack([
+    np.eye(WHEEL_SIZE, dtype=bool),
+    COLOR_CODE == 1, COLOR_CODE == 2,
+    PARITY_CODE == 1, PARITY_CODE == 2,
+    (_NUMBERS >= 1) & (_NUMBERS <= 18), _NUMBERS >= 19,
+    DOZEN_CODE == 1, DOZEN_CODE == 2, DOZEN_CODE == 3,
+    COLUMN_CODE == 1, COLUMN_CODE == 2, COLUMN_CODE == 3,
+])
+BET_PAYOUTS = np.array([35] * WHEEL_SIZE + [1] * 6 + [2] * 6, dtype=np.int64)
@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+Configuración de pytest: los módulos de `src/` se importan directamente
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
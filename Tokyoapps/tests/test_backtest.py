@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests del backtesting de estrategias
+"""
+
+import numpy as np
+import pytest
+
+from backtest import (
+    PAD,
+    PREDICTORS,
+    StrategyStats,
+    backtest,
+    predict_next,
+    replay_batches,
+    session_spins,
+)
+from pattern_grokker import grok_history
+from spin_log import SpinLogWriter
+from wheel import BET_INDEX, RED_NUMBERS
+
+GENERATED = {'kind': 'generate', 'seed': 11, 'spins': 120}
+
+
+def dart_predict_next(history):
+    """`RouletteLogic.predictNext` tal cual (reduce sobre el Map en orden de inserción)."""
+    freq = {}
+    for number in history:
+        freq[number] = freq.get(number, 0) + 1
+    # reduce((a, b) => a.value > b.value ? a : b): en empate se queda con b
+    best = None
+    for number in freq:
+        if best is None or freq[number] >= freq[best]:
+            best = number
+    return best
+
+
+def sessions_batches(lengths=(1, 5, 30, 0, 64), window=20, seed=3):
+    rng = np.random.default_rng(seed)
+    values = rng.choice([0, 1, 2, 3, 5, 17], size=sum(lengths)).astype(np.uint8)
+    return values, np.array(lengths), list(replay_batches(values, np.array(lengths), window, batch=17))
+
+
+def test_ventanas_como_las_ve_la_app():
+    values, lengths, batches = sessions_batches()
+    windows = np.concatenate([b.windows for b in batches])
+    targets = np.concatenate([b.targets for b in batches])
+    expected_windows, expected_targets = [], []
+    start = 0
+    for length in lengths:
+        session = values[start:start + length].tolist()
+        for t in range(1, length):
+            history = session[max(0, t - 20):t]
+            expected_windows.append([PAD] * (20 - len(history)) + history)
+            expected_targets.append(session[t])
+        start += length
+    assert windows.tolist() == expected_windows
+    assert targets.tolist() == expected_targets
+
+
+def test_predict_next_empate_como_reduce_de_dart():
+    values = np.array([5, 7, 1, 3, 3, 9, 9, 0], dtype=np.uint8)
+    batch = next(replay_batches(values, np.array([3, 5]), 20, batch=16))
+    bets, _ = predict_next(batch)
+    # [5, 7] → 7; [3, 3, 9, 9] → 9 (el empatado insertado último en el Map)
+    windows = [[int(n) for n in window if n != PAD] for window in batch.windows]
+    assert bets[windows.index([5, 7])] == 7
+    assert bets[windows.index([3, 3, 9, 9])] == 9
+    assert dart_predict_next([5, 7]) == 7
+
+
+def test_predictores_igual_que_la_app():
+    _, _, batches = sessions_batches()
+    for batch in batches:
+        next_bets, next_confidence = predict_next(batch)
+        hot, hot_confidence = PREDICTORS['hot_number'](batch)
+        streak, _ = PREDICTORS['streak_reversal'](batch)
+        cold, _ = PREDICTORS['cold_number'](batch)
+        assert np.isnan(next_confidence).all()
+        for i, window in enumerate(batch.windows):
+            history = [int(n) for n in window if n != PAD]
+            assert next_bets[i] == dart_predict_next(history)
+            recommendations = {r['type']: r for r in grok_history(history)['recommendations']}
+            assert hot[i] == recommendations['hotNumber']['suggested_number']
+            assert hot_confidence[i] == pytest.approx(recommendations['hotNumber']['confidence'])
+            if 'streak' in recommendations:
+                color = 'red' if recommendations['streak']['suggested_number'] in RED_NUMBERS else 'black'
+                assert streak[i] == BET_INDEX[color]
+            else:
+                assert streak[i] == -1
+            expected_cold = recommendations.get('coldNumber', {}).get('suggested_number', -1)
+            assert cold[i] == expected_cold
+
+
+def test_pnl_y_calibracion():
+    stats = StrategyStats()
+    bets = np.array([17, 17, BET_INDEX['red'], BET_INDEX['red'], -1])
+    targets = np.array([17, 3, 1, 2, 0])
+    stats.add(bets, np.array([0.8, 0.8, 0.6, np.nan, 0.5]), targets)
+    summary = stats.summary()
+    assert summary['opportunities'] == 5
+    assert summary['predictions'] == 4
+    assert summary['hits'] == 2
+    assert summary['profit'] == 35 - 1 + 1 - 1
+    assert summary['expected_hit_rate'] == pytest.approx((2 / 37 + 36 / 37) / 4)
+    assert summary['brier_score'] == pytest.approx((0.2 ** 2 + 0.8 ** 2 + 0.4 ** 2) / 3)
+    assert [b['predictions'] for b in summary['calibration']] == [1, 2]
+    assert summary['calibration'][1]['hit_rate'] == 0.5
+
+
+def bet_red(batch):
+    return np.full(len(batch), BET_INDEX['red']), np.full(len(batch), 0.5)
+
+
+def test_predictor_propio_y_procesos():
+    predictors = dict(PREDICTORS, always_red=bet_red)
+    single = backtest(GENERATED, range(40), predictors=predictors, workers=1, shard_sessions=7)
+    pooled = backtest(GENERATED, range(40), predictors=predictors, workers=3, shard_sessions=7)
+    assert single['strategies'] == pooled['strategies']
+    red = single['strategies']['always_red']
+    assert red['predictions'] == 40 * 119
+    assert red['expected_hit_rate'] == pytest.approx(18 / 37)
+    assert single['sessions'] == 40 and single['spins'] == 40 * 120
+
+
+def test_log_igual_a_sesiones_generadas(tmp_path):
+    path = str(tmp_path / "historial.tkspin")
+    with SpinLogWriter(path, max_block=50) as writer:
+        # Sesiones intercaladas: el backtest las reagrupa
+        for session in (2, 0, 1):
+            spins = session_spins(GENERATED['seed'], session, GENERATED['spins'])
+            writer.extend(session, spins[:60])
+        for session in (0, 1, 2):
+            spins = session_spins(GENERATED['seed'], session, GENERATED['spins'])
+            writer.extend(session, spins[60:])
+    from_log = backtest({'kind': 'log', 'path': path}, [0, 1, 2])
+    generated = backtest(GENERATED, [0, 1, 2])
+    assert from_log['strategies'] == generated['strategies']
+
+
+def test_sesiones_no_contiguas(tmp_path):
+    report = backtest(GENERATED, [1, 5], shard_sessions=4)
+    assert report['sessions'] == 2 and report['spins'] == 2 * 120
+    path = str(tmp_path / "historial.tkspin")
+    with SpinLogWriter(path) as writer:
+        for session in range(7):
+            writer.extend(session, session_spins(GENERATED['seed'], session, GENERATED['spins']))
+    from_log = backtest({'kind': 'log', 'path': path}, [1, 5], shard_sessions=4)
+    assert from_log['sessions'] == 2
+    assert from_log['strategies'] == report['strategies']
+
+
+def test_ventana_invalida():
+    with pytest.raises(ValueError):
+        backtest(GENERATED, range(2), window=0)
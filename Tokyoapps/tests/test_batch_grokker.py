@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests de grokHistory por lotes (contra pattern_grokker sesión a sesión)
+"""
+
+import numpy as np
+import pytest
+
+from batch_grokker import grok_batch, grok_ragged
+from pattern_grokker import grok_history
+from wheel import RED_NUMBERS
+
+
+def ragged_sessions(seed=0, sessions=300):
+    rng = np.random.default_rng(seed)
+    histories = []
+    for index in range(sessions):
+        length = int(rng.integers(0, 60))
+        if index % 7 == 0:
+            # Muchos ceros y rachas largas
+            values = rng.choice([0, 0, 1, 3, 2], size=length)
+        else:
+            values = rng.integers(0, 37, size=length)
+        histories.append(values.astype(np.uint8))
+    histories[1] = np.zeros(0, dtype=np.uint8)
+    histories[2] = np.zeros(5, dtype=np.uint8)
+    offsets = np.concatenate([[0], np.cumsum([len(h) for h in histories])])
+    return histories, np.concatenate(histories), offsets
+
+
+def test_igual_que_el_analisis_por_sesion():
+    histories, values, offsets = ragged_sessions()
+    result = grok_ragged(values, offsets)
+    for index, history in enumerate(histories):
+        expected = grok_history(history.tolist())
+        if not len(history):
+            assert result["hot_recommendation"][index] == -1
+            continue
+        hot = [h["number"] for h in expected["hot_numbers"]]
+        assert result["hot_numbers"][index][:len(hot)].tolist() == hot
+        assert result["cold_numbers"][index].tolist() == [c["number"] for c in expected["cold_numbers"]]
+        assert result["cold_missed_spins"][index].tolist() == \
+            [c["missed_spins"] for c in expected["cold_numbers"]]
+        for name, value in expected["streaks"].items():
+            assert result[name][index] == value, name
+        for group in ("sectors", "colors", "even_odd"):
+            for name, value in expected[group].items():
+                assert result[name][index] == pytest.approx(value), name
+
+        recommendations = {r["type"]: r for r in expected["recommendations"]}
+        assert result["hot_recommendation"][index] == recommendations["hotNumber"]["suggested_number"]
+        assert result["hot_confidence"][index] == pytest.approx(recommendations["hotNumber"]["confidence"])
+        if "coldNumber" in recommendations:
+            assert result["cold_recommendation"][index] == recommendations["coldNumber"]["suggested_number"]
+        else:
+            assert result["cold_recommendation"][index] == -1
+        # streak_color usa COLOR_CODE: 1 = rojo, 2 = negro, 0 = sin recomendación
+        if "streak" in recommendations:
+            suggested = recommendations["streak"]["suggested_number"]
+            assert result["streak_color"][index] == (1 if suggested in RED_NUMBERS else 2)
+        else:
+            assert result["streak_color"][index] == 0
+
+
+def test_matriz_2d_igual_a_irregular():
+    spins = np.random.default_rng(1).integers(0, 37, size=(50, 40), dtype=np.uint8)
+    batch = grok_batch(spins)
+    ragged = grok_ragged(spins.reshape(-1), np.arange(51) * 40)
+    for name in batch:
+        assert np.array_equal(batch[name], ragged[name]), name
+
+
+def test_columnar():
+    spins = np.random.default_rng(2).integers(0, 37, size=(10, 20), dtype=np.uint8)
+    result = grok_batch(spins)
+    assert result["counts"].shape == (10, 37)
+    assert result["hot_numbers"].shape == (10, 5)
+    assert result["red_count"].shape == (10,)
+    assert np.all(result["counts"].sum(axis=1) == 20)
+
+
+@pytest.mark.parametrize("values,offsets", [
+    (np.array([1, 2, 3], dtype=np.uint8), np.array([0, 2])),
+    (np.array([1, 2, 3], dtype=np.uint8), np.array([0, 3, 2, 3])),
+    (np.array([1, 37], dtype=np.uint8), np.array([0, 2])),
+])
+def test_entradas_invalidas(values, offsets):
+    with pytest.raises(ValueError):
+        grok_ragged(values, offsets)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests del evaluador exacto de Martingale (contrastado con Monte Carlo)
+"""
+
+import numpy as np
+import pytest
+
+from martingale_markov import cache_info, evaluate
+from martingale_sim import MartingaleSimulator
+
+LOSS = 19 / 37
+
+
+def test_ruina_exacta_caso_pequeno():
+    # Bankroll 7: solo perder 1, 2 y 4 seguidos deja sin cubrir la apuesta
+    result = evaluate(bankroll=7, max_spins=3)
+    assert result["ruin_probability"] == pytest.approx(LOSS ** 3)
+
+
+def test_probabilidades_suman_uno():
+    result = evaluate(bankroll=50, max_spins=300, stop_loss=30, take_profit=10)
+    assert sum(result["outcomes"].values()) == pytest.approx(1.0)
+    assert result["final_distribution"]["probability"].sum() == pytest.approx(1.0)
+
+
+def test_curva_de_ruina_creciente():
+    curve = evaluate(bankroll=63, max_spins=500)["curves"]["ruin"]
+    assert np.all(np.diff(curve) >= -1e-15)
+    assert curve[-1] == evaluate(bankroll=63, max_spins=500)["ruin_probability"]
+
+
+def test_apuesta_plana_pierde_un_treintaisieteavo_por_giro():
+    result = evaluate(bankroll=1000, max_spins=100, max_doublings=0)
+    assert result["expected_profit"] == pytest.approx(-100 / 37)
+    assert result["outcomes"]["max_spins"] == pytest.approx(1.0)
+
+
+def test_memoizado_por_parametros():
+    before = cache_info().hits
+    first = evaluate(bankroll=40, max_spins=200, table_max=16)
+    second = evaluate(bankroll=40.0, max_spins=200, table_max=16.0)
+    assert first is second
+    assert cache_info().hits == before + 1
+
+
+def test_demasiados_estados():
+    with pytest.raises(ValueError):
+        evaluate(bankroll=1e9, max_spins=10)
+
+
+@pytest.mark.parametrize("params", [
+    dict(bankroll=100, max_spins=1000),
+    dict(bankroll=31, max_spins=200),
+    dict(bankroll=50, max_spins=300, stop_loss=30, take_profit=10, table_max=16),
+    dict(bankroll=200, max_spins=400, max_doublings=4, take_profit=50),
+])
+def test_contraste_con_monte_carlo(params):
+    sessions = 200_000
+    exact = evaluate(**params)
+    final, lengths, _ = MartingaleSimulator(**params).run_sessions(sessions, seed=11)
+    simulated = MartingaleSimulator(**params).run(sessions, seed=11)
+    for name, p in exact["outcomes"].items():
+        tolerance = 5 * np.sqrt(max(p * (1 - p), 1e-6) / sessions)
+        assert simulated["outcomes"][name] == pytest.approx(p, abs=tolerance), name
+    assert simulated["expected_profit"] == pytest.approx(
+        exact["expected_profit"], abs=5 * final.std() / np.sqrt(sessions) + 1e-9)
+    assert lengths.mean() == pytest.approx(
+        exact["expected_length"], abs=5 * lengths.std() / np.sqrt(sessions) + 1e-9)
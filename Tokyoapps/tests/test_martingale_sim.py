@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests del simulador Monte Carlo de Martingale
+"""
+
+import numpy as np
+import pytest
+
+from martingale_sim import (
+    OUTCOME_MAX_SPINS,
+    OUTCOME_RUIN,
+    OUTCOME_STOP_LOSS,
+    OUTCOME_TAKE_PROFIT,
+    MartingaleSimulator,
+)
+
+
+def test_vectorizado_coincide_con_bucle_python():
+    simulator = MartingaleSimulator(bankroll=31, base_bet=1, max_spins=200)
+    fast = simulator.run(100_000, seed=1)
+    slow = simulator.run_loop(10_000, seed=2)
+    p = fast["ruin_probability"]
+    # Tolerancia de ~4 errores estándar de la muestra del bucle
+    assert abs(p - slow["ruin_probability"]) < 4 * np.sqrt(p * (1 - p) / 10_000)
+    assert abs(fast["session_length"]["mean"] - slow["session_length"]["mean"]) < 5
+
+
+def test_motivos_suman_uno():
+    summary = MartingaleSimulator(bankroll=50, max_spins=300, stop_loss=30,
+                                  take_profit=10).run(20_000, seed=3)
+    assert sum(summary["outcomes"].values()) == pytest.approx(1.0)
+    assert summary["ruin_probability"] == summary["outcomes"]["ruin"]
+
+
+def test_take_profit_con_bankroll_enorme():
+    final, lengths, outcomes = MartingaleSimulator(
+        bankroll=1e9, max_spins=500, take_profit=1).run_sessions(5_000, seed=4)
+    # Martingale sin límites gana exactamente una apuesta base en el primer acierto
+    assert np.all(outcomes == OUTCOME_TAKE_PROFIT)
+    assert np.all(final == 1e9 + 1)
+
+
+def test_stop_loss():
+    final, _, outcomes = MartingaleSimulator(
+        bankroll=1000, max_spins=50, stop_loss=3).run_sessions(5_000, seed=5)
+    assert np.all(final[outcomes == OUTCOME_STOP_LOSS] <= 997)
+    assert not np.any(outcomes == OUTCOME_RUIN)
+
+
+def test_sin_duplicar_es_apuesta_plana():
+    final, lengths, outcomes = MartingaleSimulator(
+        bankroll=1000, max_spins=100, max_doublings=0).run_sessions(2_000, seed=6)
+    # Con apuesta fija de 1 la ganancia tiene la paridad del número de giros
+    assert np.all(outcomes == OUTCOME_MAX_SPINS)
+    assert np.all((final - 1000).astype(np.int64) % 2 == lengths % 2)
+
+
+def test_table_max_limita_la_apuesta():
+    simulator = MartingaleSimulator(bankroll=1000, max_spins=200, table_max=8)
+    final, _, _ = simulator.run_sessions(5_000, seed=7)
+    capped = MartingaleSimulator(bankroll=1000, max_spins=200, max_doublings=3)
+    final_capped, _, _ = capped.run_sessions(5_000, seed=7)
+    # table_max=8 con base 1 equivale a 3 duplicaciones como máximo
+    assert np.array_equal(final, final_capped)
+
+
+def test_ruina_cuando_no_cubre_la_apuesta():
+    final, _, outcomes = MartingaleSimulator(bankroll=7, max_spins=1000).run_sessions(5_000, seed=8)
+    ruined = outcomes == OUTCOME_RUIN
+    assert ruined.any()
+    # Solo se apuesta lo que se puede cubrir: el bankroll nunca es negativo
+    assert np.all(final >= 0)
+
+
+def test_semilla_reproducible():
+    simulator = MartingaleSimulator(bankroll=40, max_spins=300)
+    assert simulator.run(10_000, seed=9) == simulator.run(10_000, seed=9)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"base_bet": 0},
+    {"bankroll": 0.5},
+    {"max_spins": 0},
+    {"table_max": 0.5},
+])
+def test_parametros_invalidos(kwargs):
+    with pytest.raises(ValueError):
+        MartingaleSimulator(**kwargs)
+
+
+def test_sin_sesiones_es_error():
+    simulator = MartingaleSimulator()
+    with pytest.raises(ValueError):
+        simulator.run(0)
+    with pytest.raises(ValueError):
+        simulator.run_loop(0)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests del PatternGrokker incremental (contra un recálculo completo)
+"""
+
+import random
+
+import pytest
+
+from pattern_grokker import PatternGrokker, RunTracker, grok_history
+from wheel import BLACK_NUMBERS, RED_NUMBERS
+
+
+def naive_streaks(history):
+    """Recalcula rachas desde cero (el 0 no corta ni suma)."""
+    colored = [n for n in history if n]
+    colors = ["red" if n in RED_NUMBERS else "black" for n in colored]
+    parities = ["even" if n % 2 == 0 else "odd" for n in colored]
+
+    def current(seq, key):
+        count = 0
+        for item in reversed(seq):
+            if item != key:
+                break
+            count += 1
+        return count
+
+    def longest(seq, key):
+        best = run = 0
+        for item in seq:
+            run = run + 1 if item == key else 0
+            best = max(best, run)
+        return best
+
+    return {
+        "current_red_streak": current(colors, "red"),
+        "current_black_streak": current(colors, "black"),
+        "max_red_streak": longest(colors, "red"),
+        "max_black_streak": longest(colors, "black"),
+        "current_even_streak": current(parities, "even"),
+        "current_odd_streak": current(parities, "odd"),
+    }
+
+
+def naive_counts(history):
+    counts = [history.count(n) for n in range(37)]
+    return {
+        "dozens": [sum(1 for n in history if lo <= n <= lo + 11) for lo in (1, 13, 25)],
+        "columns": [sum(1 for n in history if n and (n - 1) % 3 == c) for c in range(3)],
+        "red": sum(1 for n in history if n in RED_NUMBERS),
+        "green": counts[0],
+        "even": sum(1 for n in history if n and n % 2 == 0),
+        "counts": counts,
+    }
+
+
+@pytest.mark.parametrize("window", [1, 3, 20, 150])
+def test_incremental_igual_a_recalculo(window):
+    rng = random.Random(window)
+    grokker = PatternGrokker(window=window, rng=random.Random(0))
+    history = []
+    for _ in range(600):
+        # Muchos ceros y rachas largas para ejercitar los casos borde
+        number = rng.choice([0, 0, 1, 3, 2, 4] + list(range(37)))
+        grokker.push(number)
+        history = (history + [number])[-window:]
+        analysis = grokker.analysis()
+        expected = naive_counts(history)
+
+        assert grokker.history() == history
+        assert analysis["streaks"] == naive_streaks(history)
+        assert analysis["colors"]["red_count"] == expected["red"]
+        assert analysis["colors"]["green_count"] == expected["green"]
+        assert analysis["even_odd"]["even_count"] == expected["even"]
+        sectors = analysis["sectors"]
+        assert [sectors["first_dozen_count"], sectors["second_dozen_count"],
+                sectors["third_dozen_count"]] == expected["dozens"]
+        assert [sectors["first_column_count"], sectors["second_column_count"],
+                sectors["third_column_count"]] == expected["columns"]
+        hot = sorted(range(37), key=lambda n: (-expected["counts"][n], n))
+        assert [h["number"] for h in analysis["hot_numbers"]] == \
+            [n for n in hot[:5] if expected["counts"][n]]
+        cold = sorted(range(37), key=lambda n: (expected["counts"][n], n))
+        assert [c["number"] for c in analysis["cold_numbers"]] == cold[:5]
+
+
+def test_rachas_alternadas_como_el_test_dart():
+    streaks = grok_history([1, 2, 3, 4, 5, 6])["streaks"]
+    # El último número (6) es negro
+    assert streaks["current_black_streak"] == 1
+    assert streaks["current_red_streak"] == 0
+
+
+def test_recomendacion_por_racha_de_rojos():
+    analysis = grok_history([1, 3, 5, 7], rng=random.Random(1))
+    streak = [r for r in analysis["recommendations"] if r["type"] == "streak"]
+    assert len(streak) == 1
+    assert streak[0]["suggested_number"] in BLACK_NUMBERS
+    assert streak[0]["confidence"] == 0.6
+
+
+def test_recomendacion_numero_caliente():
+    analysis = grok_history([7, 7, 7, 1, 2])
+    hot = analysis["recommendations"][0]
+    assert hot["type"] == "hotNumber" and hot["suggested_number"] == 7
+    assert hot["confidence"] == pytest.approx(min(0.5 + 0.6 * 2, 0.8))
+    assert analysis["hot_numbers"][0]["percentage"] == pytest.approx(60.0)
+
+
+def test_recomendacion_numero_frio():
+    analysis = grok_history([5] * 10)
+    cold = [r for r in analysis["recommendations"] if r["type"] == "coldNumber"]
+    assert cold and cold[0]["suggested_number"] == 0 and cold[0]["confidence"] == 0.5
+
+
+def test_analisis_una_vez_por_giro():
+    grokker = PatternGrokker(window=10)
+    grokker.push(3)
+    first = grokker.analysis()
+    assert grokker.analysis() is first
+    grokker.push(4)
+    assert grokker.analysis() is not first
+
+
+def test_solo_ceros():
+    analysis = grok_history([0, 0, 0])
+    assert analysis["even_odd"]["even_percentage"] == 0.0
+    assert analysis["colors"]["green_percentage"] == 100.0
+
+
+def test_vacio_y_validaciones():
+    assert PatternGrokker().analysis()["recommendations"] == []
+    with pytest.raises(ValueError):
+        PatternGrokker(window=0)
+    with pytest.raises(ValueError):
+        PatternGrokker().push(37)
+
+
+def test_run_tracker_max_baja_al_expulsar():
+    tracker = RunTracker(("red", "black"))
+    for key in ["red"] * 4 + ["black"] + ["red"] * 2:
+        tracker.push(key)
+    assert tracker.longest["red"] == 4
+    for _ in range(3):
+        tracker.evict("red")
+    # Queda [red] [black] [red, red]
+    assert tracker.longest["red"] == 2
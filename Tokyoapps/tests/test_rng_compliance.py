@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests de la validación del RNG en streaming
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from rng_compliance import (
+    MAX_GAP,
+    StreamStats,
+    chi_square_sf,
+    scan_chunks,
+    scan_file,
+)
+from spin_engine import SpinEngine
+
+
+def spins(count, seed=0):
+    return SpinEngine(seed=seed).generate(count)
+
+
+def statistics(report):
+    return [test['statistic'] for test in report['tests']]
+
+
+def test_union_de_chunks_igual_a_una_pasada():
+    x = spins(100_000)
+    whole = StreamStats.from_chunk(x)
+    # Chunks de largos variados, incluidos vacíos y más cortos que el lag máximo
+    cuts = [0, 1, 3, 3, 10, 4_000, 4_002, 50_000, 99_999, 100_000]
+    parts = scan_chunks(x[a:b] for a, b in zip(cuts, cuts[1:]))
+    assert np.array_equal(parts.frequencies.pairs, whole.frequencies.pairs)
+    assert parts.runs.runs == whole.runs.runs
+    assert np.array_equal(parts.gaps.histogram, whole.gaps.histogram)
+    assert parts.autocorrelation.cross == whole.autocorrelation.cross
+    assert statistics(parts.report()) == statistics(whole.report())
+
+
+def test_merge_es_asociativo():
+    x = spins(30_000, seed=1)
+    a, b, c = (StreamStats.from_chunk(part) for part in np.array_split(x, 3))
+    left = StreamStats().merge(a).merge(b).merge(c)
+    a, b, c = (StreamStats.from_chunk(part) for part in np.array_split(x, 3))
+    right = a.merge(b.merge(c))
+    assert statistics(left.report()) == statistics(right.report())
+
+
+def test_estadisticos_contra_calculo_directo():
+    x = spins(50_000, seed=2)
+    stats = scan_chunks(np.array_split(x, 13))
+    counts = np.bincount(x, minlength=37)
+    assert stats.frequencies.counts().tolist() == counts.tolist()
+
+    symbols = x[x != 18] > 18
+    assert stats.runs.runs == 1 + np.count_nonzero(symbols[1:] != symbols[:-1])
+
+    zeros = np.flatnonzero(x == 0)
+    gaps = np.minimum(np.diff(zeros) - 1, MAX_GAP)
+    assert stats.gaps.histogram.tolist() == np.bincount(gaps, minlength=MAX_GAP + 1).tolist()
+
+    centered = x - x.mean()
+    for lag in (1, 3, 5):
+        expected = centered[:-lag] @ centered[lag:] / (centered @ centered)
+        assert stats.autocorrelation.coefficient(lag) == pytest.approx(expected, rel=1e-9)
+
+
+def test_rng_correcto_pasa():
+    # Con alpha = 0.01 una semilla cualquiera falla algún test ~9% de las veces
+    report = scan_chunks(SpinEngine(seed=4, chunk_size=1 << 16).chunks(1_000_000)).report()
+    assert report['sample_size'] == 1_000_000
+    assert report['overall_passed'], report['tests']
+    assert len(report['tests']) == 9
+
+
+def test_detecta_sesgo_y_dependencia():
+    x = spins(500_000, seed=4)
+    biased = x.copy()
+    biased[::50] = 17
+    failed = {t['test'] for t in StreamStats.from_chunk(biased).report()['tests'] if not t['passed']}
+    assert 'Chi-Square' in failed
+
+    # Cada giro repite el anterior con probabilidad 1/10: correlación lag 1
+    repeat = np.random.default_rng(5).random(x.size) < 0.1
+    sticky = x.copy()
+    for index in np.flatnonzero(repeat[1:]) + 1:
+        sticky[index] = sticky[index - 1]
+    failed = {t['test'] for t in StreamStats.from_chunk(sticky).report()['tests'] if not t['passed']}
+    assert {'Runs Test', 'Serial Pairs', 'Autocorrelation'} <= failed
+
+
+def test_muestra_insuficiente_no_pasa():
+    report = StreamStats.from_chunk(spins(100)).report()
+    assert not report['overall_passed']
+    assert any(test.get('note') for test in report['tests'])
+
+
+@pytest.mark.parametrize("suffix", [".bin", ".npy"])
+def test_archivo_con_procesos_igual_a_un_proceso(tmp_path, suffix):
+    x = spins(300_000, seed=6)
+    path = tmp_path / f"giros{suffix}"
+    if suffix == ".npy":
+        np.save(path, x)
+    else:
+        x.tofile(path)
+    single = scan_file(str(path), workers=1, chunk_size=10_000)
+    pooled = scan_file(str(path), workers=3, chunk_size=10_000)
+    reference = StreamStats.from_chunk(x)
+    assert statistics(single.report()) == statistics(reference.report())
+    assert statistics(pooled.report()) == statistics(reference.report())
+    json.dumps(pooled.report())
+
+
+def test_valores_fuera_de_rango():
+    with pytest.raises(ValueError):
+        StreamStats.from_chunk(np.array([1, 37]))
+    with pytest.raises(ValueError):
+        StreamStats(lags=[0])
+
+
+def test_chi_square_sf():
+    assert chi_square_sf(3.841458820694124, 1) == pytest.approx(0.05)
+    assert chi_square_sf(36, 36) == pytest.approx(0.46865, abs=1e-5)
+    assert chi_square_sf(0, 10) == 1.0
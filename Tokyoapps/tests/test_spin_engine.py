@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests del motor vectorizado de giros
+"""
+
+import numpy as np
+import pytest
+
+from spin_engine import WHEEL_SIZE, SpinEngine, benchmark, make_generator, secure_spins
+
+
+@pytest.mark.parametrize("bit_generator", ["pcg64", "philox", "secrets"])
+def test_giros_en_rango_y_uint8(bit_generator):
+    spins = SpinEngine(bit_generator).generate(50_000)
+    assert spins.dtype == np.uint8
+    assert spins.min() >= 0 and spins.max() < WHEEL_SIZE
+    # Con 50k giros aparecen los 37 números
+    assert len(np.unique(spins)) == WHEEL_SIZE
+
+
+@pytest.mark.parametrize("bit_generator", ["pcg64", "philox"])
+def test_semilla_reproducible(bit_generator):
+    a = SpinEngine(bit_generator, seed=42).generate(1000)
+    b = SpinEngine(bit_generator, seed=42).generate(1000)
+    c = SpinEngine(bit_generator, seed=43).generate(1000)
+    assert np.array_equal(a, b)
+    assert not np.array_equal(a, c)
+
+
+def test_chunks_tamano_fijo():
+    engine = SpinEngine(seed=1, chunk_size=1000)
+    sizes = [len(chunk) for chunk in engine.chunks(3500)]
+    assert sizes == [1000, 1000, 1000, 500]
+
+
+def test_chunks_reproducibles_con_misma_semilla():
+    a = np.concatenate(list(SpinEngine(seed=7, chunk_size=256).chunks(1000)))
+    b = np.concatenate(list(SpinEngine(seed=7, chunk_size=256).chunks(1000)))
+    assert np.array_equal(a, b)
+
+
+def test_secrets_uniforme():
+    counts = np.bincount(secure_spins(370_000), minlength=WHEEL_SIZE)
+    expected = 370_000 / WHEEL_SIZE
+    chi2 = ((counts - expected) ** 2 / expected).sum()
+    # 36 grados de libertad: p=0.0001 en ~72
+    assert chi2 < 72
+
+
+def test_secrets_no_admite_semilla():
+    with pytest.raises(ValueError):
+        make_generator("secrets", seed=1)
+
+
+def test_generador_desconocido():
+    with pytest.raises(ValueError):
+        SpinEngine("mt19937")
+
+
+def test_spin_individual():
+    assert 0 <= SpinEngine(seed=3).spin() < WHEEL_SIZE
+
+
+def test_benchmark():
+    result = benchmark("pcg64", total=100_000, chunk_size=10_000, seed=0)
+    assert result["spins"] == 100_000
+    assert result["spins_per_second"] > 0
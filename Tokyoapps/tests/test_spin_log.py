@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tests del historial de giros append-only
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from rng_compliance import StreamStats, scan_file
+from spin_engine import SpinEngine
+from spin_log import (
+    BLOCK_DTYPE,
+    HEADER_SIZE,
+    INDEX_SUFFIX,
+    SpinLog,
+    SpinLogWriter,
+    export_file,
+    import_file,
+)
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / "historial.tkspin")
+
+
+def write_sessions(path, sessions=5, spins=100, seed=0, **options):
+    engine = SpinEngine(seed=seed)
+    data = {}
+    with SpinLogWriter(path, **options) as writer:
+        for session in range(sessions):
+            data[session] = engine.generate(spins)
+            writer.extend(session, data[session], start_ns=session * 10**9,
+                          end_ns=session * 10**9 + 99, table=session % 2)
+    return data
+
+
+def test_un_byte_por_giro_y_memmap_sin_copia(log_path):
+    data = write_sessions(log_path)
+    log = SpinLog(log_path)
+    assert os.path.getsize(log_path) == HEADER_SIZE + 500
+    assert isinstance(log.spins, np.memmap)
+    assert np.array_equal(log.spins, np.concatenate(list(data.values())))
+    view = log.session(3)
+    assert np.shares_memory(view, log.spins)
+    assert np.array_equal(view, data[3])
+    assert log.sessions().tolist() == [0, 1, 2, 3, 4]
+    assert log.blocks['table'].tolist() == [0, 1, 0, 1, 0]
+    assert log.verify()
+
+
+def test_append_por_giro_y_sesiones_repartidas_en_bloques(log_path):
+    with SpinLogWriter(log_path, sync_every=7, max_block=5) as writer:
+        for i in range(40):
+            writer.append(session=i % 2 if i >= 20 else 9, number=i % 37, timestamp_ns=i)
+    log = SpinLog(log_path)
+    assert len(log) == 40
+    assert log.session(9).tolist() == list(range(20))
+    assert log.session(0).tolist() == [n % 37 for n in range(20, 40, 2)]
+    assert log.blocks['count'].max() <= 5
+    first = log.blocks[log.session_blocks(9)]
+    assert first['start_ns'][0] == 0 and first['end_ns'][-1] == 19
+
+
+def test_flush_por_lotes(log_path):
+    writer = SpinLogWriter(log_path, sync_every=100, sync_interval=3600)
+    writer.extend(1, np.arange(37))
+    # Aún en memoria: el lector no lo ve
+    assert len(SpinLog(log_path)) == 0
+    writer.extend(1, np.arange(70) % 37)
+    assert len(SpinLog(log_path)) == 107
+    writer.append(2, 5)
+    writer.close()
+    assert len(SpinLog(log_path)) == 108
+
+
+def test_recuperacion_tras_caida(log_path):
+    data = write_sessions(log_path)
+    # Caída a mitad de un flush: giros sin indexar y un registro a medias
+    with open(log_path, 'ab') as f:
+        f.write(bytes(range(30)))
+    with open(log_path + INDEX_SUFFIX, 'ab') as f:
+        f.write(b'\x01' * (BLOCK_DTYPE.itemsize // 2))
+    assert len(SpinLog(log_path)) == 500
+
+    with SpinLogWriter(log_path) as writer:
+        writer.extend(7, [1, 2, 3])
+    log = SpinLog(log_path)
+    assert len(log) == 503
+    assert log.session(7).tolist() == [1, 2, 3]
+    assert np.array_equal(log.session(4), data[4])
+    assert os.path.getsize(log_path + INDEX_SUFFIX) == HEADER_SIZE + 6 * BLOCK_DTYPE.itemsize
+    assert log.verify()
+
+
+def test_crc_detecta_corrupcion(log_path):
+    write_sessions(log_path)
+    with open(log_path, 'r+b') as f:
+        f.seek(HEADER_SIZE + 250)
+        value = f.read(1)[0]
+        f.seek(HEADER_SIZE + 250)
+        f.write(bytes([(value + 1) % 37]))
+    assert not SpinLog(log_path).verify()
+
+
+def test_indice_sin_giros_es_error(log_path):
+    write_sessions(log_path)
+    os.truncate(log_path, HEADER_SIZE + 100)
+    with pytest.raises(ValueError):
+        SpinLog(log_path)
+
+
+def test_archivo_ajeno(tmp_path):
+    path = tmp_path / "otro.tkspin"
+    path.write_bytes(b'x' * 100)
+    (tmp_path / "otro.tkspin.idx").write_bytes(b'x' * 100)
+    with pytest.raises(ValueError):
+        SpinLog(str(path))
+
+
+@pytest.mark.parametrize("extension", [".csv", ".ndjson"])
+def test_exportar_e_importar(tmp_path, log_path, extension):
+    data = write_sessions(log_path)
+    target = str(tmp_path / f"historial{extension}")
+    assert export_file(log_path, target) == 500
+    copy = str(tmp_path / "copia.tkspin")
+    assert import_file(target, copy, batch=64) == 500
+    original, imported = SpinLog(log_path), SpinLog(copy)
+    assert np.array_equal(original.spins, imported.spins)
+    for session in data:
+        assert np.array_equal(imported.session(session), data[session])
+    # Los timestamps de bloque sobreviven la ida y vuelta
+    again = str(tmp_path / f"otra{extension}")
+    export_file(copy, again)
+    with open(target) as a, open(again) as b:
+        assert a.read() == b.read()
+
+
+def test_importar_csv_sin_mesa_y_con_fechas_iso(tmp_path, log_path):
+    source = tmp_path / "app.csv"
+    source.write_text("session,timestamp,number\n"
+                      "1,2025-12-15T10:00:00Z,17\n"
+                      "1,2025-12-15T10:00:30Z,0\n"
+                      "2,,36\n")
+    assert import_file(str(source), log_path) == 3
+    log = SpinLog(log_path)
+    assert log.session(1).tolist() == [17, 0]
+    block = log.blocks[log.session_blocks(1)[0]]
+    assert block['end_ns'] - block['start_ns'] == 30 * 10**9
+    assert log.blocks['table'].tolist() == [0, 0]
+
+
+def test_importar_numero_invalido(tmp_path, log_path):
+    source = tmp_path / "malo.ndjson"
+    source.write_text(json.dumps({"session": 1, "number": 40}) + "\n")
+    with pytest.raises(ValueError):
+        import_file(str(source), log_path)
+
+
+@pytest.mark.parametrize("row", ["1,2025-12-15T10:00:30Z,", ",2025-12-15T10:00:30Z,12"])
+def test_importar_columna_obligatoria_vacia(tmp_path, log_path, row):
+    source = tmp_path / "huecos.csv"
+    source.write_text("session,timestamp,number\n"
+                      "1,2025-12-15T10:00:00Z,17\n"
+                      f"{row}\n")
+    with pytest.raises(ValueError, match="fila 2"):
+        import_file(str(source), log_path)
+
+
+def test_validacion_rng_sobre_el_log(log_path):
+    write_sessions(log_path, sessions=20, spins=1000)
+    stats = scan_file(log_path, chunk_size=3000)
+    reference = StreamStats.from_chunk(SpinLog(log_path).spins)
+    assert stats.report()['tests'][0]['statistic'] == reference.report()['tests'][0]['statistic']
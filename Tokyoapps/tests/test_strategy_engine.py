@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests del motor vectorizado de sistemas de apuestas
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from martingale_markov import evaluate
+from martingale_sim import OUTCOME_MAX_SPINS, OUTCOME_RUIN, OUTCOME_STOP_LOSS, OUTCOME_TAKE_PROFIT
+from spin_engine import SpinEngine
+from strategy_engine import DEFAULT_STRATEGIES, Labouchere, Progression, StrategyEngine
+from wheel import BET_INDEX, BET_PAYOUTS, BET_WINS
+
+FIBONACCI = [1, 1]
+while len(FIBONACCI) < 100:
+    FIBONACCI.append(FIBONACCI[-1] + FIBONACCI[-2])
+
+
+def _play_reference(strategy, bet_name, spins, bankroll, max_spins, table_max=None,
+                    stop_loss=None, take_profit=None):
+    """Una sesión apuesta a apuesta, con las reglas de cada sistema escritas a mano."""
+    code = BET_INDEX[bet_name]
+    line0 = [1, 2, 3, 4]
+    level, line = 0, list(line0)
+
+    def current():
+        if strategy == 'flat':
+            return 1
+        if strategy in ('martingale', 'reverse_martingale'):
+            return 2 ** level
+        if strategy == 'fibonacci':
+            return FIBONACCI[level]
+        if strategy == 'dalembert':
+            return level + 1
+        return line[0] + line[-1] if len(line) > 1 else line[0]
+
+    units = wagered = 0
+    for spin, number in enumerate(spins[:max_spins], start=1):
+        stake = current()
+        win = bool(BET_WINS[code, number])
+        units += stake * BET_PAYOUTS[code] if win else -stake
+        wagered += stake
+        if strategy == 'martingale':
+            level = 0 if win else level + 1
+        elif strategy == 'reverse_martingale':
+            level = (level + 1) % 3 if win else 0
+        elif strategy == 'fibonacci':
+            level = max(level - 2, 0) if win else level + 1
+        elif strategy == 'dalembert':
+            level = max(level - 1, 0) if win else level + 1
+        elif strategy == 'labouchere':
+            if win:
+                line = list(line0) if len(line) <= 2 else line[1:-1]
+            elif len(line) >= 64:
+                line = list(line0)
+            else:
+                line.append(stake)
+        if table_max is not None and current() > table_max:
+            level, line = 0, list(line0)
+        if take_profit is not None and units >= take_profit:
+            return bankroll + units, spin, OUTCOME_TAKE_PROFIT, wagered
+        if stop_loss is not None and units <= -stop_loss:
+            return bankroll + units, spin, OUTCOME_STOP_LOSS, wagered
+        if bankroll + units < current():
+            return bankroll + units, spin, OUTCOME_RUIN, wagered
+    return bankroll + units, max_spins, OUTCOME_MAX_SPINS, wagered
+
+
+@pytest.mark.parametrize("limits", [
+    {},
+    {'table_max': 20},
+    {'stop_loss': 40, 'take_profit': 15},
+])
+def test_grilla_coincide_con_referencia(limits):
+    bets = ('red', 'first_dozen', 'third_column', '17')
+    engine = StrategyEngine(DEFAULT_STRATEGIES, bets, bankroll=60, max_spins=150, **limits)
+    spins = SpinEngine(seed=11).generate(120 * 150).reshape(120, 150)
+    columns = iter(spins.T)
+    result = engine.play(lambda size: next(columns), 120)
+    for s, strategy in enumerate(DEFAULT_STRATEGIES):
+        for b, bet in enumerate(bets):
+            for session in range(0, 120, 7):
+                expected = _play_reference(strategy, bet, spins[session].tolist(), 60, 150, **limits)
+                got = tuple(result[key][s, b, session]
+                            for key in ('final', 'lengths', 'outcomes', 'wagered'))
+                assert got == expected, (strategy, bet, session)
+
+
+def test_martingale_coincide_con_cadena_de_markov():
+    exact = evaluate(bankroll=63, max_spins=300)
+    engine = StrategyEngine(['martingale'], ['red'], bankroll=63, max_spins=300)
+    p = engine.run(50_000, seed=2)['grid']['martingale']['red']['ruin_probability']
+    assert abs(p - exact['ruin_probability']) < 4 * math.sqrt(p * (1 - p) / 50_000)
+
+
+def test_ningun_sistema_vence_a_la_casa():
+    report = StrategyEngine(['flat', 'dalembert'], ['red', 'first_dozen'], bankroll=1e6,
+                            max_spins=200).run(20_000, seed=3)
+    for row in report['grid'].values():
+        for summary in row.values():
+            assert summary['return_per_wagered'] == pytest.approx(-1 / 37, abs=0.01)
+
+
+def test_celdas_comparten_giros():
+    result = StrategyEngine(['flat'], ['red', 'black'], bankroll=1e6,
+                            max_spins=300).run_sessions(2_000, seed=4)
+    profit = result['final'][0] - 1e6
+    # Rojo y negro se cancelan salvo en los ceros, donde pierden ambos
+    zeros = (profit[0] + profit[1]) / -2
+    assert np.all(zeros >= 0) and zeros.mean() == pytest.approx(300 / 37, rel=0.1)
+
+
+def test_resultado_no_depende_de_workers():
+    engine = StrategyEngine(bets=['red', '17'], max_spins=200)
+    single = engine.run_sessions(3_000, seed=5, batch_size=1_000, workers=1)
+    pooled = engine.run_sessions(3_000, seed=5, batch_size=1_000, workers=3)
+    for key in single:
+        assert np.array_equal(single[key], pooled[key])
+
+
+def test_kernel_propio():
+    class Double(Progression):
+        name = 'double'
+
+        def bets(self, levels):
+            return np.full(levels.size, 2.0)
+
+        def advance(self, levels, win):
+            return np.zeros_like(levels)
+
+    result = StrategyEngine(['flat', Double()], ['red'], bankroll=1e6,
+                            max_spins=100).run_sessions(500, seed=6)
+    profit = result['final'][:, 0] - 1e6
+    assert np.array_equal(profit[1], 2 * profit[0])
+
+
+def test_validaciones():
+    with pytest.raises(ValueError):
+        StrategyEngine(bets=['rojo'])
+    with pytest.raises(ValueError):
+        StrategyEngine(['labouchere'], bankroll=4)
+    with pytest.raises(ValueError):
+        StrategyEngine(['labouchere'], table_max=4)
+    with pytest.raises(ValueError):
+        StrategyEngine(['labouchere', Labouchere(line=(1, 1))])
+    with pytest.raises(ValueError):
+        StrategyEngine().run(0)
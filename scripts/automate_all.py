@@ -11,9 +11,18 @@ from pathlib import Path
 from datetime import datetime
 import json
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "automation"))
+from incremental_build import IncrementalBuildState
+from output_capture import run_captured, tail_text
+from stage_graph import Stage, StageGraph, print_timing
+
 class ProjectAutomation:
-    def __init__(self, project_root):
+    def __init__(self, project_root, force_clean=False, max_parallel=3):
         self.project_root = Path(project_root)
+        self.force_clean = force_clean
+        self.max_parallel = max_parallel
+        self.build_state = IncrementalBuildState(self.project_root)
+        self.log_dir = self.project_root / ".automation" / "logs"
         self.results = {
             "timestamp": datetime.now().isoformat(),
             "steps": [],
@@ -33,8 +42,8 @@ class ProjectAutomation:
         color = color_codes.get(level, color_codes["INFO"])
         print(f"{color}{emoji} [{timestamp}] {message}{color_codes['RESET']}")
         
-    def run_command(self, command, step_name, timeout=300, check=True):
-        """Ejecuta un comando y registra resultado"""
+    def run_command(self, command, step_name, timeout=300, on_line=None):
+        """Ejecuta un comando y registra resultado (la salida va a un log por paso)"""
         self.log(f"Ejecutando: {step_name}", "🔧")
         
         step_result = {
@@ -42,37 +51,27 @@ class ProjectAutomation:
             "command": command if isinstance(command, str) else " ".join(command),
             "start_time": datetime.now().isoformat(),
             "success": False,
-            "output": "",
+            "log": None,
             "error": ""
         }
         
-        try:
-            result = subprocess.run(
-                command if isinstance(command, list) else command.split(),
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                check=check
-            )
-            
-            step_result["success"] = result.returncode == 0
-            step_result["output"] = result.stdout
-            step_result["error"] = result.stderr
-            
-            if result.returncode == 0:
-                self.log(f"{step_name} completado", "✅", "SUCCESS")
+        captured = run_captured(
+            command if isinstance(command, list) else command.split(),
+            self.project_root, step_name, self.log_dir, timeout=timeout,
+            on_line=on_line
+        )
+        step_result["success"] = captured["success"]
+        step_result["log"] = captured["log"]
+        
+        if captured["success"]:
+            self.log(f"{step_name} completado", "✅", "SUCCESS")
+        else:
+            if captured["timed_out"]:
+                self.log(f"{step_name} timeout", "⏱️", "ERROR")
             else:
-                self.log(f"{step_name} falló", "❌", "ERROR")
-                self.results["success"] = False
-                
-        except subprocess.TimeoutExpired:
-            self.log(f"{step_name} timeout", "⏱️", "ERROR")
-            step_result["error"] = "Timeout"
-            self.results["success"] = False
-        except Exception as e:
-            self.log(f"{step_name} error: {str(e)}", "❌", "ERROR")
-            step_result["error"] = str(e)
+                self.log(f"{step_name} falló (log: {captured['log']})", "❌", "ERROR")
+            # Solo el final de la salida; el resto queda en el log
+            step_result["error"] = tail_text(captured)
             self.results["success"] = False
             
         step_result["end_time"] = datetime.now().isoformat()
@@ -100,28 +99,70 @@ class ProjectAutomation:
                 
         return all_ok
         
+    def incremental_clean(self, on_line=None):
+        """Ejecuta flutter clean solo si algo invalida los caches incrementales"""
+        decision = self.build_state.decide(force_clean=self.force_clean)
+        self.results["clean"] = decision
+        if not decision["clean"]:
+            self.log(f"Limpieza omitida: {decision['reason']}", "♻️", "SUCCESS")
+            return True
+        return self.run_command("flutter clean", f"Limpieza ({decision['reason']})", on_line=on_line)
+        
+    def build_apk_debug(self, on_line=None):
+        """Build APK debug registrando la huella del build incremental (tras pub-get)"""
+        self.build_state.mark_started()
+        success = self.run_command("flutter build apk --debug --no-pub", "Build APK Debug",
+                                   timeout=600, on_line=on_line)
+        self.build_state.mark_finished(success)
+        return success
+        
+    def pipeline_stages(self, output):
+        """Etapas del pipeline; analyze, test y build solo dependen de pub get
+
+        Corren en paralelo tras la etapa pub-get, así que van con --no-pub:
+        si no, cada una resolvería dependencias por su cuenta y competirían
+        por .dart_tool/package_config.json.
+        """
+        return [
+            Stage("prerequisitos", self.check_prerequisites),
+            Stage("limpieza", lambda: self.incremental_clean(output("limpieza")),
+                  deps=["prerequisitos"], critical=False),
+            Stage("pub-get", lambda: self.run_command(
+                "flutter pub get", "Dependencias", on_line=output("pub-get")),
+                  deps=["limpieza"]),
+            Stage("analyze", lambda: self.run_command(
+                "flutter analyze --no-pub", "Análisis estático", on_line=output("analyze")),
+                  deps=["pub-get"], critical=False),
+            Stage("test", lambda: self.run_command(
+                "flutter test --no-pub", "Tests unitarios", timeout=600, on_line=output("test")),
+                  deps=["pub-get"], critical=False),
+            Stage("build-debug", lambda: self.build_apk_debug(output("build-debug")),
+                  deps=["pub-get"]),
+        ]
+        
     def run_full_pipeline(self):
-        """Ejecuta el pipeline completo"""
-        self.log("INICIANDO PIPELINE COMPLETO", "🚀")
+        """Ejecuta el pipeline completo (etapas independientes en paralelo)"""
+        self.log(f"INICIANDO PIPELINE COMPLETO (paralelo={self.max_parallel})", "🚀")
         print("=" * 60)
         
-        steps = [
-            (self.check_prerequisites, "Prerequisitos", True),
-            (lambda: self.run_command("flutter clean", "Limpieza"), False),
-            (lambda: self.run_command("flutter pub get", "Dependencias"), True),
-            (lambda: self.run_command("flutter analyze", "Análisis estático"), False),
-            (lambda: self.run_command("flutter test", "Tests unitarios"), False),
-            (lambda: self.run_command("flutter build apk --debug", "Build APK Debug", timeout=600), True),
-        ]
+        # Las etapas piden su salida con prefijo al grafo cuando se ejecutan
+        graph = StageGraph(self.pipeline_stages(lambda name: graph.output(name)),
+                           max_parallel=self.max_parallel)
+        outcome = graph.run()
         
-        for step_func, step_name, critical in steps:
-            success = step_func()
-            if not success and critical:
-                self.log(f"Paso crítico falló: {step_name}", "💥", "ERROR")
-                break
-            elif not success:
-                self.log(f"Paso falló pero continuando: {step_name}", "⚠️", "WARNING")
-                
+        for name, stage in outcome["stages"].items():
+            if stage["status"] == "passed":
+                continue
+            if stage["status"] == "skipped":
+                self.log(f"Etapa omitida: {name} ({stage['error']})", "⏭️", "WARNING")
+            elif stage["critical"]:
+                self.log(f"Etapa crítica falló: {name}", "💥", "ERROR")
+            else:
+                self.log(f"Etapa falló sin cancelar las demás: {name}", "⚠️", "WARNING")
+        
+        self.results["stages"] = outcome["stages"]
+        self.results["timing"] = outcome["timing"]
+        self.results["success"] = self.results["success"] and outcome["success"]
         self.generate_report()
         
     def generate_report(self):
@@ -143,6 +184,8 @@ class ProjectAutomation:
         total = len(self.results["steps"])
         successful = sum(1 for s in self.results["steps"] if s["success"])
         print(f"\n📊 Resumen: {successful}/{total} pasos exitosos")
+        if "timing" in self.results:
+            print_timing(self.results["timing"])
         
         # Mostrar APK si existe
         apk_path = self.project_root / "build/app/outputs/flutter-apk/app-debug.apk"
@@ -151,7 +194,9 @@ class ProjectAutomation:
             self.log(f"APK: {apk_path} ({size_mb:.2f} MB)", "📦", "SUCCESS")
 
 if __name__ == "__main__":
-    project_root = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
-    automation = ProjectAutomation(project_root)
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    project_root = args[0] if args else os.getcwd()
+    automation = ProjectAutomation(project_root, force_clean="--clean" in sys.argv,
+                                   max_parallel=1 if "--sequential" in sys.argv else 3)
     automation.run_full_pipeline()
     sys.exit(0 if automation.results["success"] else 1)
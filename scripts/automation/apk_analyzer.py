@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+APK Analyzer - Tokyo Roulette
+Version: 1.0.0
+
+Desglose del tamaño de una APK/AAB leyendo solo el directorio central del
+ZIP sobre mmap: no se extrae ni se descomprime nada, así que la memoria es
+constante y un bundle de 200 MB se analiza en milisegundos. Agrupa las
+entradas por categoría (librerías nativas por ABI, snapshot AOT de Dart,
+flutter_assets, dex, recursos) y compara dos builds entrada por entrada
+para atribuir una regresión de tamaño a archivos concretos.
+"""
+
+import json
+import mmap
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple
+
+# Firmas del formato ZIP
+EOCD_SIGNATURE = b'PK\x05\x06'
+EOCD64_LOCATOR_SIGNATURE = b'PK\x06\x07'
+EOCD64_SIGNATURE = b'PK\x06\x06'
+CENTRAL_HEADER_SIGNATURE = b'PK\x01\x02'
+
+EOCD_FORMAT = '<4sHHHHIIH'
+EOCD64_LOCATOR_FORMAT = '<4sIQI'
+EOCD64_FORMAT = '<4sQHHIIQQQQ'
+CENTRAL_HEADER_FORMAT = '<4sHHHHHHIIIHHHHHII'
+CENTRAL_HEADER_SIZE = struct.calcsize(CENTRAL_HEADER_FORMAT)
+
+# El comentario del ZIP puede ocupar hasta 64 KB detrás del EOCD
+MAX_EOCD_SEARCH = struct.calcsize(EOCD_FORMAT) + 0xFFFF
+
+ZIP64_EXTRA_ID = 0x0001
+UTF8_FLAG = 0x800
+
+
+class ZipEntry(NamedTuple):
+    name: str
+    compressed_size: int
+    uncompressed_size: int
+    method: int
+
+
+def _zip64_sizes(extra: bytes, uncompressed: int, compressed: int) -> tuple:
+    """Tamaños reales de una entrada cuyo header usa el marcador ZIP64."""
+    pos = 0
+    while pos + 4 <= len(extra):
+        header_id, length = struct.unpack_from('<HH', extra, pos)
+        if header_id == ZIP64_EXTRA_ID:
+            values = list(struct.unpack_from(f'<{length // 8}Q', extra, pos + 4))
+            # Solo aparecen los campos que en el header valen 0xFFFFFFFF, en este orden
+            if uncompressed == 0xFFFFFFFF and values:
+                uncompressed = values.pop(0)
+            if compressed == 0xFFFFFFFF and values:
+                compressed = values.pop(0)
+            break
+        pos += 4 + length
+    return uncompressed, compressed
+
+
+def iter_entries(path: Path) -> Iterator[ZipEntry]:
+    """Recorre el directorio central del ZIP sin leer los datos comprimidos.
+
+    Un directorio central truncado o corrupto se informa como ValueError,
+    igual que el resto de artefactos ilegibles.
+    """
+    try:
+        yield from _central_directory(path)
+    except struct.error as e:
+        raise ValueError(f'{path}: directorio central truncado ({e})') from e
+
+
+def _central_directory(path: Path) -> Iterator[ZipEntry]:
+    with open(path, 'rb') as f:
+        try:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError(f'{path} está vacío')
+        with view:
+            eocd = view.rfind(EOCD_SIGNATURE, max(0, len(view) - MAX_EOCD_SEARCH))
+            if eocd < 0:
+                raise ValueError(f'{path} no es un archivo ZIP')
+            (_, _, _, _, total, _, cd_offset, _) = struct.unpack_from(EOCD_FORMAT, view, eocd)
+
+            locator = eocd - struct.calcsize(EOCD64_LOCATOR_FORMAT)
+            if locator >= 0 and view[locator:locator + 4] == EOCD64_LOCATOR_SIGNATURE:
+                eocd64 = struct.unpack_from(EOCD64_LOCATOR_FORMAT, view, locator)[2]
+                record = struct.unpack_from(EOCD64_FORMAT, view, eocd64)
+                if record[0] == EOCD64_SIGNATURE:
+                    total, cd_offset = record[7], record[9]
+
+            pos = cd_offset
+            for _ in range(total):
+                header = struct.unpack_from(CENTRAL_HEADER_FORMAT, view, pos)
+                if header[0] != CENTRAL_HEADER_SIGNATURE:
+                    raise ValueError(f'Directorio central corrupto en el byte {pos}')
+                flags, method = header[3], header[4]
+                compressed, uncompressed = header[8], header[9]
+                name_len, extra_len, comment_len = header[10], header[11], header[12]
+                name_start = pos + CENTRAL_HEADER_SIZE
+                raw_name = view[name_start:name_start + name_len]
+                name = raw_name.decode('utf-8' if flags & UTF8_FLAG else 'cp437')
+                if compressed == 0xFFFFFFFF or uncompressed == 0xFFFFFFFF:
+                    extra = view[name_start + name_len:name_start + name_len + extra_len]
+                    uncompressed, compressed = _zip64_sizes(extra, uncompressed, compressed)
+                if not name.endswith('/'):
+                    yield ZipEntry(name, compressed, uncompressed, method)
+                pos = name_start + name_len + extra_len + comment_len
+
+
+def is_bundle(path: Path) -> bool:
+    return Path(path).suffix == '.aab'
+
+
+def categorize(name: str, bundle: bool = False) -> str:
+    """Categoría de tamaño de una entrada de APK o AAB."""
+    parts = name.split('/')
+    if bundle:
+        # En un AAB las rutas de cada módulo llevan su nombre delante (base/...)
+        if parts[0] in ('BUNDLE-METADATA', 'META-INF') or len(parts) == 1:
+            return 'bundle_metadata'
+        parts = parts[1:]
+        if parts[0] == 'dex':
+            return 'dex'
+        if parts[0] in ('manifest', 'root'):
+            return 'manifest_other'
+
+    path = '/'.join(parts)
+    if parts[0] == 'lib' and len(parts) >= 3:
+        abi = parts[1]
+        if parts[-1] == 'libapp.so':
+            return f'dart_aot:{abi}'
+        return f'native:{abi}'
+    if path.startswith('assets/flutter_assets/'):
+        return 'flutter_assets'
+    if parts[0] == 'assets':
+        return 'assets'
+    if parts[-1].endswith('.dex'):
+        return 'dex'
+    if parts[0] == 'res' or parts[-1] in ('resources.arsc', 'resources.pb'):
+        return 'resources'
+    if parts[0] == 'META-INF':
+        return 'signature'
+    return 'manifest_other'
+
+
+def analyze(path: Path, top: int = 20) -> Dict:
+    """Desglose por categoría y las entradas más grandes de una APK/AAB."""
+    path = Path(path)
+    bundle = is_bundle(path)
+    categories: Dict[str, Dict] = {}
+    largest: List[ZipEntry] = []
+    count = 0
+    for entry in iter_entries(path):
+        count += 1
+        category = categories.setdefault(categorize(entry.name, bundle), {
+            'entries': 0, 'compressed_bytes': 0, 'uncompressed_bytes': 0
+        })
+        category['entries'] += 1
+        category['compressed_bytes'] += entry.compressed_size
+        category['uncompressed_bytes'] += entry.uncompressed_size
+        if not top:
+            continue
+        largest.append(entry)
+        if len(largest) > top * 4:
+            largest = sorted(largest, key=lambda e: e.compressed_size, reverse=True)[:top]
+
+    largest = sorted(largest, key=lambda e: e.compressed_size, reverse=True)[:top]
+    file_size = path.stat().st_size
+    for category in categories.values():
+        category['percent'] = round(100 * category['compressed_bytes'] / file_size, 1) if file_size else 0
+    return {
+        'path': str(path),
+        'size_bytes': file_size,
+        'entries': count,
+        'categories': dict(sorted(categories.items(),
+                                  key=lambda item: item[1]['compressed_bytes'], reverse=True)),
+        'largest': [{'name': e.name, 'compressed_bytes': e.compressed_size,
+                     'uncompressed_bytes': e.uncompressed_size} for e in largest]
+    }
+
+
+def category_sizes(path: Path) -> Dict[str, int]:
+    """Bytes comprimidos por categoría, o {} si el artefacto no es legible."""
+    try:
+        categories = analyze(path, top=0)['categories']
+    except (OSError, ValueError):
+        return {}
+    return {name: category['compressed_bytes'] for name, category in categories.items()}
+
+
+def diff(old_path: Path, new_path: Path, top: int = 20) -> Dict:
+    """Compara dos builds entrada por entrada (tamaño comprimido)."""
+    old_bundle, new_bundle = is_bundle(old_path), is_bundle(new_path)
+    old_entries = {e.name: e.compressed_size for e in iter_entries(Path(old_path))}
+    changes = []
+    category_delta: Dict[str, int] = {}
+    for entry in iter_entries(Path(new_path)):
+        before = old_entries.pop(entry.name, None)
+        delta = entry.compressed_size - (before or 0)
+        if delta:
+            changes.append({'name': entry.name, 'status': 'added' if before is None else 'changed',
+                            'old_bytes': before or 0, 'new_bytes': entry.compressed_size,
+                            'delta_bytes': delta})
+            category = categorize(entry.name, new_bundle)
+            category_delta[category] = category_delta.get(category, 0) + delta
+    for name, before in old_entries.items():
+        changes.append({'name': name, 'status': 'removed', 'old_bytes': before,
+                        'new_bytes': 0, 'delta_bytes': -before})
+        category = categorize(name, old_bundle)
+        category_delta[category] = category_delta.get(category, 0) - before
+
+    changes.sort(key=lambda c: abs(c['delta_bytes']), reverse=True)
+    return {
+        'old': str(old_path),
+        'new': str(new_path),
+        'delta_bytes': Path(new_path).stat().st_size - Path(old_path).stat().st_size,
+        'categories': dict(sorted(category_delta.items(), key=lambda item: abs(item[1]), reverse=True)),
+        'changes': changes[:top],
+        'changed_entries': len(changes)
+    }
+
+
+def _format_bytes(value: int) -> str:
+    sign = '-' if value < 0 else ''
+    value = abs(value)
+    for unit in ('B', 'KB', 'MB'):
+        if value < 1024 or unit == 'MB':
+            return f"{sign}{value:.1f} {unit}" if unit != 'B' else f"{sign}{value} B"
+        value /= 1024
+
+
+def print_analysis(report: Dict):
+    print(f"\n📦 {report['path']} ({_format_bytes(report['size_bytes'])}, {report['entries']} entradas)")
+    for name, category in report['categories'].items():
+        print(f"   {name:<24} {_format_bytes(category['compressed_bytes']):>10} "
+              f"{category['percent']:>5}%  ({category['entries']} entradas)")
+    print("\n   Entradas más grandes:")
+    for entry in report['largest'][:10]:
+        print(f"   {_format_bytes(entry['compressed_bytes']):>10}  {entry['name']}")
+
+
+def print_diff(report: Dict):
+    print(f"\n🔍 {report['old']} → {report['new']}: {_format_bytes(report['delta_bytes'])}")
+    for name, delta in report['categories'].items():
+        print(f"   {name:<24} {'+' if delta > 0 else ''}{_format_bytes(delta)}")
+    print(f"\n   Cambios ({report['changed_entries']} entradas):")
+    for change in report['changes']:
+        delta = change['delta_bytes']
+        print(f"   {'+' if delta > 0 else ''}{_format_bytes(delta):>10}  [{change['status']}] {change['name']}")
+
+
+def main():
+    """Punto de entrada principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Desglose de tamaño de APK/AAB')
+    parser.add_argument('artifact', type=str, help='APK o AAB a analizar')
+    parser.add_argument('--diff', type=str, default=None, metavar='ANTERIOR',
+                        help='Build anterior con el que comparar entrada por entrada')
+    parser.add_argument('--top', type=int, default=20, help='Entradas a listar')
+    parser.add_argument('--json', type=str, default=None, help='Guardar el resultado en JSON')
+    args = parser.parse_args()
+
+    try:
+        if args.diff:
+            report = diff(Path(args.diff), Path(args.artifact), top=args.top)
+            print_diff(report)
+        else:
+            report = analyze(Path(args.artifact), top=args.top)
+            print_analysis(report)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Reporte: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
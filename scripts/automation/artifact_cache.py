@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Artifact Cache - Tokyo Roulette
+Version: 1.0.0
+
+Cache local de APK/AAB direccionado por contenido.
+La clave es un hash de todas las entradas del build (lib/, android/,
+assets/, pubspec.yaml, pubspec.lock) más el modo de build y las versiones
+del toolchain. Si la clave coincide, los artefactos se restauran por
+copia y Flutter no se ejecuta. Evicción LRU por tamaño y
+número de entradas.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from incremental_build import file_hash
+
+# Entradas del build que forman parte de la clave
+BUILD_INPUTS = ['lib', 'android', 'assets', 'pubspec.yaml', 'pubspec.lock']
+
+# Directorios generados dentro de las entradas que no afectan al resultado
+IGNORED_DIRS = {'.gradle', 'build', '.cxx', '.idea', '.dart_tool'}
+
+
+def compute_key(root_path: Path, variant: str, toolchain: Dict) -> str:
+    """Hash de las entradas del build, la variante y el toolchain."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'variant': variant, 'toolchain': toolchain},
+                             sort_keys=True).encode('utf-8'))
+    for entry in BUILD_INPUTS:
+        path = root_path / entry
+        if path.is_file():
+            files = [path]
+        elif path.is_dir():
+            files = []
+            for current, dirs, names in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS)
+                files.extend(Path(current) / name for name in sorted(names))
+        else:
+            continue
+        for file in files:
+            digest.update(file.relative_to(root_path).as_posix().encode('utf-8'))
+            digest.update(b'\0')
+            digest.update((file_hash(file) or '').encode('ascii'))
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """Almacén de artefactos de build con evicción LRU."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 2 * 1024 ** 3, max_entries: int = 20):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def _read_meta(self, key: str) -> Optional[Dict]:
+        meta_file = self._entry_dir(key) / 'meta.json'
+        try:
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, key: str, meta: Dict):
+        with open(self._entry_dir(key) / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+    def _evict(self, key: str):
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def restore(self, key: str, root_path: Path) -> Optional[List[Path]]:
+        """Restaura los artefactos de la clave en su ruta original.
+
+        Retorna las rutas restauradas o None si no hay entrada válida.
+        Las entradas cuyo contenido no coincide con su hash se descartan.
+        """
+        meta = self._read_meta(key)
+        if not meta:
+            return None
+
+        restored = []
+        for artifact in meta['artifacts']:
+            cached = self._entry_dir(key) / artifact['name']
+            if file_hash(cached) != artifact['sha256']:
+                print(f"   ⚠️  Entrada de cache corrupta, descartada: {key[:12]}")
+                self._evict(key)
+                return None
+            target = root_path / artifact['path']
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if target.exists():
+                target.unlink()
+            # Copia, no hardlink: una escritura posterior sobre el artefacto
+            # restaurado no debe alterar la entrada del cache
+            shutil.copy2(cached, target)
+            restored.append(target)
+
+        meta['last_used'] = time.time()
+        meta['hits'] = meta.get('hits', 0) + 1
+        self._write_meta(key, meta)
+        return restored
+
+    def store(self, key: str, artifacts: List[Path], root_path: Path):
+        """Guarda copias de los artefactos bajo la clave y aplica la evicción."""
+        entry = self._entry_dir(key)
+        tmp_entry = entry.with_name(key + '.tmp')
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        tmp_entry.mkdir(parents=True)
+
+        meta = {'created': time.time(), 'last_used': time.time(), 'hits': 0,
+                'size': 0, 'artifacts': []}
+        for index, artifact in enumerate(artifacts):
+            name = f"{index}-{artifact.name}"
+            # Copia, no hardlink: un build posterior no debe alterar el cache
+            shutil.copy2(artifact, tmp_entry / name)
+            meta['size'] += artifact.stat().st_size
+            meta['artifacts'].append({
+                'name': name,
+                'path': artifact.relative_to(root_path).as_posix(),
+                'sha256': file_hash(artifact)
+            })
+        with open(tmp_entry / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+        self._evict(key)
+        tmp_entry.rename(entry)
+        self.enforce_limits()
+
+    def entries(self) -> List[Dict]:
+        """Entradas del cache, de la menos a la más recientemente usada."""
+        result = []
+        if not self.cache_dir.exists():
+            return result
+        for entry in self.cache_dir.iterdir():
+            if entry.is_dir() and not entry.name.endswith('.tmp'):
+                meta = self._read_meta(entry.name)
+                if meta:
+                    result.append(dict(meta, key=entry.name))
+        result.sort(key=lambda m: m['last_used'])
+        return result
+
+    def enforce_limits(self):
+        """Elimina entradas LRU hasta cumplir tamaño y número máximos."""
+        entries = self.entries()
+        total = sum(e['size'] for e in entries)
+        while entries and (total > self.max_bytes or len(entries) > self.max_entries):
+            oldest = entries.pop(0)
+            total -= oldest['size']
+            self._evict(oldest['key'])
+            print(f"   🗑️  Cache LRU: eliminada entrada {oldest['key'][:12]}")
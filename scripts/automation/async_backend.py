@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Async Backend - Tokyo Roulette
+Version: 1.0.0
+
+Backend asyncio para lanzar procesos de test desde un solo hilo.
+Usa `asyncio.create_subprocess_exec`, lee stdout/stderr línea a línea a
+medida que llegan y aplica timeouts y cancelación matando el grupo de
+procesos completo.
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+from typing import Callable, List, Optional, Tuple
+
+# Límite por línea del StreamReader: los eventos JSON de flutter pueden
+# incluir stack traces largos
+STREAM_LIMIT = 1024 * 1024
+
+
+def _signal_group(process: asyncio.subprocess.Process, sig: int):
+    """Envía una señal al grupo del proceso si sigue vivo."""
+    if process.returncode is not None:
+        return
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, sig)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _pump(stream: asyncio.StreamReader, sink: List[str],
+                on_line: Optional[Callable[[str], None]]):
+    """Consume un stream línea a línea, notificando cada línea recibida."""
+    while True:
+        raw = await stream.readline()
+        if not raw:
+            break
+        line = raw.decode('utf-8', errors='replace')
+        sink.append(line)
+        if on_line:
+            on_line(line)
+
+
+def _consume_result(future: asyncio.Future):
+    """Marca como leída la excepción de un future cancelado junto a su tarea."""
+    if not future.cancelled():
+        future.exception()
+
+
+class AsyncProcessExecutor:
+    """Ejecuta comandos concurrentes limitados por un semáforo."""
+
+    def __init__(self, concurrency: int):
+        # El semáforo se crea dentro del event loop (requisito en Python < 3.10)
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(self, command: List[str], cwd: str, timeout: Optional[float],
+                  on_line: Optional[Callable[[str], None]] = None) -> Tuple[int, str, str]:
+        """Ejecuta un comando y retorna (exit_code, stdout, stderr).
+
+        Lanza `subprocess.TimeoutExpired` al exceder el timeout, tras matar el
+        grupo. Si la tarea es cancelada (fail-fast), termina el grupo y
+        propaga `asyncio.CancelledError`.
+        """
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT,
+            start_new_session=(os.name == 'posix')
+        )
+        stdout, stderr = [], []
+        work = asyncio.gather(
+            _pump(process.stdout, stdout, on_line),
+            _pump(process.stderr, stderr, None),
+            process.wait()
+        )
+        work.add_done_callback(_consume_result)
+        try:
+            await asyncio.wait_for(work, timeout)
+        except asyncio.TimeoutError:
+            _signal_group(process, signal.SIGKILL)
+            await process.wait()
+            raise subprocess.TimeoutExpired(command, timeout)
+        except asyncio.CancelledError:
+            _signal_group(process, signal.SIGTERM)
+            await asyncio.shield(process.wait())
+            raise
+        return process.returncode, ''.join(stdout), ''.join(stderr)
@@ -4,53 +4,86 @@ Build Bot - Tokyo Roulette
 Version: 1.0.0
 
 Automatización completa del proceso de build APK.
-Incluye limpieza, verificación y métricas.
+Incluye limpieza incremental, verificación y métricas.
 """
 
-import subprocess
 import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Tuple
+from typing import Callable, Optional, Tuple
+
+from apk_analyzer import category_sizes
+from artifact_cache import ArtifactCache, compute_key
+from build_matrix import BuildMatrix, parse_variants
+from build_profile import BuildProfiler, print_profile
+from build_metrics import (BuildMetricsStore, DEFAULT_SIZE_THRESHOLD, DEFAULT_TIME_THRESHOLD,
+                           PhaseTimer, build_record, print_comparison, toolchain_versions)
+from dependency_cache import DependencyCache
+from incremental_build import IncrementalBuildState
+from output_capture import run_captured, tail_text
 
 class BuildBot:
     """Bot automatizado para builds de Flutter."""
     
-    def __init__(self, root_path: str):
+    def __init__(self, root_path: str, force_clean: bool = False,
+                 cache: Optional[ArtifactCache] = None, compare: bool = False,
+                 time_threshold: float = DEFAULT_TIME_THRESHOLD,
+                 size_threshold: float = DEFAULT_SIZE_THRESHOLD,
+                 deps: Optional[DependencyCache] = None, offline: bool = False):
         self.root_path = Path(root_path)
+        self.force_clean = force_clean
+        self.build_state = IncrementalBuildState(root_path)
+        self.clean_decision = None
+        self.cache = cache
+        self.cache_key = None
+        self.cache_hit = False
+        self.metrics_store = BuildMetricsStore.for_project(self.root_path)
+        self.compare = compare
+        self.time_threshold = time_threshold
+        self.size_threshold = size_threshold
+        self.timer = None
+        self.profile = None
+        self.log_dir = self.root_path / '.automation' / 'logs'
+        self.offline = offline
+        # Con el cache de dependencias precargado, pub y Gradle lo usan
+        self.env = deps.env(offline) if deps and (offline or deps.is_warm()) else None
         self.build_start = None
         self.build_end = None
         self.apk_path = None
     
-    def run_command(self, command: list, description: str) -> Tuple[bool, str]:
-        """Ejecuta un comando y retorna éxito y output."""
+    def run_command(self, command: list, description: str,
+                    on_line: Optional[Callable[[str], None]] = None) -> Tuple[bool, str]:
+        """Ejecuta un comando y retorna éxito y las últimas líneas de salida.
+        
+        La salida completa queda en `.automation/logs/<paso>.log`.
+        """
         print(f"\n🔧 {description}")
         print(f"   Comando: {' '.join(command)}")
         
-        try:
-            result = subprocess.run(
-                command,
-                cwd=self.root_path,
-                capture_output=True,
-                text=True,
-                timeout=600  # 10 minutos timeout
-            )
-            
-            if result.returncode == 0:
-                print(f"   ✅ Éxito")
-                return True, result.stdout
-            else:
-                print(f"   ❌ Falló con código {result.returncode}")
-                print(f"   Error: {result.stderr[:200]}")
-                return False, result.stderr
-        
-        except subprocess.TimeoutExpired:
+        captured = run_captured(command, self.root_path, description, self.log_dir,
+                                timeout=600, env=self.env, on_line=on_line)
+        if captured['success']:
+            print(f"   ✅ Éxito")
+        elif captured['timed_out']:
             print(f"   ⏱️  Timeout después de 10 minutos")
-            return False, "Timeout"
-        except Exception as e:
-            print(f"   💥 Excepción: {str(e)}")
-            return False, str(e)
+        elif captured['returncode'] is None:
+            print(f"   💥 Excepción: {captured['tail']}")
+        else:
+            print(f"   ❌ Falló con código {captured['returncode']} (log: {captured['log']})")
+            print("   Últimas líneas:")
+            for line in tail_text(captured).splitlines():
+                print(f"   | {line}")
+        return captured['success'], captured['tail']
+    
+    def run_profiled(self, command: list, description: str, label: str) -> bool:
+        """Ejecuta un build en streaming y guarda su perfil de tareas."""
+        profiler = BuildProfiler()
+        success, _ = self.run_command(command, description, on_line=profiler.feed)
+        profiler.finish()
+        self.profile = profiler.write(self.root_path / '.automation' / 'profiles', label)
+        print_profile(self.profile)
+        return success
     
     def clean_build(self) -> bool:
         """Limpia archivos de build anteriores."""
@@ -62,18 +95,20 @@ class BuildBot:
     
     def get_dependencies(self) -> bool:
         """Obtiene dependencias de Flutter."""
-        success, _ = self.run_command(
-            ['flutter', 'pub', 'get'],
-            'Obteniendo dependencias'
-        )
+        command = ['flutter', 'pub', 'get'] + (['--offline'] if self.offline else [])
+        success, _ = self.run_command(command, 'Obteniendo dependencias')
         return success
     
     def build_apk(self, release: bool = True) -> bool:
         """Construye APK en modo release o debug."""
         mode = 'release' if release else 'debug'
-        success, _ = self.run_command(
-            ['flutter', 'build', 'apk', f'--{mode}'],
-            f'Construyendo APK en modo {mode}'
+        command = ['flutter', 'build', 'apk', f'--{mode}', '--verbose']
+        if self.offline:
+            command.append('--no-pub')
+        success = self.run_profiled(
+            command,
+            f'Construyendo APK en modo {mode}',
+            f'apk-{mode}'
         )
         
         if success:
@@ -90,6 +125,29 @@ class BuildBot:
         
         return False
     
+    def _cache_key(self, mode: str) -> str:
+        """Clave del cache para el modo actual y el toolchain instalado."""
+        fingerprint = self.build_state.fingerprint()
+        toolchain = {
+            'flutter': fingerprint['flutter_version'],
+            'agp': fingerprint['agp_version'],
+            'gradle_wrapper': fingerprint['gradle_wrapper']
+        }
+        return compute_key(self.root_path, f'apk-{mode}', toolchain)
+    
+    def restore_from_cache(self, release: bool = True) -> bool:
+        """Restaura el APK desde el cache si las entradas no cambiaron."""
+        mode = 'release' if release else 'debug'
+        self.cache_key = self._cache_key(mode)
+        restored = self.cache.restore(self.cache_key, self.root_path)
+        if not restored:
+            print(f"\n📭 Cache miss ({self.cache_key[:12]})")
+            return False
+        self.apk_path = restored[0]
+        self.cache_hit = True
+        print(f"\n📬 Cache hit ({self.cache_key[:12]}): {self.apk_path}")
+        return True
+    
     def get_apk_metrics(self) -> dict:
         """Obtiene métricas del APK generado."""
         if not self.apk_path or not self.apk_path.exists():
@@ -102,7 +160,15 @@ class BuildBot:
             'path': str(self.apk_path),
             'size_bytes': size_bytes,
             'size_mb': round(size_mb, 2),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now().isoformat(),
+            'clean': self.clean_decision,
+            'breakdown': category_sizes(self.apk_path),
+            'profile': self.profile,
+            'cache': {
+                'enabled': self.cache is not None,
+                'hit': self.cache_hit,
+                'key': self.cache_key
+            }
         }
     
     def run_full_pipeline(self, release: bool = True) -> bool:
@@ -112,25 +178,76 @@ class BuildBot:
         print("=" * 60)
         
         self.build_start = time.time()
+        self.timer = PhaseTimer()
+        mode = 'release' if release else 'debug'
         
-        # Paso 1: Limpiar
-        if not self.clean_build():
-            print("\n❌ Falló la limpieza")
-            return False
+        # Paso 0: Entradas idénticas a un build anterior → restaurar sin Flutter
+        if self.cache and self.restore_from_cache(release=release):
+            self.clean_decision = {'clean': False, 'reason': 'artefacto restaurado del cache'}
+            self.build_end = time.time()
+            self.record_metrics(mode, True)
+            return self._report_metrics()
+        
+        # Paso 1: Limpiar solo si algo invalida los caches incrementales
+        self.clean_decision = self.build_state.decide(force_clean=self.force_clean)
+        if self.clean_decision['clean']:
+            print(f"\n🧹 Limpieza necesaria: {self.clean_decision['reason']}")
+            with self.timer.phase('clean'):
+                cleaned = self.clean_build()
+            if not cleaned:
+                print("\n❌ Falló la limpieza")
+                self.record_metrics(mode, False)
+                return False
+        else:
+            print(f"\n♻️  Build incremental: {self.clean_decision['reason']}")
+        
+        self.build_state.mark_started()
         
         # Paso 2: Obtener dependencias
-        if not self.get_dependencies():
+        with self.timer.phase('pub_get'):
+            got_dependencies = self.get_dependencies()
+        if not got_dependencies:
             print("\n❌ Falló la obtención de dependencias")
+            self.build_state.mark_finished(False)
+            self.record_metrics(mode, False)
             return False
         
-        # Paso 3: Build APK
-        if not self.build_apk(release=release):
+        # Paso 3: Build APK (Gradle + empaquetado)
+        with self.timer.phase('build'):
+            built = self.build_apk(release=release)
+        if not built:
             print("\n❌ Falló el build de APK")
+            self.build_state.mark_finished(False)
+            self.record_metrics(mode, False)
             return False
         
+        self.build_state.mark_finished(True)
         self.build_end = time.time()
         
-        # Métricas
+        if self.cache:
+            self.cache.store(self.cache_key, [self.apk_path], self.root_path)
+            print(f"   💾 APK guardada en cache ({self.cache_key[:12]})")
+        
+        self.record_metrics(mode, True)
+        return self._report_metrics()
+    
+    def record_metrics(self, mode: str, success: bool):
+        """Agrega la ejecución a la serie temporal y compara con el baseline."""
+        artifacts = [self.apk_path] if success and self.apk_path else []
+        if self.profile:
+            for phase, seconds in self.profile['phases'].items():
+                self.timer.add(f'build.{phase}', seconds)
+        record = build_record('build_bot', f'apk-{mode}', success, self.timer.phases,
+                              self.timer.total(), artifacts,
+                              toolchain_versions(self.build_state), cache_hit=self.cache_hit,
+                              clean=self.clean_decision)
+        self.metrics_store.append(record)
+        if self.compare:
+            print_comparison(self.metrics_store.compare(
+                record, time_threshold=self.time_threshold, size_threshold=self.size_threshold))
+    
+    def _report_metrics(self) -> bool:
+        """Muestra las métricas del build terminado."""
         metrics = self.get_apk_metrics()
         build_duration = self.build_end - self.build_start
         
@@ -141,6 +258,11 @@ class BuildBot:
         print(f"📦 APK:       {metrics.get('path', 'N/A')}")
         print(f"💾 Tamaño:    {metrics.get('size_mb', 0)} MB")
         print(f"📅 Timestamp: {metrics.get('timestamp', 'N/A')}")
+        for category, size in list(metrics.get('breakdown', {}).items())[:5]:
+            print(f"   {category:<22} {size / (1024 * 1024):.2f} MB")
+        print(f"🧹 Limpieza: {'sí' if self.clean_decision['clean'] else 'no'} ({self.clean_decision['reason']})")
+        if self.cache:
+            print(f"📬 Cache:     {'hit' if self.cache_hit else 'miss'}")
         print("=" * 60)
         print("✅ BUILD COMPLETADO EXITOSAMENTE")
         print("=" * 60)
@@ -155,9 +277,68 @@ def main():
     parser = argparse.ArgumentParser(description='Build Bot para Flutter APK')
     parser.add_argument('--debug', action='store_true', help='Build en modo debug')
     parser.add_argument('--root', type=str, default='.', help='Directorio raíz del proyecto')
+    parser.add_argument('--clean', action='store_true',
+                        help='Forzar flutter clean aunque el build incremental sea válido')
+    parser.add_argument('--no-cache', action='store_true', help='Desactivar el cache de artefactos')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                        help='Directorio del cache (default: .automation/artifact_cache)')
+    parser.add_argument('--cache-max-mb', type=int, default=2048, help='Tamaño máximo del cache')
+    parser.add_argument('--cache-max-entries', type=int, default=20,
+                        help='Número máximo de entradas del cache')
+    parser.add_argument('--variants', type=str, default=None,
+                        help='Matriz de variantes: debug,release,appbundle,split-per-abi')
+    parser.add_argument('--max-parallel', type=int, default=2,
+                        help='Variantes de la matriz compilando a la vez')
+    parser.add_argument('--isolate', action='store_true',
+                        help='Compilar cada variante en su propio espejo del proyecto')
+    parser.add_argument('--timeout', type=int, default=600, help='Timeout por variante en segundos')
+    parser.add_argument('--offline', action='store_true',
+                        help='Build sin red usando el cache de dependencias precargado')
+    parser.add_argument('--deps-cache-dir', type=str, default=None,
+                        help='Cache de dependencias (default: .automation/deps)')
+    parser.add_argument('--compare', action='store_true',
+                        help='Comparar el build con el baseline de builds anteriores')
+    parser.add_argument('--time-threshold', type=float, default=DEFAULT_TIME_THRESHOLD,
+                        help='Aumento relativo de tiempo tolerado (0.2 = 20%%)')
+    parser.add_argument('--size-threshold', type=float, default=DEFAULT_SIZE_THRESHOLD,
+                        help='Aumento relativo de tamaño tolerado (0.05 = 5%%)')
     args = parser.parse_args()
     
-    bot = BuildBot(args.root)
+    variants = None
+    if args.variants:
+        try:
+            variants = parse_variants(args.variants)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    cache = None
+    if not args.no_cache and not args.clean:
+        cache_dir = (Path(args.cache_dir) if args.cache_dir
+                     else Path(args.root) / '.automation' / 'artifact_cache')
+        cache = ArtifactCache(cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024,
+                              max_entries=args.cache_max_entries)
+    
+    deps = DependencyCache(args.root, args.deps_cache_dir)
+    if args.offline and not deps.is_warm():
+        print("❌ El cache de dependencias no tiene el estado actual de pubspec/Gradle.")
+        print("   Ejecuta primero: python3 scripts/automation/dependency_cache.py")
+        sys.exit(1)
+    
+    if variants:
+        matrix = BuildMatrix(args.root, variants, max_parallel=args.max_parallel,
+                             isolate=args.isolate, timeout=args.timeout, cache=cache,
+                             env=deps.env(args.offline) if args.offline or deps.is_warm() else None,
+                             offline=args.offline)
+        report = matrix.run()
+        if args.compare:
+            for comparison in report['comparisons']:
+                print_comparison(comparison)
+        success = report['success']
+        sys.exit(0 if success else 1)
+    
+    bot = BuildBot(args.root, force_clean=args.clean, cache=cache, compare=args.compare,
+                   time_threshold=args.time_threshold, size_threshold=args.size_threshold,
+                   deps=deps, offline=args.offline)
     success = bot.run_full_pipeline(release=not args.debug)
     
     sys.exit(0 if success else 1)
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Build Matrix - Tokyo Roulette
+Version: 1.0.0
+
+Construye varias variantes (debug, release, appbundle, split-per-abi) en
+una sola invocación. Cada variante declara los recursos que usa (proyecto
+Gradle y directorio de salida); las variantes con recursos disjuntos corren
+en paralelo hasta `max_parallel` y las que comparten alguno se serializan.
+
+Dentro del mismo árbol todas las variantes comparten `build/` y el proyecto
+Gradle de `android/`, así que se ejecutan una tras otra. Con `isolate=True`
+cada variante compila en su propio espejo del proyecto (copias en
+`.automation/matrix/<variante>/`) y los artefactos se copian de vuelta a
+`build/app/outputs/`. El espejo no usa hardlinks: Flutter, pub y Gradle
+reescriben archivos en el lugar (`android/local.properties`, `pubspec.lock`,
+`.flutter-plugins*`, `GeneratedPluginRegistrant.java`) y con inodos
+compartidos esas escrituras llegarían al árbol principal y a las demás
+variantes.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from apk_analyzer import category_sizes
+from artifact_cache import ArtifactCache, IGNORED_DIRS, compute_key
+from build_profile import BuildProfiler
+from build_metrics import (BuildMetricsStore, DEFAULT_SIZE_THRESHOLD, DEFAULT_TIME_THRESHOLD,
+                           build_record, toolchain_versions)
+from incremental_build import IncrementalBuildState
+from output_capture import run_captured, tail_text
+from process_group import ProcessGroupRunner
+
+# Variantes soportadas: comando de flutter, artefactos (globs relativos a
+# build/app/outputs) y variante del cache de artefactos
+VARIANTS = {
+    'debug': {
+        'command': ['flutter', 'build', 'apk', '--debug'],
+        'outputs': ['flutter-apk/app-debug.apk'],
+        'cache_variant': 'apk-debug'
+    },
+    'release': {
+        'command': ['flutter', 'build', 'apk', '--release'],
+        'outputs': ['flutter-apk/app-release.apk'],
+        'cache_variant': 'apk-release'
+    },
+    'appbundle': {
+        'command': ['flutter', 'build', 'appbundle', '--release'],
+        'outputs': ['bundle/release/app-release.aab'],
+        'cache_variant': 'aab-release'
+    },
+    'split-per-abi': {
+        'command': ['flutter', 'build', 'apk', '--release', '--split-per-abi'],
+        'outputs': ['flutter-apk/app-*-release.apk'],
+        'cache_variant': 'apk-release-split'
+    },
+}
+
+# La matriz nunca ejecuta `flutter clean`: cada variante compila incremental
+# sobre su árbol (o su espejo aislado)
+MATRIX_CLEAN_DECISION = {'clean': False, 'reason': 'la matriz compila siempre incremental'}
+
+# Entradas de primer nivel que no se replican en los espejos aislados
+MIRROR_EXCLUDED = {'build', '.dart_tool', '.automation', '.git', '.idea'}
+
+
+def parse_variants(value: str) -> List[str]:
+    """Convierte `debug,release` en una lista validada de variantes."""
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in VARIANTS]
+    if unknown:
+        raise ValueError(f"Variantes desconocidas: {', '.join(unknown)} "
+                         f"(disponibles: {', '.join(VARIANTS)})")
+    # Sin duplicados, respetando el orden pedido
+    return list(dict.fromkeys(names))
+
+
+def sync_mirror(source: Path, target: Path):
+    """Replica el proyecto en `target` con copias, borrando lo obsoleto.
+
+    Solo se copian los archivos cuyo tamaño o mtime cambió. Los directorios
+    generados (build/, .dart_tool/, .gradle/...) del espejo se conservan para
+    que sus builds sigan siendo incrementales.
+    """
+    expected: Set[Path] = set()
+    for current, dirs, names in os.walk(source):
+        current = Path(current)
+        relative_dir = current.relative_to(source)
+        excluded = MIRROR_EXCLUDED if current == source else IGNORED_DIRS
+        dirs[:] = [d for d in dirs if d not in excluded]
+        (target / relative_dir).mkdir(parents=True, exist_ok=True)
+        for name in names:
+            relative = relative_dir / name
+            expected.add(relative)
+            src, dst = current / name, target / relative
+            if dst.exists() and not os.path.samefile(src, dst):
+                src_stat, dst_stat = src.stat(), dst.stat()
+                if (src_stat.st_size == dst_stat.st_size
+                        and src_stat.st_mtime_ns == dst_stat.st_mtime_ns):
+                    continue
+            # Un hardlink de un espejo anterior se reemplaza por una copia
+            if dst.exists() or dst.is_symlink():
+                dst.unlink()
+            shutil.copy2(src, dst)
+
+    for current, dirs, names in os.walk(target):
+        current = Path(current)
+        relative_dir = current.relative_to(target)
+        excluded = MIRROR_EXCLUDED if current == target else IGNORED_DIRS
+        dirs[:] = [d for d in dirs if d not in excluded]
+        for name in names:
+            if relative_dir / name not in expected:
+                (current / name).unlink()
+
+
+class BuildMatrix:
+    """Planifica y ejecuta una matriz de variantes de build."""
+
+    def __init__(self, root_path: str, variants: List[str], max_parallel: int = 2,
+                 isolate: bool = False, timeout: float = 600,
+                 cache: Optional[ArtifactCache] = None, bot_name: str = 'build_matrix',
+                 time_threshold: float = DEFAULT_TIME_THRESHOLD,
+                 size_threshold: float = DEFAULT_SIZE_THRESHOLD,
+                 env: Optional[Dict[str, str]] = None, offline: bool = False):
+        self.root_path = Path(root_path).resolve()
+        self.variants = variants
+        self.max_parallel = max(1, max_parallel)
+        self.isolate = isolate
+        self.timeout = timeout
+        self.cache = cache
+        self.bot_name = bot_name
+        self.env = env
+        self.offline = offline
+        self.time_threshold = time_threshold
+        self.size_threshold = size_threshold
+        self.build_state = IncrementalBuildState(self.root_path)
+        self.metrics_store = BuildMetricsStore.for_project(self.root_path)
+        self.log_dir = self.root_path / '.automation' / 'logs'
+        self.processes = ProcessGroupRunner()
+        self.results: Dict[str, Dict] = {}
+        self._condition = threading.Condition()
+        self._held: Set[str] = set()
+        self._running = 0
+
+    def workspace(self, variant: str) -> Path:
+        """Directorio donde compila la variante."""
+        if self.isolate:
+            return self.root_path / '.automation' / 'matrix' / variant
+        return self.root_path
+
+    def resources(self, variant: str) -> Set[str]:
+        """Recursos exclusivos de la variante: proyecto Gradle y salida."""
+        workspace = self.workspace(variant)
+        return {f"gradle:{workspace / 'android'}", f"output:{workspace / 'build'}"}
+
+    def _outputs_dir(self, workspace: Path) -> Path:
+        return workspace / 'build' / 'app' / 'outputs'
+
+    def _collect_artifacts(self, variant: str, workspace: Path) -> List[Path]:
+        """Artefactos de la variante, copiados al árbol principal si hace falta."""
+        outputs = self._outputs_dir(workspace)
+        found = []
+        for pattern in VARIANTS[variant]['outputs']:
+            found.extend(sorted(outputs.glob(pattern)))
+        if workspace == self.root_path:
+            return found
+        artifacts = []
+        for artifact in found:
+            target = self._outputs_dir(self.root_path) / artifact.relative_to(outputs)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(artifact, target)
+            artifacts.append(target)
+        return artifacts
+
+    def _describe(self, artifacts: List[Path]) -> List[Dict]:
+        return [{
+            'path': str(artifact),
+            'size_bytes': artifact.stat().st_size,
+            'size_mb': round(artifact.stat().st_size / (1024 * 1024), 2),
+            'breakdown': category_sizes(artifact)
+        } for artifact in artifacts]
+
+    def _cache_key(self, variant: str) -> str:
+        fingerprint = self.build_state.fingerprint()
+        toolchain = {
+            'flutter': fingerprint['flutter_version'],
+            'agp': fingerprint['agp_version'],
+            'gradle_wrapper': fingerprint['gradle_wrapper']
+        }
+        return compute_key(self.root_path, VARIANTS[variant]['cache_variant'], toolchain)
+
+    def build_variant(self, variant: str) -> Dict:
+        """Compila una variante y retorna su resultado."""
+        workspace = self.workspace(variant)
+        start = time.time()
+        # La clave se calcula antes del build: compilar reescribe entradas como
+        # android/local.properties y la clave posterior no coincidiría con la
+        # que busca `_restore_cached`
+        cache_key = self._cache_key(variant) if self.cache else None
+        result = {'status': 'failed', 'workspace': str(workspace), 'cache_hit': False,
+                  'artifacts': [], 'started': datetime.now().isoformat(),
+                  'clean': MATRIX_CLEAN_DECISION}
+        try:
+            if self.isolate:
+                sync_mirror(self.root_path, workspace)
+            command = VARIANTS[variant]['command'] + ['--verbose']
+            if self.offline:
+                # Sin red: pub contra el cache local y build sin su pub get implícito
+                captured = run_captured(
+                    ['flutter', 'pub', 'get', '--offline'], workspace, f'matrix-{variant}-pub',
+                    self.log_dir, timeout=self.timeout, env=self.env, runner=self.processes)
+                if not captured['success']:
+                    result['error'] = tail_text(captured)
+                    result['log'] = captured['log']
+                    result['duration'] = round(time.time() - start, 2)
+                    return result
+                command.append('--no-pub')
+            profiler = BuildProfiler()
+            captured = run_captured(
+                command, workspace, f'matrix-{variant}', self.log_dir, timeout=self.timeout,
+                env=self.env, on_line=profiler.feed, runner=self.processes)
+            profiler.finish()
+            result['profile'] = profiler.write(self.root_path / '.automation' / 'profiles', variant)
+            result['log'] = captured['log']
+            if captured['success']:
+                artifacts = self._collect_artifacts(variant, workspace)
+                if artifacts:
+                    result['status'] = 'passed'
+                    result['artifacts'] = self._describe(artifacts)
+                    if self.cache:
+                        self.cache.store(cache_key, artifacts, self.root_path)
+                else:
+                    result['error'] = 'Build terminado sin artefactos'
+            elif captured['timed_out']:
+                result['status'] = 'timeout'
+                result['error'] = f'Timeout después de {self.timeout}s'
+            else:
+                result['error'] = tail_text(captured)
+        except OSError as e:
+            result['error'] = str(e)
+        result['duration'] = round(time.time() - start, 2)
+        return result
+
+    def _restore_cached(self, variant: str) -> Optional[Dict]:
+        """Resultado de la variante si su artefacto ya está en el cache."""
+        restored = self.cache.restore(self._cache_key(variant), self.root_path)
+        if not restored:
+            return None
+        return {'status': 'passed', 'workspace': str(self.root_path), 'cache_hit': True,
+                'artifacts': self._describe(restored), 'duration': 0.0,
+                'clean': {'clean': False, 'reason': 'artefacto restaurado del cache'}}
+
+    def _worker(self, variant: str, resources: Set[str]):
+        start = time.time()
+        try:
+            try:
+                result = self.build_variant(variant)
+            except Exception as e:
+                # Cualquier fallo inesperado deja un resultado: _report lo necesita
+                result = {'status': 'failed', 'workspace': str(self.workspace(variant)),
+                          'cache_hit': False, 'artifacts': [], 'error': f'{type(e).__name__}: {e}',
+                          'duration': round(time.time() - start, 2),
+                          'clean': MATRIX_CLEAN_DECISION}
+            self.results[variant] = result
+            icon = '✅' if result['status'] == 'passed' else '❌'
+            print(f"   {icon} {variant}: {result['status']} ({result['duration']:.1f}s)")
+        finally:
+            with self._condition:
+                self._held -= resources
+                self._running -= 1
+                self._condition.notify_all()
+
+    def run(self) -> Dict:
+        """Ejecuta la matriz y retorna las métricas combinadas."""
+        print(f"\n🧮 Matriz de build: {', '.join(self.variants)} "
+              f"(paralelo={self.max_parallel}, aislado={'sí' if self.isolate else 'no'})")
+        wall_start = time.time()
+
+        pending = []
+        for variant in self.variants:
+            cached = self._restore_cached(variant) if self.cache else None
+            if cached:
+                self.results[variant] = cached
+                print(f"   📬 {variant}: restaurado del cache")
+            else:
+                pending.append(variant)
+
+        threads = []
+        with self._condition:
+            while pending:
+                # Primera variante pendiente cuyos recursos estén libres
+                ready = next((v for v in pending if not (self.resources(v) & self._held)), None)
+                if ready is None or self._running >= self.max_parallel:
+                    self._condition.wait()
+                    continue
+                pending.remove(ready)
+                resources = self.resources(ready)
+                self._held |= resources
+                self._running += 1
+                print(f"   🔧 {ready}: {' '.join(VARIANTS[ready]['command'])}")
+                thread = threading.Thread(target=self._worker, args=(ready, resources), daemon=True)
+                threads.append(thread)
+                thread.start()
+        for thread in threads:
+            thread.join()
+
+        wall_time = time.time() - wall_start
+        return self._report(wall_time)
+
+    def _record_metrics(self, variants: Dict[str, Dict]) -> List[Dict]:
+        """Agrega cada variante a la serie temporal y la compara con su baseline."""
+        toolchain = toolchain_versions(self.build_state)
+        comparisons = []
+        for variant, result in variants.items():
+            phases = {'build': result['duration']}
+            if result.get('profile'):
+                phases.update({f'build.{phase}': seconds
+                               for phase, seconds in result['profile']['phases'].items()})
+            record = build_record(
+                self.bot_name, variant, result['status'] == 'passed',
+                phases, result['duration'],
+                [Path(a['path']) for a in result['artifacts']], toolchain,
+                cache_hit=result['cache_hit'], clean=result.get('clean'))
+            self.metrics_store.append(record)
+            comparisons.append(self.metrics_store.compare(
+                record, time_threshold=self.time_threshold, size_threshold=self.size_threshold))
+        return comparisons
+
+    def _report(self, wall_time: float) -> Dict:
+        """Métricas combinadas de todas las variantes."""
+        variants = {}
+        for variant in self.variants:
+            result = self.results[variant]
+            result['size_mb'] = round(sum(a['size_mb'] for a in result['artifacts']), 2)
+            variants[variant] = result
+        report = {
+            'timestamp': datetime.now().isoformat(),
+            'max_parallel': self.max_parallel,
+            'isolated': self.isolate,
+            'wall_time': round(wall_time, 2),
+            'summed_time': round(sum(r['duration'] for r in variants.values()), 2),
+            'success': all(r['status'] == 'passed' for r in variants.values()),
+            'variants': variants
+        }
+        report['comparisons'] = self._record_metrics(variants)
+        report_file = self.root_path / 'build_matrix_report.json'
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Métricas de la matriz: {report_file}")
+        return report
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Build Metrics - Tokyo Roulette
+Version: 1.0.0
+
+Serie temporal local de métricas de build. Cada ejecución de los bots de
+build agrega una línea JSON a `.automation/build_metrics.jsonl` con la
+duración por fase, el tamaño de cada artefacto y las versiones del
+toolchain. `--compare` contrasta la última ejecución con la mediana de las
+anteriores (baseline móvil) y marca regresiones de tiempo o tamaño.
+"""
+
+import json
+import re
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# Ejecuciones exitosas anteriores que forman el baseline
+DEFAULT_WINDOW = 10
+
+# Umbrales relativos sobre la mediana del baseline
+DEFAULT_TIME_THRESHOLD = 0.20
+DEFAULT_SIZE_THRESHOLD = 0.05
+
+# Diferencias de tiempo menores a esto son ruido, aunque superen el umbral relativo
+MIN_TIME_DELTA = 5.0
+
+# Mínimo de ejecuciones previas para comparar
+MIN_BASELINE_RUNS = 3
+
+
+def gradle_version(android_dir: Path) -> Optional[str]:
+    """Versión de Gradle declarada en el wrapper."""
+    properties = android_dir / 'gradle' / 'wrapper' / 'gradle-wrapper.properties'
+    if not properties.exists():
+        return None
+    match = re.search(r'gradle-([\d.]+(?:-[\w.]+)?)-(?:all|bin)\.zip',
+                      properties.read_text(encoding='utf-8'))
+    return match.group(1) if match else None
+
+
+def toolchain_versions(build_state) -> Dict:
+    """Versiones del toolchain a partir de la huella del build incremental."""
+    fingerprint = build_state.fingerprint()
+    return {
+        'flutter': fingerprint['flutter_version'],
+        'agp': fingerprint['agp_version'],
+        'gradle': gradle_version(build_state.android_dir)
+    }
+
+
+class PhaseTimer:
+    """Acumula la duración de cada fase de un build."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.start = time.time()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, time.time() - started)
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = round(self.phases.get(name, 0.0) + seconds, 2)
+
+    def total(self) -> float:
+        return round(time.time() - self.start, 2)
+
+
+def build_record(bot: str, variant: str, success: bool, phases: Dict[str, float],
+                 total_seconds: float, artifacts: List[Path], toolchain: Dict,
+                 cache_hit: bool = False, clean: Optional[Dict] = None) -> Dict:
+    """Registro de una ejecución en el formato de la serie temporal.
+
+    `clean` es la decisión de `IncrementalBuildState.decide`
+    ({'clean': bool, 'reason': str}), o None si el build no llegó a tomarla.
+    """
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'bot': bot,
+        'variant': variant,
+        'success': success,
+        'cache_hit': cache_hit,
+        'clean': clean,
+        'phases': phases,
+        'total_seconds': round(total_seconds, 2),
+        'artifacts': {Path(a).name: Path(a).stat().st_size for a in artifacts if Path(a).exists()},
+        'toolchain': toolchain
+    }
+
+
+class BuildMetricsStore:
+    """Archivo JSONL append-only con una línea por build."""
+
+    def __init__(self, metrics_file: Path):
+        self.metrics_file = Path(metrics_file)
+
+    @classmethod
+    def for_project(cls, root_path: Path) -> 'BuildMetricsStore':
+        return cls(Path(root_path) / '.automation' / 'build_metrics.jsonl')
+
+    def append(self, record: Dict):
+        self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.metrics_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, sort_keys=True) + '\n')
+
+    def load(self, bot: Optional[str] = None, variant: Optional[str] = None) -> List[Dict]:
+        """Registros en orden cronológico, opcionalmente filtrados."""
+        if not self.metrics_file.exists():
+            return []
+        records = []
+        with open(self.metrics_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Línea truncada por un build interrumpido
+                if bot and record.get('bot') != bot:
+                    continue
+                if variant and record.get('variant') != variant:
+                    continue
+                records.append(record)
+        return records
+
+    def baseline(self, bot: str, variant: str, window: int = DEFAULT_WINDOW,
+                 before: Optional[str] = None) -> Optional[Dict]:
+        """Mediana de las últimas `window` ejecuciones exitosas (sin cache hits)."""
+        runs = [r for r in self.load(bot, variant)
+                if r['success'] and not r.get('cache_hit')
+                and (before is None or r['timestamp'] < before)][-window:]
+        if len(runs) < MIN_BASELINE_RUNS:
+            return None
+
+        def median_of(values):
+            values = [v for v in values if v is not None]
+            return statistics.median(values) if values else None
+
+        phases = sorted({name for r in runs for name in r['phases']})
+        artifacts = sorted({name for r in runs for name in r['artifacts']})
+        return {
+            'runs': len(runs),
+            'total_seconds': median_of(r['total_seconds'] for r in runs),
+            'phases': {p: median_of(r['phases'].get(p) for r in runs) for p in phases},
+            'artifacts': {a: median_of(r['artifacts'].get(a) for r in runs) for a in artifacts}
+        }
+
+    def compare(self, record: Dict, window: int = DEFAULT_WINDOW,
+                time_threshold: float = DEFAULT_TIME_THRESHOLD,
+                size_threshold: float = DEFAULT_SIZE_THRESHOLD) -> Dict:
+        """Compara un registro con su baseline y retorna las regresiones."""
+        base = self.baseline(record['bot'], record['variant'], window, before=record['timestamp'])
+        result = {'bot': record['bot'], 'variant': record['variant'],
+                  'baseline_runs': base['runs'] if base else 0, 'regressions': []}
+        if not base or not record['success'] or record.get('cache_hit'):
+            return result
+
+        checks = [('total', record['total_seconds'], base['total_seconds'], time_threshold, True)]
+        checks += [(f'phase:{name}', value, base['phases'].get(name), time_threshold, True)
+                   for name, value in record['phases'].items()]
+        checks += [(f'size:{name}', value, base['artifacts'].get(name), size_threshold, False)
+                   for name, value in record['artifacts'].items()]
+
+        for metric, value, reference, threshold, is_time in checks:
+            if not reference:
+                continue
+            change = (value - reference) / reference
+            if change <= threshold:
+                continue
+            if is_time and value - reference < MIN_TIME_DELTA:
+                continue
+            result['regressions'].append({
+                'metric': metric,
+                'value': value,
+                'baseline': round(reference, 2),
+                'change_pct': round(change * 100, 1)
+            })
+        return result
+
+
+def print_comparison(comparison: Dict):
+    """Muestra el resultado de `BuildMetricsStore.compare`."""
+    label = f"{comparison['bot']}/{comparison['variant']}"
+    if comparison['baseline_runs'] < MIN_BASELINE_RUNS:
+        print(f"📈 {label}: baseline insuficiente ({comparison['baseline_runs']} ejecuciones)")
+        return
+    if not comparison['regressions']:
+        print(f"📈 {label}: sin regresiones (baseline de {comparison['baseline_runs']} builds)")
+        return
+    print(f"⚠️  {label}: {len(comparison['regressions'])} regresión(es) "
+          f"vs baseline de {comparison['baseline_runs']} builds")
+    for regression in comparison['regressions']:
+        print(f"   - {regression['metric']}: {regression['value']} "
+              f"(baseline {regression['baseline']}, +{regression['change_pct']}%)")
+
+
+def main():
+    """Punto de entrada principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serie temporal de métricas de build')
+    parser.add_argument('--root', type=str, default='.', help='Directorio raíz del proyecto')
+    parser.add_argument('--compare', action='store_true',
+                        help='Comparar el último build de cada bot/variante con su baseline')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW,
+                        help='Builds exitosos anteriores que forman el baseline')
+    parser.add_argument('--time-threshold', type=float, default=DEFAULT_TIME_THRESHOLD,
+                        help='Aumento relativo de tiempo tolerado (0.2 = 20%%)')
+    parser.add_argument('--size-threshold', type=float, default=DEFAULT_SIZE_THRESHOLD,
+                        help='Aumento relativo de tamaño tolerado (0.05 = 5%%)')
+    parser.add_argument('--history', type=int, default=10,
+                        help='Builds recientes a listar sin --compare')
+    args = parser.parse_args()
+
+    store = BuildMetricsStore.for_project(Path(args.root))
+    records = store.load()
+    if not records:
+        print(f"📭 Sin métricas en {store.metrics_file}")
+        sys.exit(0)
+
+    if not args.compare:
+        for record in records[-args.history:]:
+            sizes = ', '.join(f"{n} {s / (1024 * 1024):.2f} MB" for n, s in record['artifacts'].items())
+            icon = '✅' if record['success'] else '❌'
+            print(f"{icon} {record['timestamp'][:19]} {record['bot']}/{record['variant']} "
+                  f"{record['total_seconds']:.1f}s {sizes}")
+        sys.exit(0)
+
+    latest = {}
+    for record in records:
+        latest[(record['bot'], record['variant'])] = record
+    regressions = 0
+    for record in latest.values():
+        comparison = store.compare(record, args.window, args.time_threshold, args.size_threshold)
+        print_comparison(comparison)
+        regressions += len(comparison['regressions'])
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Build Profile - Tokyo Roulette
+Version: 1.0.0
+
+Perfil de tiempos de `flutter build --verbose` construido a partir de la
+salida en streaming. Cada línea se marca con su hora de llegada; las líneas
+de Gradle (`> Task :app:x`, `:app:x (Thread[...]) started.` y
+`... completed. Took N secs.`) delimitan cada tarea. El resultado es un
+JSON con las tareas más lentas y el tiempo por fase (compilación Dart,
+compilación nativa, dex, recursos, empaquetado) y un trace de Chrome
+(`chrome://tracing` o Perfetto) con las tareas en paralelo en carriles
+separados.
+"""
+
+import json
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Prefijo de `flutter --verbose`: "[  +12 ms] "
+VERBOSE_PREFIX = re.compile(r'^\[\s*\+?\d+\s*ms\]\s?')
+
+TASK_HEADER = re.compile(r'^> Task (:\S+)(?:\s+(UP-TO-DATE|FROM-CACHE|NO-SOURCE|SKIPPED|FAILED))?\s*$')
+TASK_STARTED = re.compile(r'^(:\S+) \(Thread\[.*\]\) started\.$')
+TASK_COMPLETED = re.compile(r'^(:\S+) \(Thread\[.*\]\) completed\. Took ([\d.]+) (secs|ms)\.$')
+GRADLE_START = re.compile(r"Running Gradle task '([^']+)'")
+
+# Fase de cada tarea según su nombre (la primera que coincide)
+TASK_PHASES = [
+    ('dart_compile', re.compile(r'compileFlutterBuild|flutterBuild', re.I)),
+    ('native_compile', re.compile(r'compile\w*(Kotlin|JavaWithJavac)|kapt', re.I)),
+    ('dex', re.compile(r'dex|minify\w*WithR8', re.I)),
+    ('resources', re.compile(r'Resources|Manifest|merge\w*Assets|copyFlutterAssets', re.I)),
+    ('packaging', re.compile(r'^(package|sign|zipalign|bundle|assemble|createBundle|build\w*PreBundle)', re.I)),
+]
+
+
+def task_phase(path: str) -> str:
+    name = path.rsplit(':', 1)[-1]
+    for phase, pattern in TASK_PHASES:
+        if pattern.search(name):
+            return phase
+    return 'other'
+
+
+class BuildProfiler:
+    """Acumula eventos de tareas a partir de líneas de salida del build."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.start = clock()
+        self.end: Optional[float] = None
+        self.gradle_start: Optional[float] = None
+        self.tasks: Dict[str, Dict] = {}
+        self._last_header: Optional[str] = None
+
+    def feed(self, line: str, timestamp: Optional[float] = None):
+        """Procesa una línea de salida recibida en `timestamp` (por defecto, ahora)."""
+        now = (self.clock() if timestamp is None else timestamp) - self.start
+        line = VERBOSE_PREFIX.sub('', line.rstrip('\n'))
+
+        match = TASK_COMPLETED.match(line)
+        if match:
+            took = float(match.group(2)) / (1000 if match.group(3) == 'ms' else 1)
+            task = self._task(match.group(1), now - took)
+            task['start'] = min(task['start'], now - took)
+            task['end'] = now
+            return
+
+        match = TASK_STARTED.match(line)
+        if match:
+            self._task(match.group(1), now)
+            return
+
+        match = TASK_HEADER.match(line)
+        if match:
+            # Sin --info la tarea anterior termina cuando empieza la siguiente
+            self._close_last(now)
+            task = self._task(match.group(1), now)
+            if match.group(2):
+                task['outcome'] = match.group(2)
+            self._last_header = match.group(1)
+            return
+
+        if self.gradle_start is None and GRADLE_START.search(line):
+            self.gradle_start = now
+
+    def _task(self, path: str, now: float) -> Dict:
+        if path not in self.tasks:
+            self.tasks[path] = {'start': now, 'end': None, 'outcome': 'EXECUTED'}
+        return self.tasks[path]
+
+    def _close_last(self, now: float):
+        if self._last_header:
+            task = self.tasks[self._last_header]
+            if task['end'] is None:
+                task['end'] = now
+
+    def finish(self, timestamp: Optional[float] = None):
+        """Cierra el perfil cuando el proceso terminó."""
+        self.end = (self.clock() if timestamp is None else timestamp) - self.start
+        self._close_last(self.end)
+        for task in self.tasks.values():
+            if task['end'] is None:
+                task['end'] = self.end
+
+    def profile(self, top: int = 15) -> Dict:
+        """Resumen: tareas más lentas y tiempo por fase."""
+        end = self.end if self.end is not None else self.clock() - self.start
+        rows = []
+        phases: Dict[str, float] = {}
+        for path, task in self.tasks.items():
+            duration = max(0.0, (task['end'] if task['end'] is not None else end) - task['start'])
+            phase = task_phase(path)
+            phases[phase] = phases.get(phase, 0.0) + duration
+            rows.append({'task': path, 'phase': phase, 'outcome': task['outcome'],
+                         'start': round(task['start'], 3), 'duration': round(duration, 3)})
+        rows.sort(key=lambda r: r['duration'], reverse=True)
+        gradle = end - self.gradle_start if self.gradle_start is not None else None
+        return {
+            'total_seconds': round(end, 2),
+            'gradle_seconds': round(gradle, 2) if gradle is not None else None,
+            'tasks': len(rows),
+            'executed_tasks': sum(1 for r in rows if r['outcome'] == 'EXECUTED'),
+            'phases': {k: round(v, 2) for k, v in sorted(phases.items(), key=lambda i: -i[1])},
+            'slowest': rows[:top]
+        }
+
+    def chrome_trace(self) -> Dict:
+        """Trace en formato Chrome; las tareas que se solapan van en carriles distintos."""
+        events = []
+        lanes: List[float] = []  # Fin de la última tarea de cada carril
+        ordered = sorted(self.tasks.items(), key=lambda item: item[1]['start'])
+        for path, task in ordered:
+            end = task['end'] if task['end'] is not None else task['start']
+            lane = next((i for i, free_at in enumerate(lanes) if free_at <= task['start']), None)
+            if lane is None:
+                lanes.append(end)
+                lane = len(lanes) - 1
+            else:
+                lanes[lane] = end
+            events.append({
+                'name': path,
+                'cat': task_phase(path),
+                'ph': 'X',
+                'ts': int(task['start'] * 1e6),
+                'dur': int(max(0.0, end - task['start']) * 1e6),
+                'pid': 1,
+                'tid': lane + 1,
+                'args': {'outcome': task['outcome']}
+            })
+        if self.end is not None:
+            events.append({'name': 'flutter build', 'cat': 'build', 'ph': 'X', 'ts': 0,
+                           'dur': int(self.end * 1e6), 'pid': 1, 'tid': 0})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, output_dir: Path, label: str) -> Dict:
+        """Guarda `<label>.json` y `<label>.trace.json`; retorna el perfil."""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        profile = self.profile()
+        profile_file = output_dir / f'{label}.json'
+        trace_file = output_dir / f'{label}.trace.json'
+        with open(profile_file, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=2)
+        with open(trace_file, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+        profile['files'] = {'profile': str(profile_file), 'trace': str(trace_file)}
+        return profile
+
+
+def print_profile(profile: Dict, top: int = 5):
+    """Muestra fases y tareas más lentas de un perfil."""
+    print(f"   ⏱️  Perfil: {profile['tasks']} tareas Gradle ({profile['executed_tasks']} ejecutadas)")
+    for phase, seconds in profile['phases'].items():
+        print(f"      {phase:<16} {seconds:>8.1f}s")
+    for row in profile['slowest'][:top]:
+        print(f"      🐢 {row['task']:<50} {row['duration']:>8.1f}s")
+    if 'files' in profile:
+        print(f"   📄 Trace: {profile['files']['trace']}")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Dependency Cache - Tokyo Roulette
+Version: 1.0.0
+
+Prefetch de dependencias pub y Gradle a un directorio local
+(`.automation/deps/`): un PUB_CACHE propio y un GRADLE_USER_HOME propio que
+hace de repositorio offline. La huella de `pubspec.*` y los archivos Gradle
+identifica cada estado ya descargado; si el estado actual es conocido, el
+prefetch no hace nada. Con `offline=True` los builds usan solo ese cache
+(`flutter pub get --offline`, `flutter build --no-pub` y Gradle en modo
+offline mediante un init script).
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from incremental_build import file_hash
+
+# Archivos cuyo contenido determina el conjunto de dependencias
+DEPENDENCY_INPUTS = [
+    'pubspec.yaml',
+    'pubspec.lock',
+    'android/build.gradle',
+    'android/build.gradle.kts',
+    'android/settings.gradle',
+    'android/settings.gradle.kts',
+    'android/gradle.properties',
+    'android/app/build.gradle',
+    'android/app/build.gradle.kts',
+    'android/gradle/wrapper/gradle-wrapper.properties',
+]
+
+# Estados recordados en el manifiesto
+MAX_KNOWN_STATES = 20
+
+# Variable que activa el modo offline del init script de Gradle
+OFFLINE_ENV = 'TOKYO_GRADLE_OFFLINE'
+
+# Init script aplicado a todos los builds que usan el GRADLE_USER_HOME del cache
+OFFLINE_INIT_SCRIPT = f"""// Generado por dependency_cache.py
+if (System.getenv('{OFFLINE_ENV}') == '1') {{
+    gradle.startParameter.offline = true
+}}
+"""
+
+# Tarea que resuelve todas las configuraciones resolubles de todos los proyectos
+PREFETCH_INIT_SCRIPT = """// Generado por dependency_cache.py
+allprojects {
+    tasks.register('prefetchDependencies') {
+        doLast {
+            project.configurations.findAll { it.canBeResolved }.each { configuration ->
+                try {
+                    configuration.resolve()
+                } catch (Exception e) {
+                    logger.info("No se pudo resolver ${configuration.name}: ${e.message}")
+                }
+            }
+            project.buildscript.configurations.findAll { it.canBeResolved }.each { it.resolve() }
+        }
+    }
+}
+"""
+
+
+def dependency_state(root_path: Path) -> str:
+    """Huella de los archivos que definen las dependencias del proyecto."""
+    digest = hashlib.sha256()
+    for relative in DEPENDENCY_INPUTS:
+        digest.update(relative.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update((file_hash(root_path / relative) or '-').encode('ascii'))
+    return digest.hexdigest()
+
+
+class DependencyCache:
+    """Cache local de dependencias pub y Gradle."""
+
+    def __init__(self, root_path: str, cache_dir: Optional[str] = None):
+        self.root_path = Path(root_path).resolve()
+        self.android_dir = self.root_path / 'android'
+        self.cache_dir = (Path(cache_dir).resolve() if cache_dir
+                          else self.root_path / '.automation' / 'deps')
+        self.pub_cache = self.cache_dir / 'pub-cache'
+        self.gradle_home = self.cache_dir / 'gradle-home'
+        self.manifest_file = self.cache_dir / 'manifest.json'
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'states': {}}
+
+    def _save_manifest(self, manifest: Dict):
+        states = sorted(manifest['states'].items(), key=lambda item: item[1]['prefetched'])
+        manifest['states'] = dict(states[-MAX_KNOWN_STATES:])
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    def is_warm(self) -> bool:
+        """True si las dependencias del estado actual ya están en el cache."""
+        return dependency_state(self.root_path) in self._load_manifest()['states']
+
+    def env(self, offline: bool = False) -> Dict[str, str]:
+        """Entorno para que flutter/pub/Gradle usen el cache."""
+        init_dir = self.gradle_home / 'init.d'
+        init_dir.mkdir(parents=True, exist_ok=True)
+        init_script = init_dir / 'offline.gradle'
+        if not init_script.exists():
+            init_script.write_text(OFFLINE_INIT_SCRIPT, encoding='utf-8')
+        env = dict(os.environ)
+        env['PUB_CACHE'] = str(self.pub_cache)
+        env['GRADLE_USER_HOME'] = str(self.gradle_home)
+        env[OFFLINE_ENV] = '1' if offline else '0'
+        return env
+
+    def _run(self, command: List[str], cwd: Path, timeout: int,
+             offline: bool = False) -> Tuple[bool, str]:
+        try:
+            result = subprocess.run(command, cwd=cwd, env=self.env(offline),
+                                    capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return False, f'Timeout después de {timeout}s'
+        except OSError as e:
+            return False, str(e)
+        return result.returncode == 0, (result.stderr or result.stdout)[-2000:]
+
+    def _gradlew(self) -> Optional[Path]:
+        """Gradle wrapper del proyecto; Flutter lo genera con --config-only."""
+        name = 'gradlew.bat' if os.name == 'nt' else 'gradlew'
+        gradlew = self.android_dir / name
+        if not gradlew.exists():
+            self._run(['flutter', 'build', 'apk', '--config-only'], self.root_path, 300)
+        return gradlew if gradlew.exists() else None
+
+    def prefetch(self, force: bool = False) -> Dict:
+        """Descarga dependencias pub y Gradle si el estado actual no es conocido.
+
+        Retorna {'success', 'skipped', 'state', 'steps': {...}}.
+        """
+        state = dependency_state(self.root_path)
+        manifest = self._load_manifest()
+        if state in manifest['states'] and not force:
+            return {'success': True, 'skipped': True, 'state': state, 'steps': {}}
+
+        steps = {}
+        ok, output = self._run(['flutter', 'pub', 'get'], self.root_path, 300)
+        steps['pub'] = {'success': ok, 'output': '' if ok else output}
+
+        if ok:
+            gradlew = self._gradlew()
+            if gradlew is None:
+                steps['gradle'] = {'success': False, 'output': 'No se pudo generar android/gradlew'}
+            else:
+                init_script = self.cache_dir / 'prefetch.gradle'
+                init_script.write_text(PREFETCH_INIT_SCRIPT, encoding='utf-8')
+                gradle_ok, output = self._run(
+                    [str(gradlew), '--no-daemon', '-I', str(init_script), 'prefetchDependencies'],
+                    self.android_dir, 1200)
+                steps['gradle'] = {'success': gradle_ok, 'output': '' if gradle_ok else output}
+
+        success = all(step['success'] for step in steps.values()) and 'gradle' in steps
+        if success:
+            manifest['states'][state] = {'prefetched': datetime.now().isoformat()}
+            self._save_manifest(manifest)
+        return {'success': success, 'skipped': False, 'state': state, 'steps': steps}
+
+    def pub_get_offline(self) -> Tuple[bool, str]:
+        """`flutter pub get --offline` contra el PUB_CACHE del cache."""
+        return self._run(['flutter', 'pub', 'get', '--offline'], self.root_path, 120, offline=True)
+
+
+def main():
+    """Punto de entrada principal."""
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Prefetch de dependencias pub y Gradle')
+    parser.add_argument('--root', type=str, default='.', help='Directorio raíz del proyecto')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                        help='Directorio del cache (default: .automation/deps)')
+    parser.add_argument('--force', action='store_true', help='Descargar aunque el estado sea conocido')
+    args = parser.parse_args()
+
+    cache = DependencyCache(args.root, args.cache_dir)
+    result = cache.prefetch(force=args.force)
+    if result['skipped']:
+        print(f"♻️  Dependencias ya en cache ({result['state'][:12]})")
+    for name, step in result['steps'].items():
+        print(f"{'✅' if step['success'] else '❌'} {name}")
+        if step['output']:
+            print(step['output'])
+    sys.exit(0 if result['success'] else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Flaky Tracker - Tokyo Roulette
+Version: 1.0.0
+
+Historial local de resultados por test y lista de cuarentena.
+Calcula tasas de flakiness para decidir qué tests aislar del resultado
+y timeouts por archivo a partir de las duraciones históricas.
+"""
+
+import json
+import math
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Resultados posibles de un test dentro de una ejecución
+OUTCOME_PASS = 'pass'
+OUTCOME_FLAKY = 'flaky'  # Falló y luego pasó en un reintento
+OUTCOME_FAIL = 'fail'
+
+# Cuántos resultados recientes se guardan por test
+HISTORY_WINDOW = 50
+
+# Cuántas duraciones recientes se guardan por archivo de test
+DURATION_WINDOW = 30
+
+
+def test_key(file_name: str, test_name: Optional[str] = None) -> str:
+    """Clave estable de un test: `archivo_test.dart::nombre`."""
+    return f"{file_name}::{test_name}" if test_name else file_name
+
+
+class FlakyTracker:
+    """Historial de resultados por test y cuarentena de tests inestables."""
+
+    def __init__(self, history_file: Path, quarantine_file: Path):
+        self.history_file = Path(history_file)
+        self.quarantine_file = Path(quarantine_file)
+        data = self._load_history()
+        self.history = data.get('tests', {})
+        self.durations = data.get('durations', {})
+        self.quarantine = self._load_quarantine()
+        self._lock = threading.Lock()
+
+    def _load_history(self) -> Dict:
+        """Carga el historial JSON o empieza vacío si no existe o está corrupto."""
+        if not self.history_file.exists():
+            return {}
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Historial de tests ilegible ({e}), se reinicia")
+            return {}
+
+    def _load_quarantine(self) -> List[str]:
+        """Lee la lista de cuarentena (una clave por línea, `#` para comentarios)."""
+        if not self.quarantine_file.exists():
+            return []
+        entries = []
+        for line in self.quarantine_file.read_text(encoding='utf-8').splitlines():
+            line = line.split('#', 1)[0].strip()
+            if line:
+                entries.append(line)
+        return entries
+
+    def is_file_quarantined(self, file_name: str) -> bool:
+        """True si el archivo completo está en cuarentena."""
+        return file_name in self.quarantine
+
+    def is_test_quarantined(self, file_name: str, test_name: str) -> bool:
+        """True si el test (o su archivo) está en cuarentena."""
+        return (self.is_file_quarantined(file_name)
+                or test_key(file_name, test_name) in self.quarantine)
+
+    def record(self, file_name: str, test_name: str, outcome: str):
+        """Registra el resultado final de un test en esta ejecución."""
+        key = test_key(file_name, test_name)
+        with self._lock:
+            entry = self.history.setdefault(key, {
+                'runs': 0,
+                'passes': 0,
+                'flaky': 0,
+                'failures': 0,
+                'recent': []
+            })
+            entry['runs'] += 1
+            if outcome == OUTCOME_PASS:
+                entry['passes'] += 1
+            elif outcome == OUTCOME_FLAKY:
+                entry['flaky'] += 1
+            else:
+                entry['failures'] += 1
+            entry['recent'] = (entry['recent'] + [outcome])[-HISTORY_WINDOW:]
+            entry['last_run'] = datetime.now().isoformat()
+
+    def record_duration(self, file_name: str, seconds: float):
+        """Registra la duración de una ejecución completa de un archivo."""
+        with self._lock:
+            recent = self.durations.get(file_name, []) + [round(seconds, 2)]
+            self.durations[file_name] = recent[-DURATION_WINDOW:]
+
+    def timeout_for(self, file_name: str, default: float, factor: float = 3.0,
+                    minimum: float = 15.0, min_samples: int = 3) -> float:
+        """Timeout del archivo: p99 de sus duraciones históricas × `factor`.
+
+        Sin historial suficiente se usa `default`.
+        """
+        samples = sorted(self.durations.get(file_name, []))
+        if len(samples) < min_samples:
+            return default
+        p99 = samples[max(0, math.ceil(0.99 * len(samples)) - 1)]
+        return max(minimum, p99 * factor)
+
+    def flakiness_rate(self, key: str) -> float:
+        """Fracción de ejecuciones recientes que solo pasaron tras reintentar."""
+        entry = self.history.get(key)
+        if not entry or not entry['recent']:
+            return 0.0
+        return entry['recent'].count(OUTCOME_FLAKY) / len(entry['recent'])
+
+    def failure_rate(self, key: str) -> float:
+        """Fracción de ejecuciones recientes que fallaron definitivamente."""
+        entry = self.history.get(key)
+        if not entry or not entry['recent']:
+            return 0.0
+        return entry['recent'].count(OUTCOME_FAIL) / len(entry['recent'])
+
+    def stats(self, min_runs: int = 1) -> List[Dict]:
+        """Estadísticas por test ordenadas de más a menos inestable."""
+        rows = []
+        for key, entry in self.history.items():
+            if entry['runs'] < min_runs:
+                continue
+            rows.append({
+                'test': key,
+                'runs': entry['runs'],
+                'flakiness_rate': round(self.flakiness_rate(key), 3),
+                'failure_rate': round(self.failure_rate(key), 3),
+                'quarantined': key in self.quarantine or key.split('::', 1)[0] in self.quarantine
+            })
+        rows.sort(key=lambda r: (r['flakiness_rate'], r['failure_rate']), reverse=True)
+        return rows
+
+    def quarantine_candidates(self, threshold: float, min_runs: int = 5) -> List[str]:
+        """Tests no aislados cuya tasa de flakiness supera el umbral."""
+        return [
+            row['test'] for row in self.stats(min_runs=min_runs)
+            if row['flakiness_rate'] >= threshold and not row['quarantined']
+        ]
+
+    def save(self):
+        """Persiste el historial en disco."""
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {
+                'updated': datetime.now().isoformat(),
+                'tests': self.history,
+                'durations': self.durations
+            }
+        tmp_file = self.history_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        tmp_file.replace(self.history_file)
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Gradle Config - Tokyo Roulette
+Version: 1.0.0
+
+Modelo de la configuración Android/Gradle del proyecto. Lee
+`gradle-wrapper.properties`, `gradle.properties`, `local.properties`,
+`settings.gradle`, `build.gradle` y `app/build.gradle` (o sus `.kts`) y
+extrae versiones de Gradle, AGP y Kotlin, SDKs y argumentos de la JVM.
+El resultado de cada archivo se cachea por hash en
+`.automation/gradle_config_cache.json`, así que validar solo vuelve a
+parsear lo que cambió. `validate` detecta incompatibilidades de versiones
+y ajustes de memoria antes de lanzar un build.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from incremental_build import file_hash
+
+# Versión mínima de Gradle por versión de AGP (major.minor)
+# https://developer.android.com/build/releases/gradle-plugin#updating-gradle
+AGP_MIN_GRADLE = {
+    (7, 0): (7, 0), (7, 1): (7, 2), (7, 2): (7, 3, 3), (7, 3): (7, 4), (7, 4): (7, 5),
+    (8, 0): (8, 0), (8, 1): (8, 0), (8, 2): (8, 2), (8, 3): (8, 4), (8, 4): (8, 6),
+    (8, 5): (8, 7), (8, 6): (8, 7), (8, 7): (8, 9),
+}
+
+# Kotlin mínimo que soporta el plugin de Flutter sin advertencias
+MIN_KOTLIN = (1, 7, 0)
+
+# targetSdk mínimo aceptado por Google Play para apps nuevas
+MIN_PLAY_TARGET_SDK = 34
+
+# Memoria del daemon de Gradle (MB)
+MIN_GRADLE_XMX_MB = 2048
+MIN_METASPACE_MB = 512
+
+# Archivos del modelo: clave → rutas candidatas relativas a android/
+CONFIG_FILES = {
+    'wrapper': ['gradle/wrapper/gradle-wrapper.properties'],
+    'gradle_properties': ['gradle.properties'],
+    'local_properties': ['local.properties'],
+    'settings': ['settings.gradle', 'settings.gradle.kts'],
+    'root_build': ['build.gradle', 'build.gradle.kts'],
+    'app_build': ['app/build.gradle', 'app/build.gradle.kts'],
+}
+
+
+def parse_version(value: Optional[str]) -> Optional[Tuple[int, ...]]:
+    """`8.1.4` → (8, 1, 4); None si no empieza por un número de versión."""
+    match = re.match(r'(\d+(?:\.\d+)*)', value or '')
+    return tuple(int(part) for part in match.group(1).split('.')) if match else None
+
+
+def parse_properties(text: str) -> Dict[str, str]:
+    """Archivo .properties de Java: `clave=valor` o `clave: valor`, con `\\` de continuación."""
+    properties = {}
+    logical = ''
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not logical and (not line or line[0] in '#!'):
+            continue
+        if line.endswith('\\') and not line.endswith('\\\\'):
+            logical += line[:-1]
+            continue
+        logical += line
+        match = re.match(r'((?:\\.|[^=:\s])+)\s*[=:\s]\s*(.*)', logical)
+        if match:
+            key = re.sub(r'\\(.)', r'\1', match.group(1))
+            properties[key] = re.sub(r'\\(.)', r'\1', match.group(2))
+        logical = ''
+    return properties
+
+
+def _memory_mb(value: str) -> int:
+    number, unit = int(value[:-1]) if value[-1].isalpha() else int(value), value[-1].lower()
+    return {'k': number // 1024, 'm': number, 'g': number * 1024}.get(unit, number // (1024 * 1024))
+
+
+def parse_jvmargs(value: Optional[str]) -> Dict:
+    """Memoria configurada en `org.gradle.jvmargs`."""
+    result = {'raw': value, 'xmx_mb': None, 'metaspace_mb': None}
+    if not value:
+        return result
+    xmx = re.search(r'-Xmx(\d+[kKmMgG]?)', value)
+    metaspace = re.search(r'-XX:MaxMetaspaceSize=(\d+[kKmMgG]?)', value)
+    if xmx:
+        result['xmx_mb'] = _memory_mb(xmx.group(1))
+    if metaspace:
+        result['metaspace_mb'] = _memory_mb(metaspace.group(1))
+    return result
+
+
+def _search(pattern: str, text: str) -> Optional[str]:
+    match = re.search(pattern, text, re.MULTILINE)
+    return match.group(1) if match else None
+
+
+def _strip_comments(text: str) -> str:
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.DOTALL)
+    return re.sub(r'(?m)^\s*//.*$', '', text)
+
+
+def parse_gradle_script(kind: str, text: str) -> Dict:
+    """Valores relevantes de un script Gradle (Groovy o Kotlin DSL)."""
+    text = _strip_comments(text)
+    quote = r'["\']'
+    if kind == 'settings':
+        return {
+            'agp_version': _search(rf'id\s*\(?\s*{quote}com\.android\.application{quote}\s*\)?\s+version\s*\(?\s*{quote}([^"\']+){quote}', text),
+            'kotlin_version': _search(rf'id\s*\(?\s*{quote}org\.jetbrains\.kotlin\.android{quote}\s*\)?\s+version\s*\(?\s*{quote}([^"\']+){quote}', text),
+        }
+    if kind == 'root_build':
+        return {
+            'agp_version': _search(r'com\.android\.tools\.build:gradle:([\w.\-]+)', text),
+            'kotlin_version': _search(rf'kotlin_version\s*=\s*{quote}([^"\']+){quote}', text),
+        }
+    # app_build
+    def sdk(name: str) -> Optional[str]:
+        return _search(rf'\b{name}(?:Version)?\s*(?:=\s*)?\(?\s*([\w.]+)', text)
+    return {
+        'compile_sdk': sdk('compileSdk'),
+        'min_sdk': sdk('minSdk'),
+        'target_sdk': sdk('targetSdk'),
+        'ndk_version': _search(rf'ndkVersion\s*=?\s*{quote}([^"\']+){quote}', text),
+        'jvm_target': _search(rf'jvmTarget\s*=\s*{quote}?([\w.]+){quote}?', text),
+        'java_compatibility': _search(r'sourceCompatibility\s*=?\s*JavaVersion\.(\w+)', text),
+    }
+
+
+def _parse_file(kind: str, text: str) -> Dict:
+    if kind in ('wrapper', 'gradle_properties', 'local_properties'):
+        return parse_properties(text)
+    return parse_gradle_script(kind, text)
+
+
+class GradleConfigLoader:
+    """Carga el modelo de configuración reutilizando parseos por hash."""
+
+    def __init__(self, root_path: str, cache_file: Optional[str] = None):
+        self.root_path = Path(root_path)
+        self.android_dir = self.root_path / 'android'
+        self.cache_file = (Path(cache_file) if cache_file
+                           else self.root_path / '.automation' / 'gradle_config_cache.json')
+        self.cache = self._load_cache()
+        self.parsed_files: List[str] = []
+
+    def _load_cache(self) -> Dict:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f, indent=2)
+
+    def _load_file(self, kind: str) -> Tuple[Optional[str], Dict]:
+        """(ruta relativa, valores) del primer candidato existente."""
+        for relative in CONFIG_FILES[kind]:
+            path = self.android_dir / relative
+            digest = file_hash(path)
+            if digest is None:
+                continue
+            cached = self.cache.get(relative)
+            if cached and cached['sha256'] == digest:
+                return relative, cached['values']
+            values = _parse_file(kind, path.read_text(encoding='utf-8'))
+            self.cache[relative] = {'sha256': digest, 'values': values}
+            self.parsed_files.append(relative)
+            return relative, values
+        return None, {}
+
+    def load(self) -> Dict:
+        """Modelo de configuración del proyecto Android."""
+        files, values = {}, {}
+        for kind in CONFIG_FILES:
+            files[kind], values[kind] = self._load_file(kind)
+        if self.parsed_files:
+            self._save_cache()
+
+        wrapper = values['wrapper']
+        url = wrapper.get('distributionUrl', '')
+        distribution = re.search(r'gradle-([\d.]+(?:-[\w.]+)?)-(all|bin)\.zip', url)
+        scripts = [values['settings'], values['root_build']]
+        app = values['app_build']
+        return {
+            'files': files,
+            'gradle_version': distribution.group(1) if distribution else None,
+            'distribution_type': distribution.group(2) if distribution else None,
+            'distribution_url': url or None,
+            'agp_version': next((s['agp_version'] for s in scripts if s.get('agp_version')), None),
+            'kotlin_version': next((s['kotlin_version'] for s in scripts if s.get('kotlin_version')), None),
+            'compile_sdk': app.get('compile_sdk'),
+            'min_sdk': app.get('min_sdk'),
+            'target_sdk': app.get('target_sdk'),
+            'ndk_version': app.get('ndk_version'),
+            'jvm_target': app.get('jvm_target'),
+            'java_compatibility': app.get('java_compatibility'),
+            'jvmargs': parse_jvmargs(values['gradle_properties'].get('org.gradle.jvmargs')),
+            'gradle_properties': values['gradle_properties'],
+            'flutter_sdk': values['local_properties'].get('flutter.sdk'),
+            'android_sdk': values['local_properties'].get('sdk.dir'),
+        }
+
+
+def _host_memory_mb() -> Optional[int]:
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _sdk_level(value: Optional[str]) -> Optional[int]:
+    """Nivel numérico del SDK; None si lo define Flutter (`flutter.minSdkVersion`)."""
+    return int(value) if value and value.isdigit() else None
+
+
+def validate(config: Dict) -> List[Dict]:
+    """Problemas de compatibilidad y memoria: [{'level': 'error'|'warning', 'message'}]."""
+    issues = []
+
+    def issue(level: str, message: str):
+        issues.append({'level': level, 'message': message})
+
+    for kind in ('wrapper', 'settings', 'root_build', 'app_build'):
+        if not config['files'][kind]:
+            issue('error', f"Falta {' o '.join(CONFIG_FILES[kind])}")
+
+    gradle = parse_version(config['gradle_version'])
+    agp = parse_version(config['agp_version'])
+    if config['files']['wrapper'] and not gradle:
+        issue('error', 'distributionUrl del wrapper sin versión de Gradle reconocible')
+    if not agp:
+        issue('warning', 'No se encontró la versión de AGP (com.android.application)')
+    if gradle and agp:
+        required = AGP_MIN_GRADLE.get(agp[:2])
+        if required is None and agp[:2] > max(AGP_MIN_GRADLE):
+            issue('warning', f"AGP {config['agp_version']} es más nuevo que la tabla de compatibilidad")
+        elif required and gradle < required:
+            issue('error', f"AGP {config['agp_version']} requiere Gradle "
+                           f"{'.'.join(map(str, required))}+ (wrapper: {config['gradle_version']})")
+
+    kotlin = parse_version(config['kotlin_version'])
+    if kotlin and kotlin < MIN_KOTLIN:
+        issue('warning', f"Kotlin {config['kotlin_version']} es anterior a "
+                         f"{'.'.join(map(str, MIN_KOTLIN))}; el plugin de Flutter lo desaconseja")
+
+    compile_sdk = _sdk_level(config['compile_sdk'])
+    min_sdk = _sdk_level(config['min_sdk'])
+    target_sdk = _sdk_level(config['target_sdk'])
+    if compile_sdk and target_sdk and target_sdk > compile_sdk:
+        issue('error', f'targetSdk {target_sdk} es mayor que compileSdk {compile_sdk}')
+    if min_sdk and target_sdk and min_sdk > target_sdk:
+        issue('error', f'minSdk {min_sdk} es mayor que targetSdk {target_sdk}')
+    if target_sdk and target_sdk < MIN_PLAY_TARGET_SDK:
+        issue('warning', f'targetSdk {target_sdk} < {MIN_PLAY_TARGET_SDK}: Google Play lo rechazará')
+
+    jvmargs = config['jvmargs']
+    if not jvmargs['raw']:
+        issue('warning', 'org.gradle.jvmargs no definido: el daemon usa 512 MB y los builds Android se quedan sin memoria')
+    else:
+        if jvmargs['xmx_mb'] is None:
+            issue('warning', 'org.gradle.jvmargs sin -Xmx')
+        elif jvmargs['xmx_mb'] < MIN_GRADLE_XMX_MB:
+            issue('warning', f"-Xmx{jvmargs['xmx_mb']}m es poco para un build Android "
+                             f"(recomendado ≥ {MIN_GRADLE_XMX_MB}m)")
+        else:
+            host = _host_memory_mb()
+            if host and jvmargs['xmx_mb'] > host * 0.75:
+                issue('warning', f"-Xmx{jvmargs['xmx_mb']}m supera el 75% de la RAM del equipo ({host} MB)")
+        if jvmargs['metaspace_mb'] is not None and jvmargs['metaspace_mb'] < MIN_METASPACE_MB:
+            issue('warning', f"MaxMetaspaceSize={jvmargs['metaspace_mb']}m es poco "
+                             f"(recomendado ≥ {MIN_METASPACE_MB}m)")
+
+    if not config['files']['local_properties']:
+        issue('warning', 'Falta local.properties (flutter pub get lo genera)')
+    elif not config['flutter_sdk']:
+        issue('error', 'local.properties sin flutter.sdk: settings.gradle no podrá cargar el plugin')
+    elif not Path(config['flutter_sdk']).exists():
+        issue('warning', f"flutter.sdk apunta a un directorio inexistente: {config['flutter_sdk']}")
+    return issues
+
+
+def main():
+    """Punto de entrada principal."""
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Modelo y validación de la configuración Gradle')
+    parser.add_argument('--root', type=str, default='.', help='Directorio raíz del proyecto')
+    parser.add_argument('--json', action='store_true', help='Imprimir el modelo en JSON')
+    args = parser.parse_args()
+
+    config = GradleConfigLoader(args.root).load()
+    issues = validate(config)
+    if args.json:
+        print(json.dumps({'config': config, 'issues': issues}, indent=2))
+    else:
+        for key in ('gradle_version', 'agp_version', 'kotlin_version', 'compile_sdk',
+                    'min_sdk', 'target_sdk'):
+            print(f"   {key:<16} {config[key]}")
+        print(f"   {'jvmargs':<16} {config['jvmargs']['raw']}")
+        for item in issues:
+            print(f"{'❌' if item['level'] == 'error' else '⚠️ '} {item['message']}")
+    sys.exit(1 if any(i['level'] == 'error' for i in issues) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Incremental Build - Tokyo Roulette
+Version: 1.0.0
+
+Decide si un build necesita `flutter clean` o puede reutilizar los caches
+incrementales de Gradle y Dart. Guarda la huella del último build exitoso
+(versión de Flutter, AGP, pubspec.lock y Gradle wrapper) y solo limpia si
+algo de eso cambió o si el directorio de build parece corrupto.
+"""
+
+import hashlib
+import json
+import re
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def file_hash(path: Path) -> Optional[str]:
+    """SHA-256 de un archivo, o None si no existe."""
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def flutter_version(root_path: Path) -> str:
+    """Versión del framework Flutter instalado (o 'unknown')."""
+    try:
+        result = subprocess.run(
+            ['flutter', '--version', '--machine'],
+            cwd=root_path,
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+        if result.returncode == 0:
+            # La salida puede traer avisos antes del JSON
+            data = json.loads(result.stdout[result.stdout.index('{'):])
+            return f"{data.get('frameworkVersion')} (dart {data.get('dartSdkVersion')})"
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        pass
+    return 'unknown'
+
+
+def agp_version(android_dir: Path) -> Optional[str]:
+    """Versión del Android Gradle Plugin declarada en settings.gradle o build.gradle."""
+    patterns = [
+        (android_dir / 'settings.gradle',
+         r'id\s+["\']com\.android\.application["\']\s+version\s+["\']([^"\']+)["\']'),
+        (android_dir / 'build.gradle',
+         r'com\.android\.tools\.build:gradle:([\w.\-]+)'),
+    ]
+    for path, pattern in patterns:
+        if path.exists():
+            match = re.search(pattern, path.read_text(encoding='utf-8'))
+            if match:
+                return match.group(1)
+    return None
+
+
+class IncrementalBuildState:
+    """Huella del último build y decisión de limpieza."""
+
+    # Claves de la huella y descripción para el motivo de limpieza
+    FINGERPRINT_LABELS = {
+        'flutter_version': 'versión de Flutter',
+        'agp_version': 'versión de AGP',
+        'pubspec_lock': 'pubspec.lock',
+        'gradle_wrapper': 'Gradle wrapper',
+    }
+
+    def __init__(self, root_path: str, state_file: Optional[str] = None):
+        self.root_path = Path(root_path)
+        self.android_dir = self.root_path / 'android'
+        self.state_file = (Path(state_file) if state_file
+                           else self.root_path / '.automation' / 'build_state.json')
+        self.state = self._load()
+        self._fingerprint = None
+
+    def _load(self) -> Dict:
+        if not self.state_file.exists():
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+
+    def fingerprint(self, refresh: bool = False) -> Dict:
+        """Huella actual de las entradas que invalidan los caches incrementales."""
+        if self._fingerprint is None or refresh:
+            self._fingerprint = {
+                'flutter_version': flutter_version(self.root_path),
+                'agp_version': agp_version(self.android_dir),
+                'pubspec_lock': file_hash(self.root_path / 'pubspec.lock'),
+                'gradle_wrapper': file_hash(
+                    self.android_dir / 'gradle' / 'wrapper' / 'gradle-wrapper.properties'),
+            }
+        return self._fingerprint
+
+    def _corruption_reason(self) -> Optional[str]:
+        """Detecta un directorio de build inconsistente."""
+        if self.state.get('in_progress'):
+            return 'el build anterior se interrumpió'
+
+        package_config = self.root_path / '.dart_tool' / 'package_config.json'
+        if package_config.exists():
+            try:
+                json.loads(package_config.read_text(encoding='utf-8'))
+            except ValueError:
+                return '.dart_tool/package_config.json corrupto'
+
+        outputs = self.root_path / 'build' / 'app' / 'outputs'
+        if outputs.exists():
+            for artifact in list(outputs.rglob('*.apk')) + list(outputs.rglob('*.aab')):
+                if artifact.stat().st_size == 0:
+                    return f'artefacto vacío en build: {artifact.name}'
+        return None
+
+    def decide(self, force_clean: bool = False) -> Dict:
+        """Retorna {'clean': bool, 'reason': str} para el build actual."""
+        if force_clean:
+            return {'clean': True, 'reason': 'forzado con --clean'}
+
+        corruption = self._corruption_reason()
+        if corruption:
+            return {'clean': True, 'reason': corruption}
+
+        previous = self.state.get('fingerprint')
+        if not previous:
+            if (self.root_path / 'build').exists():
+                return {'clean': True, 'reason': 'build sin huella previa'}
+            return {'clean': False, 'reason': 'primer build, no hay nada que limpiar'}
+
+        current = self.fingerprint()
+        changed = [self.FINGERPRINT_LABELS[key] for key in self.FINGERPRINT_LABELS
+                   if previous.get(key) != current.get(key)]
+        if changed:
+            return {'clean': True, 'reason': 'cambió: ' + ', '.join(changed)}
+        return {'clean': False, 'reason': 'sin cambios que invaliden el cache'}
+
+    def mark_started(self):
+        """Marca un build en curso para detectar interrupciones."""
+        self.state['in_progress'] = True
+        self.state['started'] = datetime.now().isoformat()
+        self._save()
+
+    def mark_finished(self, success: bool):
+        """Cierra el build; si fue exitoso guarda la huella actual."""
+        self.state['in_progress'] = False
+        if success:
+            self.state['fingerprint'] = self.fingerprint(refresh=True)
+            self.state['finished'] = datetime.now().isoformat()
+        self._save()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+LCOV Merge - Tokyo Roulette
+Version: 1.0.0
+
+Fusión en streaming de archivos lcov generados por shards de tests.
+Primero indexa el offset de cada registro `SF:` en cada shard y luego
+fusiona archivo fuente por archivo fuente, así en memoria solo vive un
+registro a la vez (más el índice), sin importar el tamaño de los shards.
+"""
+
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+
+def index_records(path: Path) -> Iterator[Tuple[str, int]]:
+    """Recorre un lcov y produce (archivo fuente, offset del registro)."""
+    with open(path, 'rb') as f:
+        offset = 0
+        for line in f:
+            if line.startswith(b'SF:'):
+                yield line[3:].decode('utf-8').strip(), offset
+            offset += len(line)
+
+
+def _read_record(handle: BinaryIO, offset: int) -> Iterator[str]:
+    """Lee las líneas de un registro desde su offset hasta `end_of_record`."""
+    handle.seek(offset)
+    handle.readline()  # SF:
+    for raw in handle:
+        line = raw.decode('utf-8').strip()
+        if line == 'end_of_record' or line.startswith('SF:'):
+            return
+        yield line
+
+
+def _merge_record(lines: Dict[int, int], functions: Dict[str, int],
+                  function_hits: Dict[str, int],
+                  branches: Dict[Tuple[str, str, str], Optional[int]], record: Iterator[str]):
+    """Acumula los contadores de un registro sobre los de otros shards.
+
+    Una rama `-` (bloque nunca evaluado) queda como None mientras ningún
+    shard traiga un contador para ella.
+    """
+    for line in record:
+        tag, _, value = line.partition(':')
+        if tag == 'DA':
+            parts = value.split(',')
+            lines[int(parts[0])] += int(parts[1])
+        elif tag == 'FN':
+            number, name = value.split(',', 1)
+            functions.setdefault(name, int(number))
+        elif tag == 'FNDA':
+            hits, name = value.split(',', 1)
+            function_hits[name] += int(hits)
+        elif tag == 'BRDA':
+            line_no, block, branch, taken = value.split(',')
+            key = (line_no, block, branch)
+            if taken == '-':
+                branches.setdefault(key, None)
+            else:
+                branches[key] = (branches.get(key) or 0) + int(taken)
+
+
+def merge_lcov(shard_paths: List[Path], output_path: Path) -> Dict:
+    """Fusiona shards lcov en `output_path` y retorna la cobertura por archivo.
+
+    El resultado tiene la forma:
+    {'files': {sf: {'lines_found', 'lines_hit', 'coverage'}},
+     'total': {'lines_found', 'lines_hit', 'coverage'}}
+    """
+    shard_paths = [Path(p) for p in shard_paths if Path(p).exists()]
+    index = defaultdict(list)
+    for shard_id, shard in enumerate(shard_paths):
+        for source, offset in index_records(shard):
+            index[source].append((shard_id, offset))
+
+    summary = {'files': {}, 'total': {'lines_found': 0, 'lines_hit': 0, 'coverage': 0.0}}
+    handles = [open(shard, 'rb') for shard in shard_paths]
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(output_path, 'w', encoding='utf-8') as out:
+            for source in sorted(index):
+                lines = defaultdict(int)
+                functions = {}
+                function_hits = defaultdict(int)
+                branches = {}
+                for shard_id, offset in index[source]:
+                    _merge_record(lines, functions, function_hits, branches,
+                                  _read_record(handles[shard_id], offset))
+
+                out.write(f"SF:{source}\n")
+                for name, number in sorted(functions.items(), key=lambda item: item[1]):
+                    out.write(f"FN:{number},{name}\n")
+                for name in functions:
+                    out.write(f"FNDA:{function_hits[name]},{name}\n")
+                if functions:
+                    out.write(f"FNF:{len(functions)}\n")
+                    out.write(f"FNH:{sum(1 for n in functions if function_hits[n] > 0)}\n")
+                for (line_no, block, branch), taken in sorted(branches.items()):
+                    out.write(f"BRDA:{line_no},{block},{branch},{'-' if taken is None else taken}\n")
+                if branches:
+                    out.write(f"BRF:{len(branches)}\n")
+                    out.write(f"BRH:{sum(1 for t in branches.values() if t)}\n")
+                for line_no in sorted(lines):
+                    out.write(f"DA:{line_no},{lines[line_no]}\n")
+                found = len(lines)
+                hit = sum(1 for hits in lines.values() if hits > 0)
+                out.write(f"LF:{found}\nLH:{hit}\nend_of_record\n")
+
+                summary['files'][source] = {
+                    'lines_found': found,
+                    'lines_hit': hit,
+                    'coverage': round(hit / found * 100, 2) if found else 100.0
+                }
+                summary['total']['lines_found'] += found
+                summary['total']['lines_hit'] += hit
+    finally:
+        for handle in handles:
+            handle.close()
+
+    total = summary['total']
+    if total['lines_found']:
+        total['coverage'] = round(total['lines_hit'] / total['lines_found'] * 100, 2)
+    return summary
+
+
+def main():
+    """Punto de entrada principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Fusiona archivos lcov en streaming')
+    parser.add_argument('shards', nargs='+', help='Archivos lcov de entrada')
+    parser.add_argument('-o', '--output', default='coverage/lcov.info', help='lcov fusionado')
+    args = parser.parse_args()
+
+    summary = merge_lcov([Path(p) for p in args.shards], Path(args.output))
+    total = summary['total']
+    print(f"📊 Cobertura: {total['coverage']}% ({total['lines_hit']}/{total['lines_found']} líneas)")
+    print(f"📄 lcov fusionado: {args.output}")
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Output Capture - Tokyo Roulette
+Version: 1.0.0
+
+Captura acotada de la salida de procesos hijos para todos los scripts.
+La salida (stdout+stderr) se escribe línea a línea en un log rotativo por
+paso (`.automation/logs/<paso>.log`, con las ejecuciones anteriores en
+`.1`, `.2`, ...) y en memoria solo queda un buffer circular con las
+últimas líneas. Los reportes guardan la ruta del log en lugar del texto.
+"""
+
+import re
+import subprocess
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from process_group import ProcessGroupRunner
+
+# Líneas que se conservan en memoria por paso
+DEFAULT_TAIL_LINES = 200
+
+# Tamaño máximo de un log antes de rotarlo
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+
+# Logs anteriores que se conservan por paso
+DEFAULT_BACKUPS = 3
+
+
+def step_slug(step_name: str) -> str:
+    """Nombre de archivo estable para un paso: 'Build APK Debug' → 'build-apk-debug'."""
+    slug = re.sub(r'[^\w]+', '-', step_name.lower(), flags=re.UNICODE).strip('-')
+    return slug or 'step'
+
+
+class RotatingLog:
+    """Log de un paso que rota al abrirse y al superar `max_bytes`."""
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_BYTES,
+                 backups: int = DEFAULT_BACKUPS):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.written = 0
+        self._file = None
+
+    def _rotate(self):
+        if self.backups <= 0:
+            if self.path.exists():
+                self.path.unlink()
+            return
+        for index in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f'{self.path.name}.{index}')
+            if older.exists():
+                older.replace(self.path.with_name(f'{self.path.name}.{index + 1}'))
+        if self.path.exists():
+            self.path.replace(self.path.with_name(f'{self.path.name}.1'))
+
+    def __enter__(self) -> 'RotatingLog':
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._rotate()
+        self._file = open(self.path, 'w', encoding='utf-8', errors='replace')
+        return self
+
+    def write(self, text: str):
+        if self.written + len(text) > self.max_bytes:
+            self._file.close()
+            self._rotate()
+            self._file = open(self.path, 'w', encoding='utf-8', errors='replace')
+            self.written = 0
+        self._file.write(text)
+        self.written += len(text)
+
+    def __exit__(self, *exc):
+        self._file.close()
+
+
+def run_captured(command: List[str], cwd: Path, step_name: str, log_dir: Path,
+                 timeout: Optional[float] = None, env: Optional[Dict[str, str]] = None,
+                 on_line: Optional[Callable[[str], None]] = None,
+                 tail_lines: int = DEFAULT_TAIL_LINES,
+                 runner: Optional[ProcessGroupRunner] = None) -> Dict:
+    """Ejecuta un comando con la salida en un log rotativo y un tail en memoria.
+
+    Retorna {'returncode', 'success', 'timed_out', 'duration', 'log', 'tail'};
+    `returncode` es None si hubo timeout o el comando no pudo lanzarse.
+    """
+    runner = runner or ProcessGroupRunner()
+    log_path = Path(log_dir) / f'{step_slug(step_name)}.log'
+    start = time.time()
+    result = {'returncode': None, 'success': False, 'timed_out': False,
+              'log': str(log_path), 'tail': ''}
+    with RotatingLog(log_path) as log:
+        log.write(f"$ {' '.join(command)}\n")
+
+        def handle(line: str):
+            log.write(line)
+            if on_line:
+                on_line(line)
+
+        try:
+            code, tail = runner.stream(command, cwd=str(cwd), timeout=timeout,
+                                       on_line=handle, tail_lines=tail_lines, env=env)
+            result['returncode'] = code
+            result['success'] = code == 0
+            result['tail'] = tail
+        except subprocess.TimeoutExpired:
+            result['timed_out'] = True
+            result['tail'] = f'Timeout después de {timeout}s'
+            log.write(f"\n[timeout después de {timeout}s]\n")
+        except OSError as e:
+            result['tail'] = str(e)
+            log.write(f"\n[error: {e}]\n")
+    result['duration'] = round(time.time() - start, 2)
+    return result
+
+
+def tail_text(result: Dict, lines: int = 20) -> str:
+    """Últimas `lines` líneas capturadas de un resultado de `run_captured`."""
+    return '\n'.join(result['tail'].splitlines()[-lines:])
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Process Group - Tokyo Roulette
+Version: 1.0.0
+
+Ejecución de comandos en su propio grupo de procesos.
+`flutter test` y `flutter build` lanzan procesos hijos (flutter_tester,
+Gradle, frontend_server); matar solo el proceso `flutter` los deja vivos.
+Aquí el timeout y la cancelación terminan el grupo completo.
+"""
+
+import os
+import signal
+import subprocess
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+
+def kill_group(process: subprocess.Popen, sig: int = signal.SIGKILL):
+    """Envía una señal a todo el grupo del proceso (o al proceso en Windows)."""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, sig)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class ProcessGroupRunner:
+    """Lanza comandos en grupos propios y permite cancelarlos todos a la vez."""
+
+    def __init__(self):
+        self._running: Set[subprocess.Popen] = set()
+        self._killed: Set[subprocess.Popen] = set()
+        self._lock = threading.Lock()
+        self.cancelled = threading.Event()
+
+    def run(self, command: List[str], cwd: str, timeout: Optional[float],
+            env: Optional[Dict[str, str]] = None) -> Tuple[int, str, str]:
+        """Ejecuta un comando capturando su salida.
+
+        Lanza `subprocess.TimeoutExpired` si se excede el timeout; en ese caso
+        el grupo completo ya fue terminado. Si el proceso fue cancelado con
+        `cancel_all`, retorna código -signal.SIGTERM.
+        """
+        if self.cancelled.is_set():
+            return -signal.SIGTERM, '', 'Cancelado'
+
+        process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=(os.name == 'posix')
+        )
+        with self._lock:
+            self._running.add(process)
+        # cancel_all pudo ejecutarse mientras se lanzaba el proceso
+        if self.cancelled.is_set():
+            self._killed.add(process)
+            kill_group(process, signal.SIGTERM)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            kill_group(process)
+            process.communicate()
+            raise
+        finally:
+            with self._lock:
+                self._running.discard(process)
+        if process in self._killed:
+            return -signal.SIGTERM, stdout, stderr
+        return process.returncode, stdout, stderr
+
+    def stream(self, command: List[str], cwd: str, timeout: Optional[float],
+               on_line: Callable[[str], None], tail_lines: int = 200,
+               env: Optional[Dict[str, str]] = None) -> Tuple[int, str]:
+        """Ejecuta un comando entregando cada línea (stdout+stderr) al llegar.
+
+        Solo conserva las últimas `tail_lines` líneas, que retorna junto al
+        código de salida. Lanza `subprocess.TimeoutExpired` igual que `run`.
+        """
+        if self.cancelled.is_set():
+            return -signal.SIGTERM, 'Cancelado'
+
+        process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors='replace',
+            bufsize=1,
+            start_new_session=(os.name == 'posix')
+        )
+        with self._lock:
+            self._running.add(process)
+        if self.cancelled.is_set():
+            self._killed.add(process)
+            kill_group(process, signal.SIGTERM)
+
+        timed_out = threading.Event()
+
+        def expire():
+            timed_out.set()
+            kill_group(process)
+
+        timer = threading.Timer(timeout, expire) if timeout else None
+        if timer:
+            timer.daemon = True
+            timer.start()
+        tail = deque(maxlen=tail_lines)
+        try:
+            for line in process.stdout:
+                tail.append(line)
+                on_line(line)
+            process.wait()
+        finally:
+            if timer:
+                timer.cancel()
+            process.stdout.close()
+            with self._lock:
+                self._running.discard(process)
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(command, timeout)
+        if process in self._killed:
+            return -signal.SIGTERM, ''.join(tail)
+        return process.returncode, ''.join(tail)
+
+    def cancel_all(self):
+        """Marca el runner como cancelado y termina los grupos en curso."""
+        self.cancelled.set()
+        with self._lock:
+            running = list(self._running)
+            self._killed.update(running)
+        for process in running:
+            kill_group(process, signal.SIGTERM)
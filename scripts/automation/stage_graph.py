@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Stage Graph - Tokyo Roulette
+Version: 1.0.0
+
+Pipeline definido como etapas con dependencias explícitas. Cada etapa se
+lanza en cuanto terminan sus dependencias, de modo que las independientes
+(p. ej. analyze, test y build después de pub get) corren en paralelo. Si
+falla una etapa crítica se omiten las que dependen de ella; el fallo de una
+etapa no crítica no cancela nada. El resultado incluye el tiempo del camino
+crítico frente a la suma de tiempos de todas las etapas.
+"""
+
+import concurrent.futures
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+class Stage:
+    """Etapa del pipeline: `func()` retorna True si tuvo éxito."""
+
+    def __init__(self, name: str, func: Callable[[], bool],
+                 deps: Sequence[str] = (), critical: bool = True):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.critical = critical
+
+
+class StageGraph:
+    """Ejecuta un conjunto de etapas respetando sus dependencias."""
+
+    def __init__(self, stages: Sequence[Stage], max_parallel: int = 3):
+        self.stages = {stage.name: stage for stage in stages}
+        self.max_parallel = max(1, max_parallel)
+        self.results: Dict[str, Dict] = {}
+        self._print_lock = threading.Lock()
+        self._validate()
+
+    def _validate(self):
+        for stage in self.stages.values():
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Etapa '{stage.name}' depende de etapas inexistentes: {missing}")
+        self.order()
+
+    def order(self) -> List[str]:
+        """Orden topológico estable (el de declaración cuando no hay restricciones)."""
+        ordered: List[str] = []
+        visiting = set()
+
+        def visit(name: str):
+            if name in ordered:
+                return
+            if name in visiting:
+                raise ValueError(f"Ciclo de dependencias en la etapa '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            ordered.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return ordered
+
+    def output(self, name: str) -> Callable[[str], None]:
+        """Callback `on_line` que imprime la salida de una etapa con su prefijo."""
+        width = max(len(n) for n in self.stages)
+        prefix = f"[{name:<{width}}] "
+
+        def emit(line: str):
+            with self._print_lock:
+                sys.stdout.write(prefix + line.rstrip('\n') + '\n')
+                sys.stdout.flush()
+        return emit
+
+    def _blocked_by(self, name: str) -> Optional[str]:
+        """Dependencia crítica que falló u omitida que impide correr la etapa."""
+        for dep in self.stages[name].deps:
+            result = self.results[dep]
+            if result['status'] == 'skipped' or (result['status'] == 'failed'
+                                                 and self.stages[dep].critical):
+                return dep
+        return None
+
+    def _execute(self, name: str, origin: float) -> Dict:
+        start = time.monotonic()
+        try:
+            success = bool(self.stages[name].func())
+            error = ''
+        except Exception as e:  # Una etapa rota no debe tumbar a las demás
+            success, error = False, f'{type(e).__name__}: {e}'
+        end = time.monotonic()
+        return {
+            'status': 'passed' if success else 'failed',
+            'critical': self.stages[name].critical,
+            'deps': self.stages[name].deps,
+            'start': round(start - origin, 2),
+            'duration': round(end - start, 2),
+            'error': error,
+        }
+
+    def run(self) -> Dict:
+        """Ejecuta el grafo; retorna {'success', 'stages', 'timing'}."""
+        origin = time.monotonic()
+        pending = self.order()
+        running: Dict[concurrent.futures.Future, str] = {}
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            while pending or running:
+                for name in list(pending):
+                    if len(running) >= self.max_parallel:
+                        break
+                    if any(dep not in self.results for dep in self.stages[name].deps):
+                        continue
+                    pending.remove(name)
+                    blocker = self._blocked_by(name)
+                    if blocker:
+                        self.results[name] = {
+                            'status': 'skipped', 'critical': self.stages[name].critical,
+                            'deps': self.stages[name].deps, 'start': None, 'duration': 0.0,
+                            'error': f"omitida: falló '{blocker}'"}
+                        continue
+                    running[executor.submit(self._execute, name, origin)] = name
+                if not running:
+                    # Todo lo pendiente quedó omitido en esta vuelta
+                    continue
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    self.results[running.pop(future)] = future.result()
+
+        wall = time.monotonic() - origin
+        ordered = {name: self.results[name] for name in self.order()}
+        success = all(r['status'] == 'passed' for name, r in ordered.items()
+                      if self.stages[name].critical)
+        return {'success': success, 'stages': ordered, 'timing': self.timing(wall)}
+
+    def critical_path(self) -> List[str]:
+        """Cadena de dependencias con mayor duración acumulada."""
+        best: Dict[str, float] = {}
+        via: Dict[str, Optional[str]] = {}
+        for name in self.order():
+            deps = self.stages[name].deps
+            previous = max(deps, key=lambda d: best[d], default=None)
+            via[name] = previous
+            best[name] = (best[previous] if previous else 0.0) + self.results.get(
+                name, {}).get('duration', 0.0)
+        if not best:
+            return []
+        path = []
+        node: Optional[str] = max(best, key=lambda n: best[n])
+        while node:
+            path.append(node)
+            node = via[node]
+        return list(reversed(path))
+
+    def timing(self, wall: float) -> Dict:
+        """Tiempo real, camino crítico y suma de las etapas."""
+        path = self.critical_path()
+        critical = sum(self.results[name]['duration'] for name in path)
+        summed = sum(r['duration'] for r in self.results.values())
+        return {
+            'wall_seconds': round(wall, 2),
+            'critical_path_seconds': round(critical, 2),
+            'summed_seconds': round(summed, 2),
+            'critical_path': path,
+            'speedup': round(summed / wall, 2) if wall > 0 else None,
+        }
+
+
+def print_timing(timing: Dict):
+    """Resumen de tiempos de un pipeline."""
+    print(f"⏱️  Tiempo real: {timing['wall_seconds']:.1f}s | "
+          f"camino crítico: {timing['critical_path_seconds']:.1f}s | "
+          f"suma de etapas: {timing['summed_seconds']:.1f}s")
+    print(f"   Camino crítico: {' → '.join(timing['critical_path'])}")
+    if timing['speedup']:
+        print(f"   Aceleración por paralelismo: {timing['speedup']:.2f}x")
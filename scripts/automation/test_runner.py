@@ -7,24 +7,201 @@ Sistema de ejecución de tests en paralelo con reportes JSON.
 Ejecuta tests 4x más rápido que el modo secuencial.
 """
 
+import asyncio
 import concurrent.futures
 import json
+import re
+import shutil
+import signal
 import subprocess
 import sys
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
+
+from async_backend import AsyncProcessExecutor
+from flaky_tracker import (OUTCOME_FAIL, OUTCOME_FLAKY, OUTCOME_PASS,
+                           FlakyTracker)
+from lcov_merge import merge_lcov
+from process_group import ProcessGroupRunner
+
+
+def load_coverage_threshold(root_path: Path) -> float:
+    """Lee `thresholds.min_test_coverage` de `.project-health.yml` (default 70)."""
+    config_file = root_path / '.project-health.yml'
+    if not config_file.exists():
+        return 70.0
+    content = config_file.read_text(encoding='utf-8')
+    try:
+        import yaml
+        config = yaml.safe_load(content) or {}
+        return float(config.get('thresholds', {}).get('min_test_coverage', 70))
+    except ImportError:
+        match = re.search(r'^\s*min_test_coverage:\s*([\d.]+)', content, re.MULTILINE)
+        return float(match.group(1)) if match else 70.0
+
+
+def parse_test_events(stdout: str, suite: Optional[str] = None) -> Dict[str, bool]:
+    """Extrae el resultado por test del stream JSON de `flutter test --machine`.
+
+    Retorna {nombre_completo: pasó}. Los tests ocultos (p.ej. "loading ...")
+    solo se incluyen si fallan, para detectar errores de compilación.
+    Con `suite` se filtran los tests de ese archivo dentro de un lote.
+    """
+    suites = {}
+    names = {}
+    outcomes = {}
+    for line in stdout.splitlines():
+        line = line.strip()
+        if not line.startswith('{'):
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if event.get('type') == 'suite':
+            info = event.get('suite', {})
+            suites[info.get('id')] = Path(info.get('path') or '').name
+        elif event.get('type') == 'testStart':
+            test = event.get('test', {})
+            if suite is None or suites.get(test.get('suiteID')) == suite:
+                names[test.get('id')] = test.get('name', '')
+        elif event.get('type') == 'testDone' and not event.get('skipped'):
+            passed = event.get('result') == 'success'
+            if event.get('hidden') and passed:
+                continue
+            name = names.get(event.get('testID'))
+            if name is not None:
+                outcomes[name] = passed
+    return outcomes
+
+
+class RetryState:
+    """Estado de los reintentos de un archivo de test.
+    
+    Compartido por los backends de threads y asyncio: acumula los resultados
+    por test, decide qué reintentar y arma el resultado final.
+    """
+    
+    def __init__(self, file_name: str, run: Dict, retries: int, tracker: FlakyTracker):
+        self.file_name = file_name
+        self.run = run
+        self.retries = retries
+        self.tracker = tracker
+        self.duration = run['duration']
+        self.outcomes = {name: (OUTCOME_PASS if passed else OUTCOME_FAIL)
+                         for name, passed in run['tests'].items()}
+        self.status = run['status']
+        self.attempts = 0
+        # Solo duraciones propias del archivo: el promedio de un lote no sirve
+        # para el p99 del que sale su timeout
+        if self.status in ['passed', 'failed'] and not run.get('batched'):
+            tracker.record_duration(file_name, run['duration'])
+    
+    @property
+    def failing(self) -> List[str]:
+        return [name for name, outcome in self.outcomes.items() if outcome == OUTCOME_FAIL]
+    
+    def should_retry(self) -> bool:
+        return self.status in ['failed', 'timeout', 'error'] and self.attempts < self.retries
+    
+    def next_attempt(self) -> Optional[List[str]]:
+        """Avanza al siguiente intento y retorna los nombres a reintentar.
+        
+        None significa reintentar el archivo completo.
+        """
+        self.attempts += 1
+        failing = self.failing
+        if failing and not any(name.startswith('loading ') for name in failing):
+            # Reintentar solo los casos fallidos, por nombre
+            print(f"🔁 Reintento {self.attempts}/{self.retries}: {self.file_name} ({len(failing)} tests)")
+            return failing
+        # Sin nombres utilizables (timeout, error de carga): archivo completo
+        print(f"🔁 Reintento {self.attempts}/{self.retries}: {self.file_name} (archivo completo)")
+        return None
+    
+    def apply(self, retry: Dict):
+        """Incorpora el resultado de un reintento."""
+        self.duration += retry['duration']
+        for name, passed in retry['tests'].items():
+            if passed and self.outcomes.get(name) == OUTCOME_FAIL:
+                self.outcomes[name] = OUTCOME_FLAKY
+            elif name not in self.outcomes:
+                self.outcomes[name] = OUTCOME_PASS if passed else OUTCOME_FAIL
+        
+        if retry['status'] == 'passed' and not self.failing:
+            self.status = 'flaky'
+        elif retry['status'] in ['timeout', 'error', 'cancelled']:
+            self.status = retry['status']
+        else:
+            self.status = 'failed'
+        self.run['stdout'], self.run['stderr'] = retry['stdout'], retry['stderr']
+        self.run['exit_code'] = retry['exit_code']
+    
+    def result(self, path: str) -> Dict:
+        """Resultado final del archivo para el reporte."""
+        failing = self.failing
+        status = self.status
+        # Fallos restringidos a tests en cuarentena no bloquean el resultado
+        if status == 'failed' and failing and all(
+                self.tracker.is_test_quarantined(self.file_name, name) for name in failing):
+            status = 'quarantined'
+        
+        return {
+            'name': self.file_name,
+            'path': path,
+            'status': status,
+            'duration': round(self.duration, 2),
+            'exit_code': self.run['exit_code'],
+            'retries': self.attempts,
+            'tests': self.outcomes,
+            'flaky_tests': [n for n, outcome in self.outcomes.items() if outcome == OUTCOME_FLAKY],
+            'failing_tests': failing,
+            'stdout': self.run['stdout'],
+            'stderr': self.run['stderr']
+        }
+
 
 class TestRunner:
     """Ejecutor de tests paralelos con reportes."""
     
-    def __init__(self, root_path: str, max_workers: int = 4):
+    def __init__(self, root_path: str, max_workers: int = 4, retries: int = 2,
+                 quarantine_file: Optional[str] = None,
+                 history_file: Optional[str] = None, flaky_threshold: float = 0.2,
+                 batch: bool = False, batch_size: int = 4,
+                 coverage: bool = False, min_coverage: Optional[float] = None,
+                 fail_fast: bool = False, default_timeout: float = 120,
+                 timeout_factor: float = 3.0, backend: str = 'threads'):
         self.root_path = Path(root_path)
+        self.backend = backend
+        self.fail_fast = fail_fast
+        self.default_timeout = default_timeout
+        self.timeout_factor = timeout_factor
+        self.processes = ProcessGroupRunner()
+        self.coverage = coverage
+        self.min_coverage = (min_coverage if min_coverage is not None
+                             else load_coverage_threshold(self.root_path))
+        self.coverage_dir = self.root_path / 'coverage'
+        self.coverage_summary = None
         self.max_workers = max_workers
+        self.batch = batch
+        self.batch_size = batch_size
+        # En modo lotes `flutter pub get` corre una sola vez y cada lote usa --no-pub
+        self._pub_lock = threading.Lock()
+        self._pub_ready: Optional[bool] = None
+        self.retries = retries
+        self.flaky_threshold = flaky_threshold
         self.results = []
+        self.quarantine_results = []
+        self.cancelled_files = []
         self.start_time = None
         self.end_time = None
+        self.tracker = FlakyTracker(
+            Path(history_file) if history_file else self.root_path / '.automation' / 'test_history.json',
+            Path(quarantine_file) if quarantine_file else self.root_path / 'test' / 'quarantine.txt'
+        )
     
     def discover_tests(self) -> List[Path]:
         """Descubre automáticamente todos los archivos de test."""
@@ -37,60 +214,279 @@ class TestRunner:
         print(f"✅ Descubiertos {len(test_files)} archivos de test")
         return test_files
     
-    def run_single_test(self, test_file: Path) -> Dict:
-        """Ejecuta un solo archivo de test y retorna resultados."""
-        test_name = test_file.name
-        print(f"🧪 Ejecutando: {test_name}")
-        
+    def _shard_path(self, shard_name: str) -> Optional[Path]:
+        """Ruta del lcov de un shard, o None si la cobertura está desactivada."""
+        if not self.coverage:
+            return None
+        return self.coverage_dir / 'shards' / f'{shard_name}.info'
+    
+    def _timeout_for(self, test_file: Path) -> float:
+        """Timeout del archivo según su historial (p99 × factor) o el default."""
+        return self.tracker.timeout_for(test_file.name, self.default_timeout, self.timeout_factor)
+    
+    def _resolve_dependencies(self) -> bool:
+        """`flutter pub get` una sola vez por corrida (modo lotes).
+
+        Es lo único que se amortiza entre lotes: cada lote sigue siendo una
+        invocación nueva de `flutter test`, ahora con `--no-pub`.
+        """
+        with self._pub_lock:
+            if self._pub_ready is None:
+                try:
+                    exit_code, _, _ = self.processes.run(['flutter', 'pub', 'get'],
+                                                         self.root_path, self.default_timeout)
+                    self._pub_ready = exit_code == 0
+                except (OSError, subprocess.TimeoutExpired):
+                    self._pub_ready = False
+            return self._pub_ready
+    
+    def _build_command(self, test_file: Path, plain_names: Optional[List[str]] = None,
+                       coverage_path: Optional[Path] = None) -> List[str]:
+        """Arma la invocación `flutter test --machine` de un archivo."""
+        return self._batch_command([test_file], plain_names, coverage_path)
+    
+    def _batch_command(self, test_files: List[Path], plain_names: Optional[List[str]] = None,
+                       coverage_path: Optional[Path] = None) -> List[str]:
+        """Arma la invocación `flutter test --machine` de uno o varios archivos."""
+        command = ['flutter', 'test', '--machine']
+        if self.batch and self._resolve_dependencies():
+            command.append('--no-pub')
+        command += [str(test_file) for test_file in test_files]
+        for name in plain_names or []:
+            command += ['--plain-name', name]
+        if coverage_path:
+            command += ['--coverage', '--coverage-path', str(coverage_path)]
+        return command
+    
+    @staticmethod
+    def _finished_run(exit_code: int, stdout: str, stderr: str, duration: float,
+                      cancelled: bool) -> Dict:
+        """Resultado de una invocación que terminó (o fue cancelada)."""
+        if cancelled:
+            status = 'cancelled'
+        else:
+            status = 'passed' if exit_code == 0 else 'failed'
+        return {
+            'status': status,
+            'duration': duration,
+            'exit_code': exit_code,
+            'tests': parse_test_events(stdout),
+            'stdout': stdout,
+            'stderr': stderr
+        }
+    
+    @staticmethod
+    def _failed_run(name: str, status: str, message: str, duration: float) -> Dict:
+        """Resultado de una invocación que no llegó a terminar (timeout o error)."""
+        icon = "⏱️ " if status == 'timeout' else "💥"
+        print(f"{icon} {status.upper()}: {name} - {message}")
+        return {
+            'status': status,
+            'duration': duration,
+            'exit_code': -1,
+            'tests': {},
+            'stdout': '',
+            'stderr': message
+        }
+    
+    def _run_flutter_test(self, test_file: Path, plain_names: Optional[List[str]] = None,
+                          coverage_path: Optional[Path] = None) -> Dict:
+        """Lanza `flutter test` sobre un archivo, opcionalmente filtrado por nombre."""
+        return self._invoke([test_file], self._timeout_for(test_file), plain_names, coverage_path)
+    
+    def _invoke(self, test_files: List[Path], timeout: float,
+                plain_names: Optional[List[str]] = None,
+                coverage_path: Optional[Path] = None) -> Dict:
+        """Una invocación de `flutter test` en su propio grupo de procesos."""
+        command = self._batch_command(test_files, plain_names, coverage_path)
+        label = ', '.join(f.name for f in test_files)
         start = time.time()
         try:
-            result = subprocess.run(
-                ['flutter', 'test', str(test_file)],
-                cwd=self.root_path,
-                capture_output=True,
-                text=True,
-                timeout=120  # 2 minutos timeout
-            )
-            duration = time.time() - start
-            
-            success = result.returncode == 0
-            status = "✅ PASSED" if success else "❌ FAILED"
-            
-            return {
-                'name': test_name,
-                'path': str(test_file.relative_to(self.root_path)),
-                'status': 'passed' if success else 'failed',
-                'duration': round(duration, 2),
-                'exit_code': result.returncode,
-                'stdout': result.stdout,
-                'stderr': result.stderr
-            }
-        
+            exit_code, stdout, stderr = self.processes.run(command, self.root_path, timeout)
+            cancelled = self.processes.cancelled.is_set() and exit_code == -signal.SIGTERM
+            return self._finished_run(exit_code, stdout, stderr, time.time() - start, cancelled)
         except subprocess.TimeoutExpired:
-            duration = time.time() - start
-            print(f"⏱️  TIMEOUT: {test_name}")
-            return {
-                'name': test_name,
-                'path': str(test_file.relative_to(self.root_path)),
-                'status': 'timeout',
-                'duration': round(duration, 2),
-                'exit_code': -1,
-                'stdout': '',
-                'stderr': 'Test timeout after 120 seconds'
+            return self._failed_run(label, 'timeout',
+                                    f'Test timeout after {timeout:.0f} seconds',
+                                    time.time() - start)
+        except Exception as e:
+            return self._failed_run(label, 'error', str(e), time.time() - start)
+    
+    def run_single_test(self, test_file: Path, first_run: Optional[Dict] = None) -> Dict:
+        """Ejecuta un archivo de test, reintentando solo los casos que fallen.
+        
+        `first_run` permite partir de un resultado ya obtenido en un lote.
+        """
+        if first_run is None:
+            print(f"🧪 Ejecutando: {test_file.name}")
+        
+        run = first_run or self._run_flutter_test(
+            test_file, coverage_path=self._shard_path(test_file.stem))
+        state = RetryState(test_file.name, run, self.retries, self.tracker)
+        while state.should_retry() and not self.processes.cancelled.is_set():
+            names = state.next_attempt()
+            state.apply(self._run_flutter_test(test_file, names))
+        return state.result(str(test_file.relative_to(self.root_path)))
+    
+    def _run_file(self, test_files: List[Path]) -> List[Dict]:
+        """Ejecuta un grupo de un solo archivo con su propio proceso flutter."""
+        return [self.run_single_test(test_files[0])]
+    
+    def _run_batch(self, test_files: List[Path]) -> List[Dict]:
+        """Ejecuta varios archivos en una sola invocación `flutter test --no-pub`."""
+        print(f"🧪 Ejecutando lote: {', '.join(f.name for f in test_files)}")
+        shard_name = 'batch-' + '-'.join(f.stem for f in test_files)
+        timeout = sum(self._timeout_for(f) for f in test_files)
+        batch = self._invoke(test_files, timeout,
+                             coverage_path=self._shard_path(shard_name))
+        share = batch['duration'] / len(test_files)
+        results = []
+        for test_file in test_files:
+            tests = parse_test_events(batch['stdout'], suite=test_file.name)
+            if batch['status'] in ['timeout', 'error', 'cancelled']:
+                status = batch['status']
+            elif batch['status'] == 'passed' or (tests and all(tests.values())):
+                status = 'passed'
+            else:
+                status = 'failed'
+            first_run = dict(batch, status=status, tests=tests, duration=share, batched=True)
+            results.append(self.run_single_test(test_file, first_run=first_run))
+        return results
+    
+    def _record_result(self, result: Dict, results: List[Dict]) -> bool:
+        """Agrega un resultado al reporte y al historial.
+        
+        Los cancelados por fail-fast no entran en `results` (ni en el total):
+        se cuentan aparte en `cancelled_files`, igual que en el backend asyncio,
+        donde la tarea cancelada nunca produce resultado.
+
+        Retorna True si debe disparar el fail-fast.
+        """
+        if result['status'] == 'cancelled':
+            self.cancelled_files.append(result['name'])
+            return False
+        results.append(result)
+        for name, outcome in result['tests'].items():
+            self.tracker.record(result['name'], name, outcome)
+        print(f"{result['status'].upper()}: {result['name']} ({result['duration']}s)")
+        return (self.fail_fast and results is self.results
+                and result['status'] in ['failed', 'timeout', 'error']
+                and not self.processes.cancelled.is_set())
+    
+    def _run_lane(self, test_files: List[Path], max_workers: int, results: List[Dict]):
+        """Ejecuta un grupo de archivos de test en paralelo acumulando resultados."""
+        if self.backend == 'asyncio':
+            asyncio.run(self._run_lane_async(test_files, max_workers, results))
+            return
+        
+        if self.batch:
+            groups = [test_files[i:i + self.batch_size]
+                      for i in range(0, len(test_files), self.batch_size)]
+        else:
+            groups = [[test_file] for test_file in test_files]
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_group = {
+                executor.submit(self._run_batch if self.batch else self._run_file, group): group
+                for group in groups
             }
+            
+            for future in concurrent.futures.as_completed(future_to_group):
+                group = future_to_group[future]
+                if future.cancelled():
+                    continue
+                try:
+                    for result in future.result():
+                        if self._record_result(result, results):
+                            self._cancel_pending(future_to_group, result['name'])
+                except Exception as e:
+                    print(f"💥 Excepción en {', '.join(f.name for f in group)}: {str(e)}")
+    
+    def _live_progress(self, file_name: str) -> Callable[[str], None]:
+        """Callback por línea que informa en vivo los tests fallidos de un archivo."""
+        names = {}
+        
+        def on_line(line: str):
+            if not line.startswith('{'):
+                return
+            try:
+                event = json.loads(line)
+            except ValueError:
+                return
+            if event.get('type') == 'testStart':
+                names[event['test'].get('id')] = event['test'].get('name', '')
+            elif (event.get('type') == 'testDone' and event.get('result') != 'success'
+                  and not event.get('skipped')):
+                print(f"   ✗ {file_name}: {names.get(event.get('testID'), '?')}")
         
+        return on_line
+    
+    async def _run_flutter_test_async(self, executor: AsyncProcessExecutor, test_file: Path,
+                                      plain_names: Optional[List[str]] = None,
+                                      coverage_path: Optional[Path] = None) -> Dict:
+        """Equivalente asyncio de `_run_flutter_test`."""
+        timeout = self._timeout_for(test_file)
+        command = self._build_command(test_file, plain_names, coverage_path)
+        start = time.time()
+        try:
+            exit_code, stdout, stderr = await executor.run(
+                command, str(self.root_path), timeout, on_line=self._live_progress(test_file.name))
+            return self._finished_run(exit_code, stdout, stderr, time.time() - start, False)
+        except subprocess.TimeoutExpired:
+            return self._failed_run(test_file.name, 'timeout',
+                                    f'Test timeout after {timeout:.0f} seconds',
+                                    time.time() - start)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            duration = time.time() - start
-            print(f"💥 ERROR: {test_name} - {str(e)}")
-            return {
-                'name': test_name,
-                'path': str(test_file.relative_to(self.root_path)),
-                'status': 'error',
-                'duration': round(duration, 2),
-                'exit_code': -1,
-                'stdout': '',
-                'stderr': str(e)
-            }
+            return self._failed_run(test_file.name, 'error', str(e), time.time() - start)
+    
+    async def _run_single_test_async(self, executor: AsyncProcessExecutor, test_file: Path) -> Dict:
+        """Equivalente asyncio de `run_single_test`; ocupa un cupo del semáforo."""
+        async with executor.semaphore:
+            print(f"🧪 Ejecutando: {test_file.name}")
+            run = await self._run_flutter_test_async(
+                executor, test_file, coverage_path=self._shard_path(test_file.stem))
+            state = RetryState(test_file.name, run, self.retries, self.tracker)
+            while state.should_retry():
+                names = state.next_attempt()
+                state.apply(await self._run_flutter_test_async(executor, test_file, names))
+            return state.result(str(test_file.relative_to(self.root_path)))
+    
+    async def _run_lane_async(self, test_files: List[Path], concurrency: int,
+                              results: List[Dict]):
+        """Ejecuta un carril completo en un solo hilo con asyncio."""
+        executor = AsyncProcessExecutor(concurrency)
+        pending = {
+            asyncio.ensure_future(self._run_single_test_async(executor, test_file)): test_file
+            for test_file in test_files
+        }
+        completed = 0
+        while pending:
+            done, _ = await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                test_file = pending.pop(task)
+                if task.cancelled():
+                    self.cancelled_files.append(test_file.name)
+                    continue
+                if task.exception():
+                    print(f"💥 Excepción en {test_file.name}: {task.exception()}")
+                    continue
+                completed += 1
+                print(f"📶 [{completed}/{len(test_files)}]", end=' ')
+                if self._record_result(task.result(), results):
+                    print(f"🛑 Fail-fast: {test_file.name} falló, cancelando el resto")
+                    self.processes.cancel_all()
+                    for other in pending:
+                        other.cancel()
+    
+    def _cancel_pending(self, future_to_group: Dict, failed_name: str):
+        """Fail-fast: descarta archivos en cola y mata los grupos en ejecución."""
+        print(f"🛑 Fail-fast: {failed_name} falló, cancelando el resto")
+        pending = [f for f in future_to_group if f.cancel()]
+        for future in pending:
+            self.cancelled_files.extend(f.name for f in future_to_group[future])
+        self.processes.cancel_all()
     
     def run_tests_parallel(self) -> bool:
         """Ejecuta todos los tests en paralelo."""
@@ -103,31 +499,90 @@ class TestRunner:
         print("=" * 60)
         
         self.start_time = time.time()
+        if self.coverage:
+            shutil.rmtree(self.coverage_dir / 'shards', ignore_errors=True)
+            (self.coverage_dir / 'shards').mkdir(parents=True)
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_test = {
-                executor.submit(self.run_single_test, test_file): test_file
-                for test_file in test_files
-            }
-            
-            for future in concurrent.futures.as_completed(future_to_test):
-                test_file = future_to_test[future]
-                try:
-                    result = future.result()
-                    self.results.append(result)
-                    print(f"{result['status'].upper()}: {result['name']} ({result['duration']}s)")
-                except Exception as e:
-                    print(f"💥 Excepción en {test_file.name}: {str(e)}")
+        main_lane = [f for f in test_files if not self.tracker.is_file_quarantined(f.name)]
+        quarantine_lane = [f for f in test_files if self.tracker.is_file_quarantined(f.name)]
+        
+        self._run_lane(main_lane, self.max_workers, self.results)
+        
+        # Carril de baja prioridad: tests en cuarentena, no bloquean el resultado
+        if quarantine_lane and not self.processes.cancelled.is_set():
+            print(f"\n🧊 Carril de cuarentena: {len(quarantine_lane)} archivo(s)")
+            self._run_lane(quarantine_lane, 1, self.quarantine_results)
         
         self.end_time = time.time()
+        self.tracker.save()
+        if self.coverage:
+            self._merge_coverage()
         return self._generate_report()
     
+    def _merge_coverage(self):
+        """Fusiona los lcov de cada shard en `coverage/lcov.info`."""
+        shards = sorted((self.coverage_dir / 'shards').glob('*.info'))
+        self.coverage_summary = merge_lcov(shards, self.coverage_dir / 'lcov.info')
+        self.coverage_summary['shards'] = len(shards)
+        self.coverage_summary['lcov'] = str(self.coverage_dir / 'lcov.info')
+        self.coverage_summary['min_coverage'] = self.min_coverage
+        self.coverage_summary['meets_threshold'] = (
+            self.coverage_summary['total']['coverage'] >= self.min_coverage)
+    
+    def watch(self, interval: float = 1.0):
+        """Bucle edición-test: re-ejecuta los tests al detectar cambios.
+        
+        Un cambio en `test/` re-ejecuta ese archivo; un cambio en `lib/`
+        re-ejecuta toda la suite. Con `--batch` el `pub get` de la primera
+        iteración sirve para todas.
+        """
+        def snapshot() -> Dict[Path, float]:
+            files = {}
+            for folder in ['lib', 'test']:
+                for path in (self.root_path / folder).rglob('*.dart'):
+                    files[path] = path.stat().st_mtime
+            return files
+        
+        self.run_tests_parallel()
+        previous = snapshot()
+        print("\n👀 Observando cambios en lib/ y test/ (Ctrl+C para salir)")
+        try:
+            while True:
+                time.sleep(interval)
+                current = snapshot()
+                changed = [p for p, mtime in current.items() if previous.get(p) != mtime]
+                previous = current
+                if not changed:
+                    continue
+                
+                if any(self.root_path / 'lib' in p.parents for p in changed):
+                    targets = self.discover_tests()
+                else:
+                    targets = [p for p in changed if p.name.endswith('_test.dart')]
+                if not targets:
+                    continue
+                
+                self.results = []
+                self.quarantine_results = []
+                self.cancelled_files = []
+                self.processes = ProcessGroupRunner()
+                self.start_time = time.time()
+                self._run_lane(targets, self.max_workers, self.results)
+                self.end_time = time.time()
+                self.tracker.save()
+                self._generate_report()
+        except KeyboardInterrupt:
+            print("\n👋 Fin del modo watch")
+    
     def _generate_report(self) -> bool:
         """Genera reporte JSON y muestra resumen."""
         total_duration = self.end_time - self.start_time
         passed = sum(1 for r in self.results if r['status'] == 'passed')
         failed = sum(1 for r in self.results if r['status'] == 'failed')
         errors = sum(1 for r in self.results if r['status'] in ['error', 'timeout'])
+        flaky = sum(1 for r in self.results if r['status'] == 'flaky')
+        quarantined = sum(1 for r in self.results if r['status'] == 'quarantined')
+        cancelled = len(self.cancelled_files)
         total = len(self.results)
         
         report = {
@@ -138,9 +593,20 @@ class TestRunner:
                 'errors': errors,
                 'total_duration': round(total_duration, 2),
                 'timestamp': datetime.now().isoformat(),
-                'success_rate': round((passed / total * 100) if total > 0 else 0, 2)
+                'success_rate': round(((passed + flaky) / total * 100) if total > 0 else 0, 2),
+                'flaky': flaky,
+                'quarantined': quarantined,
+                'retries': sum(r.get('retries', 0) for r in self.results),
+                'cancelled': cancelled,
+                'fail_fast': self.fail_fast
             },
-            'results': self.results
+            'results': self.results,
+            'quarantine': self.quarantine_results,
+            'coverage': self.coverage_summary,
+            'flakiness': {
+                'top_flaky': self.tracker.stats(min_runs=1)[:10],
+                'quarantine_candidates': self.tracker.quarantine_candidates(self.flaky_threshold)
+            }
         }
         
         # Guardar reporte JSON
@@ -156,12 +622,24 @@ class TestRunner:
         print(f"✅ Passed:  {passed}")
         print(f"❌ Failed:  {failed}")
         print(f"💥 Errors:  {errors}")
+        print(f"🔁 Flaky:   {flaky}")
+        if cancelled:
+            print(f"🛑 Cancelados: {cancelled} (fail-fast)")
+        if quarantined or self.quarantine_results:
+            print(f"🧊 Cuarentena: {quarantined + len(self.quarantine_results)} (no bloquean)")
+        for candidate in report['flakiness']['quarantine_candidates']:
+            print(f"⚠️  Candidato a cuarentena: {candidate}")
+        if self.coverage_summary:
+            coverage = self.coverage_summary['total']['coverage']
+            mark = "✅" if self.coverage_summary['meets_threshold'] else "❌"
+            print(f"{mark} Cobertura: {coverage}% (mínimo {self.min_coverage}%)")
         print(f"⏱️  Duración: {total_duration:.2f}s")
         print(f"📈 Éxito:   {report['summary']['success_rate']}%")
         print(f"\n📄 Reporte guardado: {report_file}")
         print("=" * 60)
         
-        return failed == 0 and errors == 0
+        coverage_ok = not self.coverage_summary or self.coverage_summary['meets_threshold']
+        return failed == 0 and errors == 0 and coverage_ok
 
 
 def main():
@@ -171,10 +649,49 @@ def main():
     parser = argparse.ArgumentParser(description='Test Runner Paralelo para Flutter')
     parser.add_argument('--workers', type=int, default=4, help='Número de workers paralelos')
     parser.add_argument('--root', type=str, default='.', help='Directorio raíz del proyecto')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='Reintentos de los tests fallidos (por nombre)')
+    parser.add_argument('--quarantine-file', type=str, default=None,
+                        help='Lista de tests en cuarentena (default: test/quarantine.txt)')
+    parser.add_argument('--history-file', type=str, default=None,
+                        help='Historial de resultados (default: .automation/test_history.json)')
+    parser.add_argument('--flaky-threshold', type=float, default=0.2,
+                        help='Tasa de flakiness a partir de la cual sugerir cuarentena')
+    parser.add_argument('--batch', action='store_true',
+                        help='Lotes de archivos por invocación, con un solo pub get y --no-pub')
+    parser.add_argument('--batch-size', type=int, default=4,
+                        help='Archivos por lote en modo --batch')
+    parser.add_argument('--coverage', action='store_true',
+                        help='Recolectar lcov por shard y fusionarlo en coverage/lcov.info')
+    parser.add_argument('--min-coverage', type=float, default=None,
+                        help='Cobertura mínima (default: min_test_coverage de .project-health.yml)')
+    parser.add_argument('--fail-fast', action='store_true',
+                        help='Cancelar el resto de tests al primer fallo')
+    parser.add_argument('--timeout', type=float, default=120,
+                        help='Timeout por archivo sin historial suficiente (segundos)')
+    parser.add_argument('--timeout-factor', type=float, default=3.0,
+                        help='Timeout por archivo = p99 histórico × factor')
+    parser.add_argument('--watch', action='store_true',
+                        help='Re-ejecutar tests al detectar cambios en lib/ y test/')
+    parser.add_argument('--backend', choices=['threads', 'asyncio'], default='threads',
+                        help='threads: un hilo por proceso; asyncio: un solo hilo con event loop')
     args = parser.parse_args()
+    if args.backend == 'asyncio' and args.batch:
+        parser.error('--batch solo está disponible con --backend threads')
     
-    runner = TestRunner(args.root, max_workers=args.workers)
-    success = runner.run_tests_parallel()
+    runner = TestRunner(args.root, max_workers=args.workers, retries=args.retries,
+                        quarantine_file=args.quarantine_file,
+                        history_file=args.history_file,
+                        flaky_threshold=args.flaky_threshold,
+                        batch=args.batch, batch_size=args.batch_size,
+                        coverage=args.coverage, min_coverage=args.min_coverage,
+                        fail_fast=args.fail_fast, default_timeout=args.timeout,
+                        timeout_factor=args.timeout_factor, backend=args.backend)
+    if args.watch:
+        runner.watch()
+        success = True
+    else:
+        success = runner.run_tests_parallel()
     
     sys.exit(0 if success else 1)
 
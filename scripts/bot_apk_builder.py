@@ -9,18 +9,34 @@ import subprocess
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "automation"))
+from incremental_build import IncrementalBuildState
+from output_capture import run_captured, tail_text
+from build_metrics import BuildMetricsStore, PhaseTimer, build_record, print_comparison, toolchain_versions
+
 class APKBuilderBot:
-    def __init__(self, project_root):
+    def __init__(self, project_root, force_clean=False, compare=False):
         self.project_root = Path(project_root)
         self.build_dir = self.project_root / "build" / "app" / "outputs" / "flutter-apk"
         self.status = "⏳ INICIANDO"
+        self.force_clean = force_clean
+        self.build_state = IncrementalBuildState(self.project_root)
+        self.log_dir = self.project_root / ".automation" / "logs"
+        self.clean_decision = None
+        self.compare = compare
+        self.metrics_store = BuildMetricsStore.for_project(self.project_root)
+        self.timer = PhaseTimer()
         
     def log(self, message, emoji="🏗️"):
         print(f"{emoji} [APKBuilder] {message}")
         
     def clean_build(self):
-        """Limpia builds anteriores"""
-        self.log("Limpiando builds anteriores...")
+        """Limpia builds anteriores solo si algo invalida el cache incremental"""
+        self.clean_decision = self.build_state.decide(force_clean=self.force_clean)
+        if not self.clean_decision["clean"]:
+            self.log(f"✓ Build incremental: {self.clean_decision['reason']}", "♻️")
+            return True
+        self.log(f"Limpiando builds anteriores ({self.clean_decision['reason']})...")
         try:
             result = subprocess.run(
                 ["flutter", "clean"],
@@ -37,59 +53,34 @@ class APKBuilderBot:
             self.log(f"✗ Error limpiando: {str(e)}", "❌")
             return False
             
+    def run_build(self, mode):
+        """Build APK con la salida en un log por paso; retorna éxito"""
+        captured = run_captured(
+            ["flutter", "build", "apk", f"--{mode}"],
+            self.project_root, f"apk-builder-{mode}", self.log_dir, timeout=300
+        )
+        if captured["success"]:
+            self.log(f"✓ APK {mode} construida exitosamente", "✅")
+            self.log(f"  Log: {captured['log']}", "📄")
+            return True
+        if captured["timed_out"]:
+            self.log("✗ Timeout construyendo APK", "❌")
+        else:
+            self.log(f"✗ Error construyendo APK (log: {captured['log']}):\n{tail_text(captured)}", "❌")
+        return False
+            
     def build_apk_debug(self):
         """Construye APK debug"""
         self.log("Construyendo APK debug...")
-        try:
-            result = subprocess.run(
-                ["flutter", "build", "apk", "--debug"],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
-            
-            print(result.stdout)
-            
-            if result.returncode == 0:
-                self.log("✓ APK debug construida exitosamente", "✅")
-                return True
-            else:
-                self.log(f"✗ Error construyendo APK: {result.stderr}", "❌")
-                return False
-        except subprocess.TimeoutExpired:
-            self.log("✗ Timeout construyendo APK", "❌")
-            return False
-        except Exception as e:
-            self.log(f"✗ Excepción: {str(e)}", "❌")
-            return False
+        return self.run_build("debug")
             
     def build_apk_release(self):
         """Construye APK release"""
         self.log("Construyendo APK release...")
-        try:
-            result = subprocess.run(
-                ["flutter", "build", "apk", "--release"],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
-            
-            print(result.stdout)
-            
-            if result.returncode == 0:
-                self.log("✓ APK release construida exitosamente", "✅")
-                return True
-            else:
-                self.log(f"✗ Error construyendo APK: {result.stderr}", "❌")
-                return False
-        except subprocess.TimeoutExpired:
-            self.log("✗ Timeout construyendo APK", "❌")
-            return False
-        except Exception as e:
-            self.log(f"✗ Excepción: {str(e)}", "❌")
-            return False
+        self.build_state.mark_started()
+        success = self.run_build("release")
+        self.build_state.mark_finished(success)
+        return success
             
     def verify_apk(self):
         """Verifica que la APK exista"""
@@ -103,24 +94,39 @@ class APKBuilderBot:
             self.log("✗ APK no encontrada", "❌")
             return False
             
+    def record_metrics(self, success):
+        """Agrega la ejecución a la serie temporal de builds"""
+        apk_file = self.build_dir / "app-release.apk"
+        record = build_record("apk_builder", "apk-release", success, self.timer.phases,
+                              self.timer.total(), [apk_file] if success else [],
+                              toolchain_versions(self.build_state), clean=self.clean_decision)
+        self.metrics_store.append(record)
+        if self.compare:
+            print_comparison(self.metrics_store.compare(record))
+            
     def run(self):
         """Ejecuta el bot completo"""
         self.log("🚀 INICIANDO BOT 2B: APKBuilder", "🤖")
         self.status = "🔄 EN PROGRESO"
         
+        self.timer = PhaseTimer()
         steps = [
-            ("Limpiar builds", self.clean_build),
-            ("Construir APK release", self.build_apk_release),
-            ("Verificar APK", self.verify_apk),
+            ("Limpiar builds", "clean", self.clean_build),
+            ("Construir APK release", "build", self.build_apk_release),
+            ("Verificar APK", "verify", self.verify_apk),
         ]
         
-        for step_name, step_func in steps:
+        for step_name, phase, step_func in steps:
             self.log(f"Ejecutando: {step_name}")
-            if not step_func():
+            with self.timer.phase(phase):
+                ok = step_func()
+            if not ok:
                 self.status = "❌ FALLIDO"
                 self.log(f"Bot FALLIDO en: {step_name}", "❌")
+                self.record_metrics(False)
                 return False
                 
+        self.record_metrics(True)
         self.status = "✅ COMPLETADO"
         self.log("Bot COMPLETADO exitosamente", "✅")
         self.log("="*60, "🎉")
@@ -129,7 +135,9 @@ class APKBuilderBot:
         return True
 
 if __name__ == "__main__":
-    project_root = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
-    bot = APKBuilderBot(project_root)
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    project_root = args[0] if args else os.getcwd()
+    bot = APKBuilderBot(project_root, force_clean="--clean" in sys.argv,
+                        compare="--compare" in sys.argv)
     success = bot.run()
     sys.exit(0 if success else 1)
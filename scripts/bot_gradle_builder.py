@@ -5,14 +5,20 @@ Configura y verifica archivos Gradle para el build de Android
 """
 import os
 import sys
-import subprocess
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "automation"))
+from dependency_cache import DependencyCache
+from gradle_config import GradleConfigLoader, validate
+
 class GradleBuilderBot:
-    def __init__(self, project_root):
+    def __init__(self, project_root, offline=False, force_prefetch=False):
         self.project_root = Path(project_root)
         self.android_dir = self.project_root / "android"
         self.status = "⏳ INICIANDO"
+        self.offline = offline
+        self.force_prefetch = force_prefetch
+        self.deps = DependencyCache(self.project_root)
         
     def log(self, message, emoji="🔧"):
         print(f"{emoji} [GradleBuilder] {message}")
@@ -26,13 +32,18 @@ class GradleBuilderBot:
             self.log(f"✗ {description}: FALTA {file_path.name}", "❌")
             return False
             
+    def gradle_file(self, name):
+        """Script Gradle en Groovy o, si existe, su variante Kotlin DSL"""
+        kts = self.android_dir / f"{name}.kts"
+        return kts if kts.exists() else self.android_dir / name
+        
     def verify_gradle_files(self):
         """Verifica archivos Gradle"""
         self.log("Verificando archivos Gradle...")
         
         files_to_check = [
-            (self.android_dir / "build.gradle", "Build raíz"),
-            (self.android_dir / "settings.gradle", "Settings"),
+            (self.gradle_file("build.gradle"), "Build raíz"),
+            (self.gradle_file("settings.gradle"), "Settings"),
             (self.android_dir / "gradle.properties", "Properties"),
             (self.android_dir / "gradle" / "wrapper" / "gradle-wrapper.properties", "Wrapper"),
         ]
@@ -41,39 +52,48 @@ class GradleBuilderBot:
         return all_exist
         
     def verify_gradle_wrapper(self):
-        """Verifica versión de Gradle wrapper"""
-        wrapper_file = self.android_dir / "gradle" / "wrapper" / "gradle-wrapper.properties"
-        if wrapper_file.exists():
-            content = wrapper_file.read_text()
-            if "gradle-8.3" in content:
-                self.log("✓ Gradle 8.3 configurado", "✅")
-                return True
+        """Valida versiones (Gradle/AGP/Kotlin/SDK) y memoria de Gradle en una pasada"""
+        config = GradleConfigLoader(self.project_root).load()
+        self.log(f"Gradle {config['gradle_version']} · AGP {config['agp_version']} · "
+                 f"Kotlin {config['kotlin_version']} · SDK {config['min_sdk']}-{config['target_sdk']} "
+                 f"(compile {config['compile_sdk']})")
+        issues = validate(config)
+        for issue in issues:
+            if issue["level"] == "error":
+                self.log(f"✗ {issue['message']}", "❌")
             else:
-                self.log("✗ Versión de Gradle incorrecta", "❌")
-                return False
-        return False
+                self.log(issue["message"], "⚠️")
+        if any(issue["level"] == "error" for issue in issues):
+            return False
+        self.log("✓ Configuración Gradle compatible", "✅")
+        return True
         
     def test_gradle_build(self):
-        """Intenta hacer un build de verificación"""
-        self.log("Probando configuración Gradle...")
-        try:
-            result = subprocess.run(
-                ["flutter", "pub", "get"],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            if result.returncode == 0:
-                self.log("✓ Flutter pub get exitoso", "✅")
-                return True
-            else:
-                self.log(f"✗ Error en pub get: {result.stderr}", "❌")
+        """Resuelve dependencias pub y Gradle en el cache local (o lo usa offline)"""
+        if self.offline:
+            self.log("Modo offline: usando solo el cache de dependencias...")
+            if not self.deps.is_warm():
+                self.log("✗ El cache no tiene las dependencias actuales; ejecuta sin --offline", "❌")
                 return False
-        except Exception as e:
-            self.log(f"✗ Excepción: {str(e)}", "❌")
+            ok, output = self.deps.pub_get_offline()
+            if ok:
+                self.log("✓ Flutter pub get --offline exitoso", "✅")
+                return True
+            self.log(f"✗ Error en pub get offline: {output}", "❌")
             return False
             
+        self.log("Prefetch de dependencias pub y Gradle...")
+        result = self.deps.prefetch(force=self.force_prefetch)
+        if result["skipped"]:
+            self.log(f"✓ Dependencias ya en cache ({result['state'][:12]})", "♻️")
+            return True
+        for name, step in result["steps"].items():
+            if step["success"]:
+                self.log(f"✓ Prefetch {name} exitoso", "✅")
+            else:
+                self.log(f"✗ Error en prefetch {name}: {step['output']}", "❌")
+        return result["success"]
+            
     def run(self):
         """Ejecuta el bot completo"""
         self.log("🚀 INICIANDO BOT 1A: GradleBuilder", "🤖")
@@ -81,8 +101,8 @@ class GradleBuilderBot:
         
         steps = [
             ("Verificar archivos Gradle", self.verify_gradle_files),
-            ("Verificar Gradle wrapper", self.verify_gradle_wrapper),
-            ("Test de dependencias", self.test_gradle_build),
+            ("Validar configuración Gradle", self.verify_gradle_wrapper),
+            ("Prefetch de dependencias", self.test_gradle_build),
         ]
         
         for step_name, step_func in steps:
@@ -97,7 +117,9 @@ class GradleBuilderBot:
         return True
 
 if __name__ == "__main__":
-    project_root = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
-    bot = GradleBuilderBot(project_root)
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    project_root = args[0] if args else os.getcwd()
+    bot = GradleBuilderBot(project_root, offline="--offline" in sys.argv,
+                           force_prefetch="--force-prefetch" in sys.argv)
     success = bot.run()
     sys.exit(0 if success else 1)
@@ -5,13 +5,17 @@ Construye APK/AAB de release con signing
 """
 import os
 import sys
-import subprocess
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "automation"))
+from build_matrix import BuildMatrix
+from build_metrics import print_comparison
+
 class ReleaseBuilderBot:
-    def __init__(self, project_root):
+    def __init__(self, project_root, isolate=False, compare=False):
         self.project_root = Path(project_root)
-        self.build_dir = self.project_root / "build" / "app" / "outputs"
+        self.isolate = isolate
+        self.compare = compare
         
     def log(self, message, emoji="🏗️"):
         print(f"{emoji} [ReleaseBuilder] {message}")
@@ -34,61 +38,25 @@ class ReleaseBuilderBot:
         self.log("✓ Configuración de signing OK", "✅")
         return True
         
-    def build_apk_release(self):
-        """Build APK de release"""
-        self.log("Construyendo APK release...")
+    def build_release_matrix(self):
+        """Build APK y AAB de release como matriz (en paralelo si --isolate)"""
+        self.log("Construyendo matriz release: APK + AAB...")
+        matrix = BuildMatrix(self.project_root, ['release', 'appbundle'],
+                             max_parallel=2, isolate=self.isolate, bot_name="release_builder")
+        report = matrix.run()
+        if self.compare:
+            for comparison in report["comparisons"]:
+                print_comparison(comparison)
         
-        try:
-            result = subprocess.run(
-                ["flutter", "build", "apk", "--release"],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=600
-            )
-            
-            if result.returncode == 0:
-                apk_path = self.build_dir / "flutter-apk" / "app-release.apk"
-                if apk_path.exists():
-                    size_mb = apk_path.stat().st_size / (1024 * 1024)
-                    self.log(f"✓ APK release: {apk_path}", "✅")
-                    self.log(f"  Tamaño: {size_mb:.2f} MB", "📦")
-                    return True
-            
-            self.log(f"✗ Error en build: {result.stderr}", "❌")
-            return False
-            
-        except Exception as e:
-            self.log(f"✗ Excepción: {e}", "❌")
-            return False
-            
-    def build_appbundle_release(self):
-        """Build AAB (Android App Bundle) de release"""
-        self.log("Construyendo AAB release...")
+        for variant, result in report['variants'].items():
+            for artifact in result['artifacts']:
+                self.log(f"✓ {variant}: {artifact['path']} ({artifact['size_mb']:.2f} MB)", "📦")
+            if result['status'] != 'passed':
+                self.log(f"✗ {variant}: {result.get('error', result['status'])[:200]}",
+                         "❌" if variant == 'release' else "⚠️")
         
-        try:
-            result = subprocess.run(
-                ["flutter", "build", "appbundle", "--release"],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=600
-            )
-            
-            if result.returncode == 0:
-                aab_path = self.build_dir / "bundle" / "release" / "app-release.aab"
-                if aab_path.exists():
-                    size_mb = aab_path.stat().st_size / (1024 * 1024)
-                    self.log(f"✓ AAB release: {aab_path}", "✅")
-                    self.log(f"  Tamaño: {size_mb:.2f} MB", "📦")
-                    return True
-            
-            self.log(f"⚠️  Error en AAB: {result.stderr}", "⚠️")
-            return False
-            
-        except Exception as e:
-            self.log(f"⚠️  AAB no generado: {e}", "⚠️")
-            return False
+        # AAB es opcional
+        return report['variants']['release']['status'] == 'passed'
             
     def run(self):
         """Ejecuta el bot completo"""
@@ -97,10 +65,7 @@ class ReleaseBuilderBot:
         if not self.verify_signing_config():
             return False
             
-        success = True
-        success = self.build_apk_release() and success
-        # AAB es opcional
-        self.build_appbundle_release()
+        success = self.build_release_matrix()
         
         if success:
             self.log("Bot COMPLETADO ✓", "✅")
@@ -111,7 +76,9 @@ class ReleaseBuilderBot:
         return success
 
 if __name__ == "__main__":
-    project_root = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
-    bot = ReleaseBuilderBot(project_root)
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    project_root = args[0] if args else os.getcwd()
+    bot = ReleaseBuilderBot(project_root, isolate="--isolate" in sys.argv,
+                            compare="--compare" in sys.argv)
     success = bot.run()
     sys.exit(0 if success else 1)
@@ -5,15 +5,18 @@ Ejecuta tests automáticamente y genera reportes
 """
 import os
 import sys
-import subprocess
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "automation"))
+from output_capture import run_captured, tail_text
+
 class TestRunnerBot:
     def __init__(self, project_root):
         self.project_root = Path(project_root)
         self.test_dir = self.project_root / "test"
         self.status = "⏳ INICIANDO"
+        self.log_dir = self.project_root / ".automation" / "logs"
         
     def log(self, message, emoji="🧪"):
         print(f"{emoji} [TestRunner] {message}")
@@ -21,52 +24,36 @@ class TestRunnerBot:
     def run_flutter_tests(self):
         """Ejecuta todos los tests de Flutter"""
         self.log("Ejecutando tests de Flutter...")
-        try:
-            result = subprocess.run(
-                ["flutter", "test", "--reporter", "expanded"],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            
-            print(result.stdout)
-            
-            if result.returncode == 0:
-                self.log("✓ Todos los tests pasaron", "✅")
-                return True
-            else:
-                self.log("✗ Algunos tests fallaron", "❌")
-                print(result.stderr)
-                return False
-        except subprocess.TimeoutExpired:
+        # La salida se muestra en vivo y queda en el log; en memoria solo el final
+        captured = run_captured(
+            ["flutter", "test", "--reporter", "expanded"],
+            self.project_root, "test-runner-tests", self.log_dir,
+            timeout=120, on_line=lambda line: print(line, end="")
+        )
+        if captured["success"]:
+            self.log("✓ Todos los tests pasaron", "✅")
+            return True
+        if captured["timed_out"]:
             self.log("✗ Timeout en tests", "❌")
-            return False
-        except Exception as e:
-            self.log(f"✗ Excepción: {str(e)}", "❌")
-            return False
+        else:
+            self.log(f"✗ Algunos tests fallaron (log: {captured['log']})", "❌")
+        return False
             
     def run_analysis(self):
         """Ejecuta análisis estático"""
         self.log("Ejecutando análisis estático...")
-        try:
-            result = subprocess.run(
-                ["flutter", "analyze"],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            
-            if result.returncode == 0:
-                self.log("✓ Análisis sin issues", "✅")
-                return True
-            else:
-                self.log(f"⚠ Issues encontrados:\n{result.stdout}", "⚠️")
-                return True  # No falla el bot, solo advierte
-        except Exception as e:
-            self.log(f"✗ Excepción: {str(e)}", "❌")
+        captured = run_captured(
+            ["flutter", "analyze"], self.project_root, "test-runner-analyze",
+            self.log_dir, timeout=60
+        )
+        if captured["success"]:
+            self.log("✓ Análisis sin issues", "✅")
+            return True
+        if captured["returncode"] is None:
+            self.log(f"✗ Excepción: {captured['tail']}", "❌")
             return False
+        self.log(f"⚠ Issues encontrados (log: {captured['log']}):\n{tail_text(captured, 40)}", "⚠️")
+        return True  # No falla el bot, solo advierte
             
     def check_test_files(self):
         """Verifica que existan archivos de test"""
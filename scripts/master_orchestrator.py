@@ -5,16 +5,19 @@ Coordina la ejecución de todos los agentes y bots
 """
 import os
 import sys
-import subprocess
 from pathlib import Path
 from datetime import datetime
 import time
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "automation"))
+from output_capture import run_captured
+
 class MasterOrchestrator:
     def __init__(self, project_root):
         self.project_root = Path(project_root)
         self.scripts_dir = self.project_root / "scripts"
         self.start_time = datetime.now()
+        self.log_dir = self.project_root / ".automation" / "logs"
         
     def log(self, message, emoji="🎯"):
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -30,33 +33,27 @@ class MasterOrchestrator:
         print("="*60 + "\n")
         
     def run_bot(self, bot_name, bot_script):
-        """Ejecuta un bot individual"""
+        """Ejecuta un bot individual mostrando su salida en vivo"""
         self.log(f"Lanzando {bot_name}...", "🚀")
         
-        try:
-            result = subprocess.run(
-                [sys.executable, str(bot_script), str(self.project_root)],
-                capture_output=True,
-                text=True,
-                timeout=600
-            )
-            
-            print(result.stdout)
-            
-            if result.returncode == 0:
-                self.log(f"{bot_name} COMPLETADO ✓", "✅")
-                return True
-            else:
-                self.log(f"{bot_name} FALLIDO ✗", "❌")
-                if result.stderr:
-                    print(result.stderr)
-                return False
-        except subprocess.TimeoutExpired:
+        # Sin buffer para que la salida del bot llegue línea a línea
+        env = dict(os.environ, PYTHONUNBUFFERED="1")
+        captured = run_captured(
+            [sys.executable, str(bot_script), str(self.project_root)],
+            self.project_root, bot_script.stem, self.log_dir,
+            timeout=600, env=env, on_line=lambda line: print(line, end="")
+        )
+        
+        if captured["success"]:
+            self.log(f"{bot_name} COMPLETADO ✓", "✅")
+            return True
+        if captured["timed_out"]:
             self.log(f"{bot_name} TIMEOUT", "⏱️")
-            return False
-        except Exception as e:
-            self.log(f"{bot_name} ERROR: {str(e)}", "❌")
-            return False
+        elif captured["returncode"] is None:
+            self.log(f"{bot_name} ERROR: {captured['tail']}", "❌")
+        else:
+            self.log(f"{bot_name} FALLIDO ✗ (log: {captured['log']})", "❌")
+        return False
             
     def run_agent_1(self):
         """AGENTE 1: Android Config Master"""
@@ -6,8 +6,8 @@ set -e
 echo "🧪 Ejecutando suite de tests..."
 echo ""
 
-# Ejecutar tests con cobertura
-flutter test --coverage --reporter expanded
+# Ejecutar tests en paralelo con cobertura por shard (fusionada en coverage/lcov.info)
+python3 scripts/automation/test_runner.py --coverage
 
 # Verificar si existe lcov
 if command -v lcov &> /dev/null; then